@@ -0,0 +1,84 @@
+import argparse
+from datetime import date
+import logging
+import sys
+
+import numpy as np
+
+from clients.records import as_issue_record
+from metrics.automation_sla import get_automation_task_days, get_automation_task_times
+from metrics.collector import METRIC_DESCRIPTIONS
+from metrics.history import (
+    get_automation_time_diff_values,
+    get_dates,
+    get_smoke_test_history,
+    get_smoke_test_values,
+    iter_openmetrics
+)
+from metrics.metrics import get_qase_api, get_usecases
+
+
+STEP_DAYS = {
+    'day': 1,
+    'week': 7
+}
+
+log = logging.getLogger(__name__)
+
+
+def get_history_values(dates: np.ndarray) -> dict[str, np.ndarray]:
+    """Rebuild the smoke test and automation time diff gauges for each date."""
+    issues = get_usecases().get_done_smoke_automation_tasks()
+    times = get_automation_task_times(issues, get_usecases().get_jira_issues_changelogs(issues, 'status'))
+    days = get_automation_task_days(times)
+    automation_dates = {
+        issue.key: issue.status_category_change_date.date()
+        for issue in map(as_issue_record, issues) if issue.status_category_change_date
+    }
+    del issues
+
+    history = get_smoke_test_history(
+        get_qase_api().iter_all_test_cases(type='smoke', status='actual'),
+        automation_dates
+    )
+    return {
+        **get_smoke_test_values(history, dates),
+        **get_automation_time_diff_values(
+            times['done'],
+            -np.nan_to_num(days['lateness']).astype(np.int64),
+            np.nan_to_num(days['expected_duration']).astype(np.int64),
+            dates
+        )
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Write daily or weekly history of the gauges as OpenMetrics text.
+
+    The output can be loaded into Prometheus with
+    promtool tsdb create-blocks-from openmetrics <file> <data dir>.
+    """
+    parser = argparse.ArgumentParser(description='Rebuild the history of the gauges as OpenMetrics text')
+    parser.add_argument('--start', required=True, type=date.fromisoformat, help='First date, YYYY-MM-DD')
+    parser.add_argument('--end', default=date.today(), type=date.fromisoformat, help='Last date, YYYY-MM-DD, today by default')
+    parser.add_argument('--step', default='day', choices=STEP_DAYS, help='Distance between samples')
+    parser.add_argument('--output', default='-', help='Output file, stdout by default')
+    args = parser.parse_args(argv)
+    if args.start > args.end:
+        parser.error('--start is after --end')
+
+    dates = get_dates(args.start, args.end, STEP_DAYS[args.step])
+    values = get_history_values(dates)
+    output = sys.stdout if args.output == '-' else open(args.output, 'w')
+    try:
+        output.writelines(iter_openmetrics(dates, values, METRIC_DESCRIPTIONS))
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    log.info(f'Wrote {len(values)} metrics at {len(dates)} dates')
+    return 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(main())
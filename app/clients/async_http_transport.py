@@ -0,0 +1,168 @@
+import asyncio
+import logging
+import time
+from typing import Awaitable, TypeVar
+from urllib.parse import urlsplit
+
+import aiohttp
+
+from clients.http_transport import IDEMPOTENT_METHODS, DeadlineExceeded, RetryPolicy, parse_retry_after
+from clients.instrumentation import ClientMetrics, get_endpoint_template
+from clients.rate_limit import RateLimitBudget
+
+
+T = TypeVar('T')
+
+class AsyncHttpTransport:
+    """Asyncio counterpart of HttpTransport shared by the async API clients.
+
+    All requests run on the calling event loop through one aiohttp session.
+    A per-host semaphore bounds the number of requests in flight to each host,
+    so many coroutines can fan out without opening a connection per request.
+    The session has to be closed before its loop ends, run does that for a
+    coroutine run on a new loop.
+    """
+
+    def __init__(
+        self,
+        per_host_limit: int = 16,
+        timeout: float = 30.0,
+        total_timeout: float = 120.0,
+        retry_policy: RetryPolicy | None = None,
+        metrics: ClientMetrics | None = None,
+        rate_limit: RateLimitBudget | None = None
+    ):
+        self._log = logging.getLogger(__name__)
+        self._per_host_limit = per_host_limit
+        self._timeout = timeout
+        self._total_timeout = total_timeout
+        self._retry_policy = retry_policy or RetryPolicy()
+        self._metrics = metrics
+        self._rate_limit = rate_limit
+        self._loop = None
+        self._session = None
+        self._semaphores = {}
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        # The session and semaphores are bound to the loop they were created on,
+        # so a new loop (e.g. a new asyncio.run per refresh) gets fresh ones.
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._loop is not loop:
+            if self._session is not None and not self._session.closed:
+                self._log.warning('Replacing an aiohttp session that was not closed before its event loop ended')
+            self._loop = loop
+            self._semaphores = {}
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=0, limit_per_host=self._per_host_limit)
+            )
+        return self._session
+
+    def _get_semaphore(self, url: str) -> asyncio.Semaphore:
+        host = urlsplit(url).netloc
+        if host not in self._semaphores:
+            self._semaphores[host] = asyncio.Semaphore(self._per_host_limit)
+        return self._semaphores[host]
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        timeout: float | None = None,
+        total_timeout: float | None = None,
+        idempotent: bool | None = None,
+        client: str = 'unknown',
+        endpoint: str | None = None,
+        **kwargs
+    ) -> dict | list | None:
+        """Send a request and return the decoded JSON body.
+
+        Retries and metrics follow the same rules as HttpTransport.request.
+
+        Raises:
+            aiohttp.ClientResponseError: If the final response has an error status.
+        """
+        method = method.upper()
+        timeout = timeout or self._timeout
+        deadline = time.monotonic() + (total_timeout or self._total_timeout)
+        if idempotent is None:
+            idempotent = method in IDEMPOTENT_METHODS
+        policy = self._retry_policy
+        session = self._get_session()
+        semaphore = self._get_semaphore(url)
+        endpoint = endpoint or get_endpoint_template(url)
+        attempt = 0
+        while True:
+            if self._rate_limit:
+                wait = self._rate_limit.reserve(url, deadline)
+                if wait is None:
+                    raise DeadlineExceeded(f'{method} {url} would exceed the rate limit before the deadline')
+                await asyncio.sleep(wait)
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise DeadlineExceeded(f'{method} {url} did not finish before the deadline')
+            started_at = None
+            try:
+                async with semaphore:
+                    started_at = time.monotonic()
+                    async with session.request(
+                        method,
+                        url,
+                        timeout=aiohttp.ClientTimeout(total=min(timeout, remaining)),
+                        **kwargs
+                    ) as response:
+                        body = await response.read()
+                        if self._rate_limit:
+                            self._rate_limit.update(url, response.headers, response.status)
+                        if self._metrics:
+                            self._metrics.observe_request(client, endpoint, method, response.status, time.monotonic() - started_at, len(body))
+                        retryable = response.status == 429 or (
+                            idempotent and response.status in policy.status_codes
+                        )
+                        retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                        if not retryable or attempt >= policy.max_retries:
+                            response.raise_for_status()
+                            if response.content_length == 0 or response.status == 204:
+                                return None
+                            return await response.json(content_type=None)
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                if self._metrics and started_at is not None:
+                    self._metrics.observe_request(client, endpoint, method, type(e).__name__, time.monotonic() - started_at)
+                if not idempotent or attempt >= policy.max_retries:
+                    raise
+                delay = policy.get_backoff(attempt)
+                self._log.warning(f'{method} {url} failed: {e!r}. Retrying in {delay:.1f}s')
+            else:
+                delay = policy.get_backoff(attempt, retry_after)
+                if time.monotonic() + delay >= deadline:
+                    raise DeadlineExceeded(f'{method} {url} returned {response.status} until the deadline')
+                self._log.warning(f'{method} {url} returned {response.status}. Retrying in {delay:.1f}s')
+            if self._metrics:
+                self._metrics.observe_retry(client, endpoint)
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def get(self, url: str, **kwargs) -> dict | list | None:
+        return await self.request('GET', url, **kwargs)
+
+    async def post(self, url: str, **kwargs) -> dict | list | None:
+        return await self.request('POST', url, **kwargs)
+
+    async def put(self, url: str, **kwargs) -> dict | list | None:
+        return await self.request('PUT', url, **kwargs)
+
+    async def patch(self, url: str, **kwargs) -> dict | list | None:
+        return await self.request('PATCH', url, **kwargs)
+
+    def run(self, coroutine: Awaitable[T]) -> T:
+        """Run a coroutine on a new event loop and close the session before the loop ends."""
+        async def run_and_close() -> T:
+            try:
+                return await coroutine
+            finally:
+                await self.close()
+
+        return asyncio.run(run_and_close())
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
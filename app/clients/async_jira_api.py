@@ -0,0 +1,347 @@
+import asyncio
+import logging
+
+import aiohttp
+
+from clients.async_http_transport import AsyncHttpTransport
+from clients.jira_api import DEFAULT_ISSUE_FIELDS, CustomField, IssueType, LinkType, Priority, TransitionStatus
+
+# Asyncio counterpart of clients.jira_api.JiraAPI with the same method surface.
+
+
+class AsyncJiraAPI:
+    def __init__(
+        self,
+        base_url: str,
+        email: str,
+        api_token: str,
+        transport: AsyncHttpTransport | None = None
+    ):
+        self._log = logging.getLogger(__name__)
+        self._base_url = base_url
+        self._email = email
+        self._transport = transport or AsyncHttpTransport()
+        self._auth = aiohttp.BasicAuth(email, api_token)
+        self._headers = {
+            'Accept': 'application/json',
+            'Content-Type': 'application/json'
+        }
+
+    async def get_issue(
+        self,
+        issue_key: str,
+        fields: list[str] = None
+    ):
+        self._log.info(f"Fetching issue: {issue_key}")
+        url = f'{self._base_url}/rest/api/2/issue/{issue_key}'
+        params = {}
+        if fields:
+            params['fields'] = ','.join(fields)
+        return await self._transport.get(
+            url=url,
+            client='jira',
+            params=params,
+            headers=self._headers,
+            auth=self._auth
+        )
+
+    async def get_issues(
+        self,
+        jql: str,
+        max_results: int = 15,
+        start_at: int = 0,
+        fields: list[str] = None,
+        validate_query: str | None = None
+    ):
+        self._log.info(f"Fetching issues: {jql}")
+        url = f'{self._base_url}/rest/api/2/search'
+        payload = {
+            "jql": jql,
+            "maxResults": max_results,
+            "startAt": start_at
+        }
+        if fields:
+            payload['fields'] = fields
+        if validate_query:
+            payload['validateQuery'] = validate_query
+        return await self._transport.post(
+            url=url,
+            client='jira',
+            headers=self._headers,
+            json=payload,
+            auth=self._auth,
+            idempotent=True
+        )
+
+    async def get_total_issues(
+        self,
+        jql: str
+    ) -> int:
+        self._log.info(f"Fetching total issues: {jql}")
+        return (await self.get_issues(jql, max_results=0))['total']
+
+    async def get_all_issues(
+        self,
+        jql: str,
+        fields: list[str] | None = None,
+        extra_fields: list[str] | None = None,
+        max_results: int = 1000,
+        validate_query: str | None = None
+    ):
+        """Get all issues matching the JQL.
+
+        Works like JiraAPI.get_all_issues, the remaining pages are gathered on
+        the event loop and bounded by the transport's per-host limit.
+        """
+        self._log.info(f"Fetching all issues: {jql}")
+        fields = list(fields or DEFAULT_ISSUE_FIELDS) + list(extra_fields or [])
+        first_page = await self.get_issues(jql, max_results, 0, fields, validate_query)
+        issues = list(first_page['issues'])
+        results_per_page = first_page['maxResults']
+        if not results_per_page:
+            return issues
+        pages = await asyncio.gather(*(
+            self.get_issues(jql, results_per_page, start_at, fields, validate_query)
+            for start_at in range(results_per_page, first_page['total'], results_per_page)
+        ))
+        for page in pages:
+            issues.extend(page['issues'])
+        return issues
+
+    async def get_issues_by_keys(
+        self,
+        issue_keys: list[str],
+        fields: list[str] | None = None,
+        extra_fields: list[str] | None = None,
+        chunk_size: int = 100
+    ) -> tuple[list, list[str]]:
+        """Get issues by key, see JiraAPI.get_issues_by_keys."""
+        issue_keys = list(dict.fromkeys(key.strip() for key in issue_keys if key.strip()))
+        self._log.info(f"Fetching {len(issue_keys)} issues by key")
+
+        async def get_chunk(chunk: list[str]) -> list:
+            try:
+                return await self.get_all_issues(
+                    f'key in ({",".join(chunk)})',
+                    fields=fields,
+                    extra_fields=extra_fields,
+                    max_results=len(chunk),
+                    validate_query='warn'
+                )
+            except aiohttp.ClientResponseError as e:
+                if e.status != 400:
+                    raise
+                self._log.warning(f"Search for keys {chunk} was rejected: {e.message}")
+                return []
+
+        chunks = await asyncio.gather(*(
+            get_chunk(issue_keys[i:i + chunk_size])
+            for i in range(0, len(issue_keys), chunk_size)
+        ))
+        issues = [issue for chunk_issues in chunks for issue in chunk_issues]
+        found_keys = {issue['key'] for issue in issues}
+        unresolved_keys = [key for key in issue_keys if key not in found_keys]
+        return issues, unresolved_keys
+
+    async def create_issue(
+        self,
+        project_key: str,
+        issue_type: IssueType,
+        summary: str,
+        description: str | None = None,
+        labels: list[str] | None = None,
+        assignee_id: str | None = None,
+        priority: Priority | None = None,
+        custom_fields: dict[CustomField, any] | None = None
+    ):
+        self._log.info(f"Creating issue: {summary}")
+        url = f'{self._base_url}/rest/api/2/issue'
+        payload = {
+            "fields": {
+                "project": { "key": project_key },
+                "issuetype": { "id": issue_type.value },
+                "summary": summary,
+            }
+        }
+        if description:
+            payload['fields']['description'] = description
+        if labels:
+            payload['fields']['labels'] = labels
+        if assignee_id:
+            payload['fields']['assignee'] = { "id": assignee_id }
+        if priority:
+            payload['fields']['priority'] = { "id": priority.value }
+        if custom_fields:
+            payload['fields'].update({
+                str(custom_field.value): value
+                for custom_field, value in custom_fields.items()
+            })
+        return await self._transport.post(
+            url=url,
+            client='jira',
+            headers=self._headers,
+            json=payload,
+            auth=self._auth
+        )
+
+    async def get_issue_watchers(
+        self,
+        issue_key: str
+    ):
+        self._log.info(f"Fetching watchers for issue: {issue_key}")
+        url = f'{self._base_url}/rest/api/2/issue/{issue_key}/watchers'
+        return await self._transport.get(
+            url=url,
+            client='jira',
+            headers=self._headers,
+            auth=self._auth
+        )
+
+    async def add_issue_watcher(
+        self,
+        issue_key: str,
+        watcher_id: str
+    ):
+        """Add issue watcher.
+
+        Args:
+            issue_key (str): Issue key.
+            watcher_id (str): User account ID.
+        """
+        self._log.info(f"Adding issue watcher: {watcher_id}")
+        url = f'{self._base_url}/rest/api/2/issue/{issue_key}/watchers'
+        await self._transport.post(
+            url=url,
+            client='jira',
+            headers=self._headers,
+            json=watcher_id,
+            auth=self._auth
+        )
+
+    async def add_issue_link(
+        self,
+        link_type: LinkType,
+        inward_issue_key: str,
+        outward_issue_key: str
+    ):
+        """Add issue link between two issues.
+
+        Args:
+            link_type (LinkType): Type of link.
+            inward_issue_key (str): Example: Shows "blocks".
+            outward_issue_key (str): Example: Shows "is blocked by".
+        """
+        self._log.info(f"Adding issue link: inward:{inward_issue_key} outward:{outward_issue_key}")
+        url = f'{self._base_url}/rest/api/2/issueLink'
+        payload = {
+            "type": { "id": link_type.value },
+            "inwardIssue": { "key": inward_issue_key },
+            "outwardIssue": { "key": outward_issue_key }
+        }
+        await self._transport.post(
+            url=url,
+            client='jira',
+            headers=self._headers,
+            json=payload,
+            auth=self._auth
+        )
+
+    async def get_issue_transitions(
+        self,
+        issue_key: str
+    ):
+        self._log.info(f"Fetching issue transitions: {issue_key}")
+        url = f'{self._base_url}/rest/api/2/issue/{issue_key}/transitions'
+        return await self._transport.get(
+            url=url,
+            client='jira',
+            headers=self._headers,
+            auth=self._auth
+        )
+
+    async def transition_issue(
+        self,
+        issue_key: str,
+        status: TransitionStatus
+    ):
+        self._log.info(f"Transiting issue to status: {issue_key} {status}")
+        url = f'{self._base_url}/rest/api/2/issue/{issue_key}/transitions'
+        payload = {
+            "transition": { "id": status.value }
+        }
+        await self._transport.post(
+            url=url,
+            client='jira',
+            headers=self._headers,
+            json=payload,
+            auth=self._auth
+        )
+
+    async def add_issue_comment(
+        self,
+        issue_key: str,
+        comment: str
+    ):
+        self._log.info(f"Adding comment to issue: {issue_key}")
+        url = f'{self._base_url}/rest/api/2/issue/{issue_key}/comment'
+        payload = {
+            "body": comment
+        }
+        await self._transport.post(
+            url=url,
+            client='jira',
+            headers=self._headers,
+            json=payload,
+            auth=self._auth
+        )
+
+    async def edit_issue(
+        self,
+        issue_key: str,
+        summary: str | None = None,
+        description: str | None = None,
+    ):
+        self._log.info(f"Editing issue: {issue_key}")
+        url = f'{self._base_url}/rest/api/2/issue/{issue_key}'
+        payload = {'fields': {}}
+        if summary:
+            payload['fields']['summary'] = summary
+        if description:
+            payload['fields']['description'] = description
+        await self._transport.put(
+            url=url,
+            client='jira',
+            headers=self._headers,
+            json=payload,
+            auth=self._auth
+        )
+
+    async def get_bulk_editable_fields(
+        self,
+        issue_ids_or_keys: str
+    ):
+        self._log.info("Fetching bulk editable fields")
+        url = f'{self._base_url}/rest/api/3/bulk/issues/fields'
+        params = {
+            'issueIdsOrKeys': issue_ids_or_keys
+        }
+        return await self._transport.get(
+            url=url,
+            client='jira',
+            params=params,
+            headers=self._headers,
+            auth=self._auth
+        )
+
+    async def get_changelogs(
+        self,
+        issue_key: str
+    ):
+        self._log.info(f"Fetching changelogs for issue: {issue_key}")
+        url = f'{self._base_url}/rest/api/2/issue/{issue_key}/changelog'
+        return await self._transport.get(
+            url=url,
+            client='jira',
+            headers=self._headers,
+            auth=self._auth
+        )
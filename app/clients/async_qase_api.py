@@ -0,0 +1,148 @@
+import asyncio
+import logging
+
+from clients.async_http_transport import AsyncHttpTransport
+from clients.qase_api import CustomField
+
+# Asyncio counterpart of clients.qase_api.QaseAPI with the same method surface.
+
+
+class AsyncQaseAPI:
+    def __init__(
+        self,
+        base_url: str,
+        api_token: str,
+        project_code: str,
+        transport: AsyncHttpTransport | None = None
+    ):
+        self._log = logging.getLogger(__name__)
+        self._base_url = base_url
+        self._api_token = api_token
+        self._project_code = project_code
+        self._transport = transport or AsyncHttpTransport()
+        self._headers = {
+            'Token': self._api_token,
+            'Content-Type': 'application/json'
+        }
+
+    async def _get_test_run_results(
+            self,
+            max_results: int = 10,
+            start_result: int = 0
+    ) -> dict:
+        url = f'{self._base_url}/v1/result/{self._project_code}'
+        params = {
+            "limit": str(max_results),
+            "offset": str(start_result)
+        }
+        return await self._transport.get(
+            url=url,
+            client='qase',
+            headers=self._headers,
+            params=params
+        )
+
+    async def _get_test_cases(
+        self,
+        type: str | None = None,
+        status: str | None = None,
+        automation: str | None = None,
+        max_results: int = 10,
+        start_result: int = 0
+    ) -> dict:
+        url = f'{self._base_url}/v1/case/{self._project_code}'
+        params = {
+            "limit": str(max_results),
+            "offset": str(start_result)
+        }
+        if type:
+            params['type'] = type
+        if status:
+            params['status'] = status
+        if automation:
+            params['automation'] = automation
+        return await self._transport.get(
+            url=url,
+            client='qase',
+            headers=self._headers,
+            params=params
+        )
+
+    async def get_all_test_cases(
+        self,
+        type: str | None = None,
+        status: str | None = None,
+        automation: str | None = None,
+    ) -> list:
+        """Get all test cases matching the filters.
+
+        Works like QaseAPI.get_all_test_cases, the remaining pages are gathered
+        on the event loop and bounded by the transport's per-host limit.
+        """
+        max_results = 100
+        first_page = await self._get_test_cases(
+            type=type,
+            status=status,
+            automation=automation,
+            max_results=max_results,
+            start_result=0
+        )
+        all_test_cases = list(first_page['result']['entities'])
+        pages = await asyncio.gather(*(
+            self._get_test_cases(
+                type=type,
+                status=status,
+                automation=automation,
+                max_results=max_results,
+                start_result=start_result
+            )
+            for start_result in range(max_results, first_page['result']['filtered'], max_results)
+        ))
+        for data in pages:
+            all_test_cases += data['result']['entities']
+        return all_test_cases
+
+    async def get_number_of_test_cases(
+        self,
+        type: str | None = None,
+        status: str | None = None,
+        automation: str | None = None
+    ) -> int:
+        data = await self._get_test_cases(
+            max_results=1,
+            type=type,
+            status=status,
+            automation=automation
+        )
+        return data['result']['filtered']
+
+    async def get_test_case(
+        self,
+        case_id: int
+    ) -> dict:
+        url = f'{self._base_url}/v1/case/{self._project_code}/{case_id}'
+        data = await self._transport.get(
+            url=url,
+            client='qase',
+            headers=self._headers
+        )
+        return data['result']
+
+    async def update_test_case(
+        self,
+        case_id: int,
+        custom_fields: dict[CustomField, str]
+    ) -> dict:
+        url = f'{self._base_url}/v1/case/{self._project_code}/{case_id}'
+        payload = {}
+        if custom_fields:
+            payload['custom_field'] = {
+                str(custom_field.value): value
+                for custom_field, value in custom_fields.items()
+            }
+        return await self._transport.patch(
+            url=url,
+            client='qase',
+            headers=self._headers,
+            json=payload
+        )
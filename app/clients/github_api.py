@@ -1,17 +1,63 @@
 from datetime import datetime
+from functools import cached_property
+import time
 
-from github import Github
+from github import Auth, Github
 from github.GithubObject import NotSet
+from requests.structures import CaseInsensitiveDict
+
+from clients.instrumentation import ClientMetrics, get_endpoint_template
+from clients.rate_limit import RateLimitBudget
 
 
 class GithubCollector:
     def __init__(
             self,
             github_token: str,
-            repo_name: str
+            repo_name: str,
+            metrics: ClientMetrics | None = None,
+            rate_limit: RateLimitBudget | None = None,
+            base_url: str = 'https://api.github.com'
     ):
-        self.github = Github(github_token)
-        self.repo = self.github.get_repo(repo_name)
+        self.github = Github(auth=Auth.Token(github_token), base_url=base_url)
+        self._repo_name = repo_name
+        if metrics or rate_limit:
+            self._wrap_requester(metrics, rate_limit)
+
+    @cached_property
+    def repo(self):
+        """Repository fetched on first use, constructing the collector makes no requests."""
+        return self.github.get_repo(self._repo_name)
+
+    def _wrap_requester(
+            self,
+            metrics: ClientMetrics | None,
+            rate_limit: RateLimitBudget | None
+    ):
+        # PyGithub sends every REST call through Requester.requestJson, so
+        # wrapping it on this instance measures and budgets each page of every call.
+        requester = self.github.requester
+        request_json = requester.requestJson
+
+        def wrapped_request_json(verb, url, *args, **kwargs):
+            absolute_url = url if '://' in url else f'{requester.base_url}{url}'
+            endpoint = get_endpoint_template(url.replace(self._repo_name, '{repo}'))
+            if rate_limit:
+                time.sleep(rate_limit.reserve(absolute_url))
+            started_at = time.monotonic()
+            try:
+                status, headers, output = request_json(verb, url, *args, **kwargs)
+            except Exception as e:
+                if metrics:
+                    metrics.observe_request('github', endpoint, verb, type(e).__name__, time.monotonic() - started_at)
+                raise
+            if rate_limit:
+                rate_limit.update(absolute_url, CaseInsensitiveDict(headers), status)
+            if metrics:
+                metrics.observe_request('github', endpoint, verb, status, time.monotonic() - started_at, len((output or '').encode()))
+            return status, headers, output
+
+        requester.requestJson = wrapped_request_json
 
     def _get_commits(
             self,
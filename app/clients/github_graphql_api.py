@@ -0,0 +1,217 @@
+from collections import OrderedDict
+from datetime import datetime
+from fnmatch import fnmatch
+import logging
+from pathlib import PurePosixPath
+import threading
+from typing import Iterator
+
+from clients.http_transport import HttpTransport
+from clients.records import PullRequestRecord, parse_datetime
+
+# GitHub GraphQL API documentation: https://docs.github.com/en/graphql
+
+
+DEFAULT_TEST_FILE_PATTERNS = ['tests/*', '*/tests/*', 'test/*', '*/test/*', 'test_*.py', '*_test.py', '*.spec.*', '*.test.*']
+
+PULL_REQUESTS_QUERY = '''
+query($owner: String!, $name: String!, $states: [PullRequestState!], $pageSize: Int!, $filesPageSize: Int!, $cursor: String) {
+  repository(owner: $owner, name: $name) {
+    pullRequests(first: $pageSize, after: $cursor, states: $states, orderBy: {field: UPDATED_AT, direction: DESC}) {
+      pageInfo { hasNextPage endCursor }
+      nodes {
+        number
+        createdAt
+        updatedAt
+        mergedAt
+        reviews(first: 1) { nodes { submittedAt } }
+        files(first: $filesPageSize) {
+          totalCount
+          nodes { path additions deletions }
+        }
+      }
+    }
+  }
+  rateLimit { cost remaining resetAt }
+}
+'''
+
+
+class GraphQLError(Exception):
+    """Raised when a GraphQL response reports errors."""
+
+
+class GithubGraphQLAPI:
+    """Bulk reader of pull requests through the GitHub GraphQL API.
+
+    One query returns a page of pull requests with only the fields the
+    metrics use, including their first review and changed files, so a
+    thousand pull requests take a few dozen requests instead of several REST
+    calls per pull request. Pull requests with more changed files than fit
+    in the query fall back to the REST files endpoint, requested
+    conditionally with the ETag of the previous response. ETags and bodies
+    of the etag_cache_size most recently used responses are kept.
+    """
+
+    def __init__(
+        self,
+        token: str,
+        repo_name: str,
+        base_url: str = 'https://api.github.com',
+        test_file_patterns: list[str] | None = None,
+        transport: HttpTransport | None = None,
+        etag_cache_size: int = 1024
+    ):
+        self._log = logging.getLogger(__name__)
+        self._base_url = base_url.rstrip('/')
+        self._owner, self._name = repo_name.split('/', 1)
+        self._repo_name = repo_name
+        self._test_file_patterns = test_file_patterns or DEFAULT_TEST_FILE_PATTERNS
+        self._transport = transport or HttpTransport()
+        self._headers = {
+            'Authorization': f'bearer {token}',
+            'Accept': 'application/vnd.github+json'
+        }
+        self._etag_cache = OrderedDict()
+        self._etag_cache_size = etag_cache_size
+        self._etag_cache_lock = threading.Lock()
+
+    def is_test_file(self, path: str) -> bool:
+        """Tell whether a changed file is a test file.
+
+        Patterns with a slash are matched against the whole path, the others
+        against the file name only, since fnmatch lets '*' match slashes.
+        """
+        name = PurePosixPath(path).name
+        return any(
+            fnmatch(path if '/' in pattern else name, pattern)
+            for pattern in self._test_file_patterns
+        )
+
+    def query(
+        self,
+        query: str,
+        variables: dict
+    ) -> dict:
+        """Run a GraphQL query.
+
+        Raises:
+            GraphQLError: If the response reports errors.
+        """
+        response = self._transport.post(
+            url=f'{self._base_url}/graphql',
+            client='github',
+            headers=self._headers,
+            json={'query': query, 'variables': variables},
+            idempotent=True
+        )
+        response.raise_for_status()
+        data = response.json()
+        if data.get('errors'):
+            raise GraphQLError('; '.join(error.get('message', str(error)) for error in data['errors']))
+        return data['data']
+
+    def get_rest(
+        self,
+        path: str,
+        params: dict | None = None
+    ) -> dict | list:
+        """Get a REST resource conditionally.
+
+        The ETag of the previous response is sent in If-None-Match. A 304
+        answer is served from the cached body and does not count against the
+        rate limit.
+        """
+        url = f'{self._base_url}{path}'
+        cache_key = (url, tuple(sorted((params or {}).items())))
+        with self._etag_cache_lock:
+            cached = self._etag_cache.get(cache_key)
+            if cached:
+                self._etag_cache.move_to_end(cache_key)
+        headers = dict(self._headers)
+        if cached:
+            headers['If-None-Match'] = cached[0]
+        response = self._transport.get(
+            url=url,
+            client='github',
+            headers=headers,
+            params=params
+        )
+        if response.status_code == 304 and cached:
+            return cached[1]
+        response.raise_for_status()
+        data = response.json()
+        etag = response.headers.get('ETag')
+        if etag:
+            with self._etag_cache_lock:
+                self._etag_cache[cache_key] = (etag, data)
+                self._etag_cache.move_to_end(cache_key)
+                while len(self._etag_cache) > self._etag_cache_size:
+                    self._etag_cache.popitem(last=False)
+        return data
+
+    def get_pull_request_files(self, number: int) -> list[dict]:
+        """Get all changed files of a pull request through the REST API."""
+        files = []
+        page = 1
+        while True:
+            data = self.get_rest(
+                f'/repos/{self._repo_name}/pulls/{number}/files',
+                params={'per_page': 100, 'page': page}
+            )
+            files += [
+                {'path': file['filename'], 'additions': file['additions'], 'deletions': file['deletions']}
+                for file in data
+            ]
+            if len(data) < 100:
+                return files
+            page += 1
+
+    def iter_pull_requests(
+        self,
+        states: list[str] | None = None,
+        updated_since: datetime | None = None,
+        page_size: int = 50,
+        files_page_size: int = 100
+    ) -> Iterator[PullRequestRecord]:
+        """Yield pull requests, most recently updated first.
+
+        Pages are followed by cursor and reading stops at the first pull
+        request updated before updated_since.
+
+        Args:
+            states (list[str] | None): Pull request states, e.g. MERGED. All states by default.
+            updated_since (datetime | None): Timezone aware lower bound of the update time.
+            page_size (int): Pull requests per query, at most 100.
+            files_page_size (int): Changed files read per pull request in the query, at most 100.
+        """
+        cursor = None
+        pages = 0
+        try:
+            while True:
+                data = self.query(
+                    PULL_REQUESTS_QUERY,
+                    {
+                        'owner': self._owner,
+                        'name': self._name,
+                        'states': states,
+                        'pageSize': page_size,
+                        'filesPageSize': files_page_size,
+                        'cursor': cursor
+                    }
+                )
+                pages += 1
+                pull_requests = data['repository']['pullRequests']
+                for pull_request in pull_requests['nodes']:
+                    if updated_since and parse_datetime(pull_request['updatedAt']) < updated_since:
+                        return
+                    files = pull_request['files']['nodes']
+                    if pull_request['files']['totalCount'] > len(files):
+                        files = self.get_pull_request_files(pull_request['number'])
+                    yield PullRequestRecord.from_dict(pull_request, files, self.is_test_file)
+                if not pull_requests['pageInfo']['hasNextPage']:
+                    return
+                cursor = pull_requests['pageInfo']['endCursor']
+                self._log.debug(f"GraphQL rate limit: {data.get('rateLimit')}")
+        finally:
+            self._transport.observe_pages('github', 'iter_pull_requests', pages)
@@ -0,0 +1,194 @@
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+import logging
+import random
+import time
+from typing import TYPE_CHECKING
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from clients.instrumentation import ClientMetrics, get_endpoint_template
+
+if TYPE_CHECKING:
+    from clients.rate_limit import RateLimitBudget
+
+
+IDEMPOTENT_METHODS = frozenset({'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'})
+
+
+class DeadlineExceeded(requests.Timeout):
+    """Raised when a request and its retries do not finish within the total deadline."""
+
+
+class RetryPolicy:
+    def __init__(
+        self,
+        max_retries: int = 3,
+        backoff_factor: float = 0.5,
+        backoff_max: float = 30.0,
+        status_codes: frozenset[int] = frozenset({429, 500, 502, 503, 504})
+    ):
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.backoff_max = backoff_max
+        self.status_codes = status_codes
+
+    def get_backoff(self, attempt: int, retry_after: float | None = None) -> float:
+        """Get delay in seconds before the next attempt.
+
+        Uses the server's Retry-After when it is given, otherwise exponential
+        backoff with full jitter.
+
+        Args:
+            attempt (int): Number of the failed attempt, starting from 0.
+            retry_after (float | None): Delay requested by the server in seconds.
+        """
+        if retry_after is not None:
+            return retry_after
+        return random.uniform(0, min(self.backoff_max, self.backoff_factor * 2 ** attempt))
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Parse a Retry-After header given either in seconds or as an HTTP date."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+class HttpTransport:
+    """Pooled HTTP transport shared by the API clients.
+
+    Keeps a keep-alive connection pool per host, applies a per-call timeout
+    and a total deadline, and retries failed calls according to the retry policy.
+    """
+
+    def __init__(
+        self,
+        pool_size: int = 16,
+        timeout: float = 30.0,
+        total_timeout: float = 120.0,
+        retry_policy: RetryPolicy | None = None,
+        metrics: ClientMetrics | None = None,
+        rate_limit: 'RateLimitBudget | None' = None
+    ):
+        self._log = logging.getLogger(__name__)
+        self._timeout = timeout
+        self._total_timeout = total_timeout
+        self._retry_policy = retry_policy or RetryPolicy()
+        self._metrics = metrics
+        self._rate_limit = rate_limit
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self._session.mount('https://', adapter)
+        self._session.mount('http://', adapter)
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        timeout: float | None = None,
+        total_timeout: float | None = None,
+        idempotent: bool | None = None,
+        client: str = 'unknown',
+        endpoint: str | None = None,
+        **kwargs
+    ) -> requests.Response:
+        """Send a request, retrying on connection errors and retryable statuses.
+
+        Responses with status 429 are always retried. Connection errors and 5xx
+        responses are retried only for idempotent requests.
+
+        Args:
+            method (str): HTTP method.
+            url (str): Request URL.
+            timeout (float | None): Per-call timeout in seconds.
+            total_timeout (float | None): Deadline for all attempts in seconds.
+            idempotent (bool | None): Whether the request is safe to repeat. Defaults by method.
+            client (str): Client name the request is measured under.
+            endpoint (str | None): Endpoint template the request is measured under. Defaults to the templated URL path.
+            **kwargs: Passed to requests.Session.request.
+
+        Returns:
+            requests.Response: Last received response.
+        """
+        method = method.upper()
+        timeout = timeout or self._timeout
+        deadline = time.monotonic() + (total_timeout or self._total_timeout)
+        if idempotent is None:
+            idempotent = method in IDEMPOTENT_METHODS
+        policy = self._retry_policy
+        endpoint = endpoint or get_endpoint_template(url)
+        attempt = 0
+        while True:
+            if self._rate_limit:
+                wait = self._rate_limit.reserve(url, deadline)
+                if wait is None:
+                    raise DeadlineExceeded(f'{method} {url} would exceed the rate limit before the deadline')
+                time.sleep(wait)
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise DeadlineExceeded(f'{method} {url} did not finish before the deadline')
+            started_at = time.monotonic()
+            try:
+                response = self._session.request(
+                    method,
+                    url,
+                    timeout=min(timeout, remaining),
+                    **kwargs
+                )
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if self._metrics:
+                    self._metrics.observe_request(client, endpoint, method, type(e).__name__, time.monotonic() - started_at)
+                if not idempotent or attempt >= policy.max_retries:
+                    raise
+                delay = policy.get_backoff(attempt)
+                self._log.warning(f'{method} {url} failed: {e}. Retrying in {delay:.1f}s')
+            else:
+                if self._rate_limit:
+                    self._rate_limit.update(url, response.headers, response.status_code)
+                if self._metrics:
+                    size = None if kwargs.get('stream') else len(response.content)
+                    self._metrics.observe_request(client, endpoint, method, response.status_code, time.monotonic() - started_at, size)
+                retryable = response.status_code == 429 or (
+                    idempotent and response.status_code in policy.status_codes
+                )
+                if not retryable or attempt >= policy.max_retries:
+                    return response
+                delay = policy.get_backoff(attempt, parse_retry_after(response.headers.get('Retry-After')))
+                if time.monotonic() + delay >= deadline:
+                    return response
+                self._log.warning(f'{method} {url} returned {response.status_code}. Retrying in {delay:.1f}s')
+                response.close()
+            if self._metrics:
+                self._metrics.observe_retry(client, endpoint)
+            time.sleep(delay)
+            attempt += 1
+
+    def observe_pages(self, client: str, call: str, pages: int):
+        """Record the number of pages or chunks one client call requested."""
+        if self._metrics:
+            self._metrics.observe_pages(client, call, pages)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request('POST', url, **kwargs)
+
+    def put(self, url: str, **kwargs) -> requests.Response:
+        return self.request('PUT', url, **kwargs)
+
+    def patch(self, url: str, **kwargs) -> requests.Response:
+        return self.request('PATCH', url, **kwargs)
+
+    def close(self):
+        self._session.close()
@@ -0,0 +1,79 @@
+import re
+from urllib.parse import urlsplit
+
+from prometheus_client import CollectorRegistry, Counter, Histogram
+
+
+# Path segments holding ids or issue keys, e.g. 123 or MRC-123
+_ID_SEGMENT = re.compile(r'^(\d+|[A-Za-z][A-Za-z0-9_]*-\d+)$')
+
+
+def get_endpoint_template(url: str) -> str:
+    """Get the URL path with ids and issue keys replaced by {id}.
+
+    Keeps the number of label values bounded by the number of endpoints.
+    A number right after an api segment is an API version and is kept.
+    """
+    segments = urlsplit(url).path.split('/')
+    return '/'.join(
+        '{id}' if _ID_SEGMENT.match(segment) and previous != 'api' else segment
+        for previous, segment in zip([''] + segments, segments)
+    )
+
+
+class ClientMetrics:
+    """Prometheus metrics of outbound API calls labelled by client and endpoint template."""
+
+    def __init__(self, registry: CollectorRegistry):
+        self.request_duration = Histogram(
+            'api_client_request_duration_seconds',
+            'Duration of outbound API requests',
+            ['client', 'endpoint', 'method'],
+            registry=registry
+        )
+        self.requests = Counter(
+            'api_client_requests',
+            'Number of outbound API requests by response status',
+            ['client', 'endpoint', 'method', 'status'],
+            registry=registry
+        )
+        self.response_size = Histogram(
+            'api_client_response_size_bytes',
+            'Size of API response bodies',
+            ['client', 'endpoint'],
+            buckets=(256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216),
+            registry=registry
+        )
+        self.retries = Counter(
+            'api_client_retries',
+            'Number of retried API requests',
+            ['client', 'endpoint'],
+            registry=registry
+        )
+        self.pages = Histogram(
+            'api_client_pages_per_call',
+            'Number of pages or chunks requested by one client call',
+            ['client', 'call'],
+            buckets=(1, 2, 5, 10, 20, 50, 100, 200, 500),
+            registry=registry
+        )
+
+    def observe_request(
+        self,
+        client: str,
+        endpoint: str,
+        method: str,
+        status: int | str,
+        duration: float,
+        size: int | None = None
+    ):
+        self.request_duration.labels(client, endpoint, method).observe(duration)
+        self.requests.labels(client, endpoint, method, str(status)).inc()
+        if size is not None:
+            self.response_size.labels(client, endpoint).observe(size)
+
+    def observe_retry(self, client: str, endpoint: str):
+        self.retries.labels(client, endpoint).inc()
+
+    def observe_pages(self, client: str, call: str, pages: int):
+        self.pages.labels(client, call).observe(pages)
@@ -1,10 +1,17 @@
+from concurrent.futures import ThreadPoolExecutor
 from enum import Enum
 import json
 import logging
+import math
+import time
 
 import requests
 from requests.auth import HTTPBasicAuth
 
+from clients.http_transport import HttpTransport
+from clients.pagination import iter_prefetched_pages
+from clients.records import IssueRecord
+
 # Jira API documentation: https://developer.atlassian.com/cloud/jira/platform/rest/v2/
 
 
@@ -42,16 +49,25 @@ class CustomField(Enum):
     TEST_CASE_KEY = 'customfield_10341'
 
 
+# Fields requested by get_all_issues unless the caller asks for others.
+# Use fields=['*all'] to get every field.
+DEFAULT_ISSUE_FIELDS = ['summary', 'status', 'labels']
+
+
 class JiraAPI:
     def __init__(
         self,
         base_url: str,
         email: str,
-        api_token: str
+        api_token: str,
+        max_workers: int = 8,
+        transport: HttpTransport | None = None
     ):
         self._log = logging.getLogger(__name__)
         self._base_url = base_url
         self._email = email
+        self._max_workers = max_workers
+        self._transport = transport or HttpTransport()
         self._auth = HTTPBasicAuth(email, api_token)
         self._headers = {
             'Accept': 'application/json',
@@ -68,8 +84,9 @@ class JiraAPI:
         params = {}
         if fields:
             params['fields'] = fields
-        response = requests.get(
-            url=url, 
+        response = self._transport.get(
+            url=url,
+            client='jira',
             params=params,
             headers=self._headers,
             auth=self._auth
@@ -83,7 +100,8 @@ class JiraAPI:
         jql: str,
         max_results: int = 15,
         start_at: int = 0,
-        fields: list[str] = None
+        fields: list[str] = None,
+        validate_query: str | None = None
     ):
         self._log.info(f"Fetching issues: {jql}")
         url = f'{self._base_url}/rest/api/2/search'
@@ -94,11 +112,15 @@ class JiraAPI:
         }
         if fields:
             payload['fields'] = fields
-        response = requests.post(
-            url=url, 
+        if validate_query:
+            payload['validateQuery'] = validate_query
+        response = self._transport.post(
+            url=url,
+            client='jira',
             headers=self._headers, 
             data=json.dumps(payload), 
-            auth=self._auth
+            auth=self._auth,
+            idempotent=True
         )
         response.raise_for_status()
         data = response.json()
@@ -114,15 +136,165 @@ class JiraAPI:
     def get_all_issues(
         self,
         jql: str,
-        fields: list[str] = None
+        fields: list[str] | None = None,
+        extra_fields: list[str] | None = None,
+        max_results: int = 1000,
+        validate_query: str | None = None,
+        compact: bool = False
     ):
+        """Get all issues matching the JQL.
+
+        The total comes from the first page, which is requested with
+        max_results and answered with the largest page size the server allows.
+        The remaining pages are fetched concurrently with that page size.
+
+        Args:
+            jql (str): JQL query.
+            fields (list[str] | None): Fields to return. Defaults to DEFAULT_ISSUE_FIELDS.
+            extra_fields (list[str] | None): Fields to add to the default projection.
+            max_results (int): Requested page size.
+            validate_query (str | None): JQL validation mode: strict, warn or none.
+            compact (bool): Return IssueRecord objects instead of raw issues.
+        """
         self._log.info(f"Fetching all issues: {jql}")
-        total = self.get_total_issues(jql)
-        results_per_page = 50
-        issues = []
-        for start_at in range(0, total, results_per_page):
-            issues.extend(self.get_issues(jql, results_per_page, start_at, fields)['issues'])
+        fields = list(fields or DEFAULT_ISSUE_FIELDS) + list(extra_fields or [])
+        first_page = self.get_issues(jql, max_results, 0, fields, validate_query)
+        issues = decode_issues(first_page['issues'], compact)
+        total = first_page['total']
+        results_per_page = first_page['maxResults']
+        start_ats = range(results_per_page, total, results_per_page) if results_per_page else []
+        self._transport.observe_pages('jira', 'get_all_issues', len(start_ats) + 1)
+        if not start_ats:
+            return issues
+
+        def get_page(start_at: int) -> list:
+            return decode_issues(self.get_issues(jql, results_per_page, start_at, fields, validate_query)['issues'], compact)
+
+        with ThreadPoolExecutor(max_workers=self._max_workers) as executor:
+            for page in executor.map(get_page, start_ats):
+                issues.extend(page)
         return issues
+
+    def iter_all_issues(
+        self,
+        jql: str,
+        fields: list[str] | None = None,
+        extra_fields: list[str] | None = None,
+        max_results: int = 1000,
+        prefetch: int = 1,
+        compact: bool = False
+    ):
+        """Yield all issues matching the JQL page by page.
+
+        Streaming counterpart of get_all_issues: the next pages are read ahead
+        in the background and only prefetch + 1 pages are held at a time.
+
+        Args:
+            jql (str): JQL query.
+            fields (list[str] | None): Fields to return. Defaults to DEFAULT_ISSUE_FIELDS.
+            extra_fields (list[str] | None): Fields to add to the default projection.
+            max_results (int): Requested page size.
+            prefetch (int): Number of pages to read ahead.
+            compact (bool): Yield IssueRecord objects instead of raw issues.
+        """
+        self._log.info(f"Streaming all issues: {jql}")
+        fields = list(fields or DEFAULT_ISSUE_FIELDS) + list(extra_fields or [])
+        first_page = self.get_issues(jql, max_results, 0, fields)
+        results_per_page = first_page['maxResults']
+        start_ats = range(results_per_page, first_page['total'], results_per_page) if results_per_page else []
+        self._transport.observe_pages('jira', 'iter_all_issues', len(start_ats) + 1)
+        yield from decode_issues(first_page['issues'], compact)
+        del first_page
+        for issues in iter_prefetched_pages(
+            lambda start_at: decode_issues(self.get_issues(jql, results_per_page, start_at, fields)['issues'], compact),
+            start_ats,
+            prefetch
+        ):
+            yield from issues
+
+    def get_updated_issues(
+        self,
+        jql: str,
+        since: float,
+        fields: list[str] | None = None,
+        extra_fields: list[str] | None = None,
+        overlap: float = 300
+    ):
+        """Get issues matching the JQL that were updated since a moment.
+
+        The moment is converted to a relative `updated >= "-Nm"` clause, which
+        does not depend on the timezone of the Jira user. The overlap widens the
+        window to cover clock skew and JQL's minute precision.
+
+        Args:
+            jql (str): JQL query.
+            since (float): Unix timestamp of the previous sync.
+            fields (list[str] | None): Fields to return. Defaults to DEFAULT_ISSUE_FIELDS.
+            extra_fields (list[str] | None): Fields to add to the default projection.
+            overlap (float): Seconds added to the window.
+        """
+        minutes = max(1, math.ceil((time.time() - since + overlap) / 60))
+        return self.get_all_issues(
+            f'({jql}) AND updated >= "-{minutes}m"',
+            fields=fields,
+            extra_fields=extra_fields
+        )
+
+    def get_issues_by_keys(
+        self,
+        issue_keys: list[str],
+        fields: list[str] | None = None,
+        extra_fields: list[str] | None = None,
+        chunk_size: int = 100,
+        compact: bool = False
+    ) -> tuple[list, list[str]]:
+        """Get issues by key with chunked `key in (...)` searches.
+
+        Duplicate keys are removed and the chunks are searched concurrently.
+        Keys that do not exist are reported instead of failing the search, and
+        a chunk rejected as invalid JQL reports all of its keys.
+
+        Args:
+            issue_keys (list[str]): Issue keys.
+            fields (list[str] | None): Fields to return. Defaults to DEFAULT_ISSUE_FIELDS.
+            extra_fields (list[str] | None): Fields to add to the default projection.
+            chunk_size (int): Number of keys per search.
+            compact (bool): Return IssueRecord objects instead of raw issues.
+
+        Returns:
+            tuple[list, list[str]]: Found issues and keys that did not resolve.
+        """
+        issue_keys = list(dict.fromkeys(key.strip() for key in issue_keys if key.strip()))
+        self._log.info(f"Fetching {len(issue_keys)} issues by key")
+        chunks = [
+            issue_keys[i:i + chunk_size]
+            for i in range(0, len(issue_keys), chunk_size)
+        ]
+        self._transport.observe_pages('jira', 'get_issues_by_keys', len(chunks))
+
+        def get_chunk(chunk: list[str]) -> list:
+            try:
+                return self.get_all_issues(
+                    f'key in ({",".join(chunk)})',
+                    fields=fields,
+                    extra_fields=extra_fields,
+                    max_results=len(chunk),
+                    validate_query='warn',
+                    compact=compact
+                )
+            except requests.HTTPError as e:
+                if e.response is None or e.response.status_code != 400:
+                    raise
+                self._log.warning(f"Search for keys {chunk} was rejected: {e.response.text}")
+                return []
+
+        issues = []
+        with ThreadPoolExecutor(max_workers=self._max_workers) as executor:
+            for chunk_issues in executor.map(get_chunk, chunks):
+                issues.extend(chunk_issues)
+        found_keys = {issue['key'] for issue in issues}
+        unresolved_keys = [key for key in issue_keys if key not in found_keys]
+        return issues, unresolved_keys
     
     def create_issue(
         self,
@@ -157,8 +329,9 @@ class JiraAPI:
                 str(custom_field.value): value
                 for custom_field, value in custom_fields.items()
             })
-        response = requests.post(
-            url=url, 
+        response = self._transport.post(
+            url=url,
+            client='jira',
             headers=self._headers, 
             data=json.dumps(payload), 
             auth=self._auth
@@ -173,8 +346,9 @@ class JiraAPI:
     ):
         self._log.info(f"Fetching watchers for issue: {issue_key}")
         url = f'{self._base_url}/rest/api/2/issue/{issue_key}/watchers'
-        response = requests.get(
-            url=url, 
+        response = self._transport.get(
+            url=url,
+            client='jira',
             headers=self._headers,
             auth=self._auth
         )
@@ -195,8 +369,9 @@ class JiraAPI:
         """
         self._log.info(f"Adding issue watcher: {watcher_id}")
         url = f'{self._base_url}/rest/api/2/issue/{issue_key}/watchers'
-        response = requests.post(
-            url=url, 
+        response = self._transport.post(
+            url=url,
+            client='jira',
             headers=self._headers, 
             data=json.dumps(watcher_id), 
             auth=self._auth
@@ -224,8 +399,9 @@ class JiraAPI:
             "inwardIssue": { "key": inward_issue_key },
             "outwardIssue": { "key": outward_issue_key }
         }
-        response = requests.post(
-            url=url, 
+        response = self._transport.post(
+            url=url,
+            client='jira',
             headers=self._headers, 
             data=json.dumps(payload), 
             auth=self._auth
@@ -239,8 +415,9 @@ class JiraAPI:
     ):
         self._log.info(f"Fetching issue transitions: {issue_key}")
         url = f'{self._base_url}/rest/api/2/issue/{issue_key}/transitions'
-        response = requests.get(
-            url=url, 
+        response = self._transport.get(
+            url=url,
+            client='jira',
             headers=self._headers,
             auth=self._auth
         )
@@ -258,8 +435,9 @@ class JiraAPI:
         payload = {
             "transition": { "id": status.value }
         }
-        response = requests.post(
-            url=url, 
+        response = self._transport.post(
+            url=url,
+            client='jira',
             headers=self._headers, 
             data=json.dumps(payload), 
             auth=self._auth
@@ -277,8 +455,9 @@ class JiraAPI:
         payload = {
             "body": comment
         }
-        response = requests.post(
-            url=url, 
+        response = self._transport.post(
+            url=url,
+            client='jira',
             headers=self._headers, 
             data=json.dumps(payload), 
             auth=self._auth
@@ -299,8 +478,9 @@ class JiraAPI:
             payload['fields']['summary'] = summary
         if description:
             payload['fields']['description'] = description
-        response = requests.put(
-            url=url, 
+        response = self._transport.put(
+            url=url,
+            client='jira',
             headers=self._headers, 
             data=json.dumps(payload), 
             auth=self._auth
@@ -317,8 +497,9 @@ class JiraAPI:
         params = {
             'issueIdsOrKeys': issue_ids_or_keys
         }
-        response = requests.get(
-            url=url, 
+        response = self._transport.get(
+            url=url,
+            client='jira',
             params=params,
             headers=self._headers,
             auth=self._auth
@@ -329,16 +510,133 @@ class JiraAPI:
     
     def get_changelogs(
         self,
-        issue_key: str
+        issue_key: str,
+        start_at: int = 0,
+        max_results: int = 100
     ):
         self._log.info(f"Fetching changelogs for issue: {issue_key}")
         url = f'{self._base_url}/rest/api/2/issue/{issue_key}/changelog'
-        response = requests.get(
-            url=url, 
+        params = {
+            'startAt': start_at,
+            'maxResults': max_results
+        }
+        response = self._transport.get(
+            url=url,
+            client='jira',
+            params=params,
             headers=self._headers,
             auth=self._auth
         )
         response.raise_for_status()
         data = response.json()
         return data
-        
\ No newline at end of file
+
+    def get_all_changelogs(
+        self,
+        issue_key: str,
+        field_ids: list[str] | None = None
+    ) -> list:
+        """Get the full changelog of an issue following its pagination.
+
+        Args:
+            issue_key (str): Issue key.
+            field_ids (list[str] | None): Keep only histories changing these fields.
+        """
+        histories = []
+        start_at = 0
+        pages = 0
+        while True:
+            data = self.get_changelogs(issue_key, start_at)
+            pages += 1
+            histories.extend(filter_changelog(data['values'], field_ids))
+            start_at += len(data['values'])
+            if data.get('isLast', True) or not data['values']:
+                self._transport.observe_pages('jira', 'get_all_changelogs', pages)
+                return histories
+
+    def get_bulk_changelogs(
+        self,
+        issue_ids_or_keys: list[str],
+        field_ids: list[str] | None = None,
+        chunk_size: int = 1000
+    ) -> dict[str, list]:
+        """Get changelogs of many issues with the bulk fetch endpoint.
+
+        Issues are sent in chunks of up to 1000 per request, the chunks run
+        concurrently and each chunk follows nextPageToken to the last page.
+        Histories are filtered to field_ids page by page as they arrive.
+
+        Args:
+            issue_ids_or_keys (list[str]): Issue IDs or keys.
+            field_ids (list[str] | None): Keep only histories changing these fields.
+            chunk_size (int): Number of issues per request, at most 1000.
+
+        Returns:
+            dict[str, list]: Change histories by issue ID, oldest first.
+        """
+        self._log.info(f"Fetching changelogs for {len(issue_ids_or_keys)} issues")
+        url = f'{self._base_url}/rest/api/3/changelog/bulkfetch'
+
+        def get_chunk(chunk: list[str]) -> tuple[dict[str, list], int]:
+            changelogs = {}
+            pages = 0
+            payload = {
+                'issueIdsOrKeys': chunk,
+                'maxResults': 1000
+            }
+            if field_ids:
+                payload['fieldIds'] = field_ids
+            while True:
+                response = self._transport.post(
+                    url=url,
+                    client='jira',
+                    headers=self._headers,
+                    data=json.dumps(payload),
+                    auth=self._auth,
+                    idempotent=True
+                )
+                pages += 1
+                response.raise_for_status()
+                data = response.json()
+                for issue_changelog in data['issueChangeLogs']:
+                    changelogs.setdefault(issue_changelog['issueId'], []).extend(
+                        filter_changelog(issue_changelog['changeHistories'], field_ids)
+                    )
+                if not data.get('nextPageToken'):
+                    for histories in changelogs.values():
+                        histories.sort(key=lambda history: int(history['id']))
+                    return changelogs, pages
+                payload['nextPageToken'] = data['nextPageToken']
+
+        chunks = [
+            issue_ids_or_keys[i:i + chunk_size]
+            for i in range(0, len(issue_ids_or_keys), chunk_size)
+        ]
+        changelogs = {}
+        total_pages = 0
+        with ThreadPoolExecutor(max_workers=self._max_workers) as executor:
+            for chunk_changelogs, pages in executor.map(get_chunk, chunks):
+                changelogs.update(chunk_changelogs)
+                total_pages += pages
+        self._transport.observe_pages('jira', 'get_bulk_changelogs', total_pages)
+        return changelogs
+
+
+def decode_issues(
+    issues: list,
+    compact: bool
+) -> list:
+    return [IssueRecord.from_dict(issue) for issue in issues] if compact else list(issues)
+
+
+def filter_changelog(
+    histories: list,
+    field_ids: list[str] | None = None
+) -> list:
+    """Keep only change histories with an item changing one of field_ids."""
+    if not field_ids:
+        return list(histories)
+    return [
+        history for history in histories
+        if any(item['field'] in field_ids or item.get('fieldId') in field_ids for item in history['items'])
+    ]
@@ -0,0 +1,34 @@
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, Iterator
+
+
+def iter_prefetched_pages(
+    get_page: Callable[[int], list],
+    offsets: Iterable[int],
+    prefetch: int = 1
+) -> Iterator[list]:
+    """Yield pages in offset order while the next ones are fetched in the background.
+
+    At most prefetch pages are requested ahead of the one being consumed, so
+    memory stays bounded by the page size. Pending requests are cancelled when
+    the consumer stops early.
+
+    Args:
+        get_page (Callable[[int], list]): Fetches the items of the page at an offset.
+        offsets (Iterable[int]): Page offsets in order.
+        prefetch (int): Number of pages to read ahead.
+    """
+    offsets = iter(offsets)
+    with ThreadPoolExecutor(max_workers=max(1, prefetch)) as executor:
+        pending = deque(executor.submit(get_page, offset) for _, offset in zip(range(max(1, prefetch)), offsets))
+        try:
+            while pending:
+                page = pending.popleft().result()
+                next_offset = next(offsets, None)
+                if next_offset is not None:
+                    pending.append(executor.submit(get_page, next_offset))
+                yield page
+        finally:
+            for future in pending:
+                future.cancel()
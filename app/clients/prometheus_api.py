@@ -1,10 +1,236 @@
-import requests
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import copy
+import math
+import threading
+import time
+
+import numpy as np
+
+from clients.http_transport import HttpTransport
+
+# Prometheus HTTP API documentation: https://prometheus.io/docs/prometheus/latest/querying/api/
+
+
+class Series:
+    """Samples of one series as parallel timestamp and value arrays."""
+    __slots__ = ('labels', 'timestamps', 'values')
+
+    def __init__(
+        self,
+        labels: dict[str, str],
+        timestamps: np.ndarray,
+        values: np.ndarray
+    ):
+        self.labels = labels
+        self.timestamps = timestamps
+        self.values = values
+
+    def __repr__(self) -> str:
+        return f'Series(labels={self.labels!r}, samples={len(self.values)})'
+
+
+def decode_result(data: dict) -> list[Series]:
+    """Decode a vector or matrix query result into arrays.
+
+    Timestamps are datetime64[ms] and values float64, NaN and infinities
+    included. Each series is converted in one call instead of one dict and
+    one float per sample.
+
+    Args:
+        data (dict): data of a query or query_range response.
+    """
+    result_type = data['resultType']
+    if result_type not in ('vector', 'matrix'):
+        raise ValueError(f'Cannot decode {result_type} result')
+    series = []
+    for item in data['result']:
+        samples = [item['value']] if result_type == 'vector' else item['values']
+        samples = np.array(samples, dtype=np.float64).reshape(-1, 2)
+        series.append(Series(
+            labels=dict(item['metric']),
+            timestamps=(samples[:, 0] * 1000).astype('datetime64[ms]'),
+            values=samples[:, 1]
+        ))
+    return series
+
+
+def merge_matrices(chunks: list[dict]) -> dict:
+    """Join matrix results of consecutive ranges series by series."""
+    series_by_labels = {}
+    for chunk in chunks:
+        for item in chunk['result']:
+            labels = tuple(sorted(item['metric'].items()))
+            if labels not in series_by_labels:
+                series_by_labels[labels] = {'metric': item['metric'], 'values': []}
+            series_by_labels[labels]['values'].extend(item['values'])
+    return {'resultType': 'matrix', 'result': list(series_by_labels.values())}
+
+
+def align_range(
+    start: float,
+    end: float,
+    step: float
+) -> tuple[float, float]:
+    """Align a range to multiples of the step.
+
+    Requests for the same query and step then share the evaluation
+    timestamps, so results can be cached and reused.
+    """
+    return math.floor(start / step) * step, math.floor(end / step) * step
 
 
 class PrometheusAPI:
-    def __init__(self, base_url: str):
+    def __init__(
+        self,
+        base_url: str,
+        transport: HttpTransport | None = None,
+        max_workers: int = 8,
+        cache_size: int = 256,
+        max_points: int = 10000
+    ):
         self.base_url = base_url
+        self._transport = transport or HttpTransport()
+        self._max_workers = max_workers
+        self._max_points = max_points
+        self._cache_size = cache_size
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
 
     def get_metrics(self, query: str) -> dict:
-        response = requests.get(f"{self.base_url}/api/v1/query", params={"query": query})
+        response = self._transport.get(f"{self.base_url}/api/v1/query", params={"query": query}, client="prometheus")
         return response.json()
+
+    def query(
+        self,
+        query: str,
+        evaluation_time: float | None = None,
+        decode: bool = False
+    ) -> dict | list[Series]:
+        """Evaluate an instant query.
+
+        Args:
+            query (str): PromQL expression.
+            evaluation_time (float | None): Unix time of the evaluation, now by default.
+            decode (bool): Return Series arrays instead of the raw result data.
+        """
+        params = {'query': query}
+        if evaluation_time is not None:
+            params['time'] = evaluation_time
+        response = self._transport.get(
+            url=f'{self.base_url}/api/v1/query',
+            client='prometheus',
+            params=params
+        )
+        response.raise_for_status()
+        data = response.json()['data']
+        return decode_result(data) if decode else data
+
+    def query_range(
+        self,
+        query: str,
+        start: float,
+        end: float,
+        step: float,
+        decode: bool = False
+    ) -> dict | list[Series]:
+        """Evaluate a range query over a step aligned range.
+
+        Prometheus returns at most 11000 points per series, so long ranges are
+        split into chunks of max_points steps aligned to multiples of the
+        chunk span. Chunks are fetched concurrently and cached by query, step
+        and range, so overlapping reports reuse them. A chunk whose end is not
+        older than one step may still change and is not cached. Results are
+        copies, so callers may modify them without touching the cache.
+
+        Args:
+            query (str): PromQL expression.
+            start (float): Unix time of the range start.
+            end (float): Unix time of the range end.
+            step (float): Resolution in seconds.
+            decode (bool): Return Series arrays instead of the raw result data.
+        """
+        return self.query_range_batch([query], start, end, step, decode)[0]
+
+    def _get_chunks(
+        self,
+        start: float,
+        end: float,
+        step: float
+    ) -> list[tuple[float, float]]:
+        span = step * self._max_points
+        chunks = []
+        chunk_start = math.floor(start / span) * span
+        while chunk_start <= end:
+            chunks.append((max(start, chunk_start), min(end, chunk_start + span - step)))
+            chunk_start += span
+        return chunks
+
+    def _query_range_chunk(
+        self,
+        query: str,
+        step: float,
+        start: float,
+        end: float
+    ) -> dict:
+        cache_key = (query, step, start, end)
+        with self._cache_lock:
+            data = self._cache.get(cache_key)
+            if data is not None:
+                self._cache.move_to_end(cache_key)
+                return data
+        response = self._transport.post(
+            url=f'{self.base_url}/api/v1/query_range',
+            client='prometheus',
+            data={'query': query, 'start': start, 'end': end, 'step': step},
+            idempotent=True
+        )
+        response.raise_for_status()
+        data = response.json()['data']
+        if end < time.time() - step:
+            with self._cache_lock:
+                self._cache[cache_key] = data
+                while len(self._cache) > self._cache_size:
+                    self._cache.popitem(last=False)
+        return data
+
+    def query_batch(
+        self,
+        queries: list[str],
+        evaluation_time: float | None = None,
+        decode: bool = False
+    ) -> list:
+        """Evaluate instant queries concurrently, results are in query order."""
+        with ThreadPoolExecutor(max_workers=self._max_workers) as executor:
+            return list(executor.map(lambda query: self.query(query, evaluation_time, decode), queries))
+
+    def query_range_batch(
+        self,
+        queries: list[str],
+        start: float,
+        end: float,
+        step: float,
+        decode: bool = False
+    ) -> list:
+        """Evaluate range queries over the same range concurrently, results are in query order.
+
+        The chunks of every query share one thread pool, so at most
+        max_workers requests are in flight.
+        """
+        start, end = align_range(start, end, step)
+        chunks = self._get_chunks(start, end, step)
+        requests = [(query, chunk) for query in queries for chunk in chunks]
+        if len(requests) == 1:
+            chunk_data = [self._query_range_chunk(queries[0], step, *chunks[0])]
+        else:
+            with ThreadPoolExecutor(max_workers=self._max_workers) as executor:
+                chunk_data = list(executor.map(
+                    lambda request: self._query_range_chunk(request[0], step, *request[1]),
+                    requests
+                ))
+        results = []
+        for i in range(len(queries)):
+            query_chunks = chunk_data[i * len(chunks):(i + 1) * len(chunks)]
+            data = query_chunks[0] if len(query_chunks) == 1 else merge_matrices(query_chunks)
+            results.append(decode_result(data) if decode else copy.deepcopy(data))
+        return results
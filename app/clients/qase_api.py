@@ -1,6 +1,11 @@
+from concurrent.futures import ThreadPoolExecutor
 from enum import Enum
+import hashlib
 import logging
-import requests
+
+from clients.http_transport import HttpTransport
+from clients.pagination import iter_prefetched_pages
+from clients.records import TestCaseRecord
 
 # Qase API documentation: https://developers.qase.io/reference/
 
@@ -9,8 +14,11 @@ class CustomField(Enum):
     AUTOMATION_TASK = 5
     MANUAL_EXECUTION_TIME = 6
     
-    def get_value(self, test_case: dict) -> str:
-        for custom_field in test_case['custom_fields']:
+    def get_value(self, test_case: dict | TestCaseRecord) -> str:
+        custom_fields = test_case['custom_fields']
+        if isinstance(custom_fields, dict):
+            return custom_fields.get(self.value, '')
+        for custom_field in custom_fields:
             if custom_field['id'] == self.value:
                 return custom_field['value']
         return ''
@@ -18,8 +26,34 @@ class CustomField(Enum):
 
 class AutomationStatus(Enum):
     MANUAL = 0
+    TO_BE_AUTOMATED = 1
     AUTOMATED = 2
-    
+
+
+# Case list filter values and the ids the API returns for them in case entities
+CASE_TYPE_IDS = {
+    'other': 1,
+    'functional': 2,
+    'smoke': 3,
+    'regression': 4,
+    'security': 5,
+    'usability': 6,
+    'performance': 7,
+    'acceptance': 8,
+    'compatibility': 9,
+    'integration': 10,
+    'exploratory': 11
+}
+CASE_STATUS_IDS = {
+    'actual': 0,
+    'draft': 1,
+    'deprecated': 2
+}
+CASE_AUTOMATION_IDS = {
+    'is-not-automated': AutomationStatus.MANUAL.value,
+    'to-be-automated': AutomationStatus.TO_BE_AUTOMATED.value,
+    'automated': AutomationStatus.AUTOMATED.value
+}
 
 
 class QaseAPI:
@@ -27,12 +61,16 @@ class QaseAPI:
         self,
         base_url: str,
         api_token: str,
-        project_code: str
+        project_code: str,
+        max_workers: int = 8,
+        transport: HttpTransport | None = None
     ):
         self._log = logging.getLogger(__name__)
         self._base_url = base_url
         self._api_token = api_token
         self._project_code = project_code
+        self._max_workers = max_workers
+        self._transport = transport or HttpTransport()
         self._headers = {
             'Token': self._api_token,
             'Content-Type': 'application/json'
@@ -41,21 +79,66 @@ class QaseAPI:
     def _get_test_run_results(
             self,
             max_results: int = 10,
-            start_result: int = 0
+            start_result: int = 0,
+            from_end_time: str | None = None,
+            to_end_time: str | None = None
     ) -> dict:
         url = f'{self._base_url}/v1/result/{self._project_code}'
         params = {
             "limit": str(max_results),
             "offset": str(start_result)
         }
-        response = requests.get(
-            url=url, 
+        if from_end_time:
+            params['from_end_time'] = from_end_time
+        if to_end_time:
+            params['to_end_time'] = to_end_time
+        response = self._transport.get(
+            url=url,
+            client='qase',
             headers=self._headers, 
             params=params
         )
         response.raise_for_status()
         data = response.json()
         return data
+
+    def iter_test_run_result_pages(
+        self,
+        from_end_time: str | None = None,
+        to_end_time: str | None = None,
+        start_result: int = 0,
+        max_results: int = 100,
+        prefetch: int = 4
+    ):
+        """Yield pages of test run results that ended within a window.
+
+        The first page gives the number of results, the next pages are read
+        ahead prefetch at a time in the background. Each page comes with the
+        offset of the page after it, so a consumer can store it as a cursor
+        and resume there. The window needs a fixed end, otherwise new results
+        shift the offsets.
+
+        Args:
+            from_end_time (str | None): Window start as 'YYYY-MM-DD HH:MM:SS' in UTC.
+            to_end_time (str | None): Window end as 'YYYY-MM-DD HH:MM:SS' in UTC.
+            start_result (int): Offset of the first page.
+            max_results (int): Page size, at most 100.
+            prefetch (int): Number of pages read ahead.
+
+        Yields:
+            tuple[int, list[dict]]: Offset of the next page and the results of the page.
+        """
+        def get_page(offset: int) -> list[dict]:
+            data = self._get_test_run_results(max_results, offset, from_end_time, to_end_time)
+            return data['result']['entities']
+
+        first_page = self._get_test_run_results(max_results, start_result, from_end_time, to_end_time)
+        offsets = range(start_result + max_results, first_page['result']['filtered'], max_results)
+        self._transport.observe_pages('qase', 'iter_test_run_result_pages', len(offsets) + 1)
+        yield start_result + max_results, first_page['result']['entities']
+        del first_page
+        for offset, entities in zip(offsets, iter_prefetched_pages(get_page, offsets, prefetch)):
+            yield offset + max_results, entities
     
     def _get_test_cases(
         self,
@@ -76,8 +159,9 @@ class QaseAPI:
             params['status'] = status
         if automation:
             params['automation'] = automation
-        response = requests.get(
-            url=url, 
+        response = self._transport.get(
+            url=url,
+            client='qase',
             headers=self._headers, 
             params=params
         )
@@ -90,16 +174,30 @@ class QaseAPI:
         type: str | None = None,
         status: str | None = None,
         automation: str | None = None,
+        compact: bool = False
     ) -> list:
+        """Get all test cases matching the filters.
+
+        The first page doubles as the probe for the total number of test cases,
+        the remaining pages are fetched concurrently and merged in offset order.
+        With compact=True TestCaseRecord objects are returned instead of raw test cases.
+        """
         max_results = 100
-        start_result = 0
-        number_of_test_cases = self.get_number_of_test_cases(
+        first_page = self._get_test_cases(
             type=type,
             status=status,
-            automation=automation
+            automation=automation,
+            max_results=max_results,
+            start_result=0
         )
-        all_test_cases = []
-        while start_result < number_of_test_cases:
+        number_of_test_cases = first_page['result']['filtered']
+        all_test_cases = decode_test_cases(first_page['result']['entities'], compact)
+        offsets = range(max_results, number_of_test_cases, max_results)
+        self._transport.observe_pages('qase', 'get_all_test_cases', len(offsets) + 1)
+        if not offsets:
+            return all_test_cases
+
+        def get_page(start_result: int) -> list:
             data = self._get_test_cases(
                 type=type,
                 status=status,
@@ -107,10 +205,111 @@ class QaseAPI:
                 max_results=max_results,
                 start_result=start_result
             )
-            all_test_cases += data['result']['entities']
-            start_result += max_results
+            return decode_test_cases(data['result']['entities'], compact)
+
+        with ThreadPoolExecutor(max_workers=self._max_workers) as executor:
+            for entities in executor.map(get_page, offsets):
+                all_test_cases += entities
         return all_test_cases
     
+    def iter_all_test_cases(
+        self,
+        type: str | None = None,
+        status: str | None = None,
+        automation: str | None = None,
+        prefetch: int = 1,
+        compact: bool = False
+    ):
+        """Yield all test cases matching the filters page by page.
+
+        Streaming counterpart of get_all_test_cases: the next pages are read
+        ahead in the background and only prefetch + 1 pages are held at a time.
+        With compact=True TestCaseRecord objects are yielded instead of raw test cases.
+        """
+        max_results = 100
+
+        def get_page(start_result: int) -> list:
+            data = self._get_test_cases(
+                type=type,
+                status=status,
+                automation=automation,
+                max_results=max_results,
+                start_result=start_result
+            )
+            return data['result']
+
+        first_page = get_page(0)
+        offsets = range(max_results, first_page['filtered'], max_results)
+        self._transport.observe_pages('qase', 'iter_all_test_cases', len(offsets) + 1)
+        yield from decode_test_cases(first_page['entities'], compact)
+        del first_page
+        for page in iter_prefetched_pages(get_page, offsets, prefetch):
+            yield from decode_test_cases(page['entities'], compact)
+
+    def _get_test_cases_page(
+        self,
+        max_results: int,
+        start_result: int,
+        etag: str | None = None
+    ) -> dict:
+        """Get an unfiltered page of test cases, conditionally when an ETag is given.
+
+        Returns:
+            dict: offset, etag, hash of the body and data, which is None when the page is not modified.
+        """
+        url = f'{self._base_url}/v1/case/{self._project_code}'
+        params = {
+            "limit": str(max_results),
+            "offset": str(start_result)
+        }
+        headers = dict(self._headers)
+        if etag:
+            headers['If-None-Match'] = etag
+        response = self._transport.get(
+            url=url,
+            client='qase',
+            headers=headers,
+            params=params
+        )
+        if response.status_code == 304:
+            return {'offset': start_result, 'etag': etag, 'hash': None, 'data': None}
+        response.raise_for_status()
+        return {
+            'offset': start_result,
+            'etag': response.headers.get('ETag'),
+            'hash': hashlib.sha256(response.content).hexdigest(),
+            'data': response.json()
+        }
+
+    def get_all_test_case_pages(
+        self,
+        etags: dict[int, str] | None = None,
+        max_results: int = 100
+    ) -> list[dict]:
+        """Get all unfiltered pages of test cases for a delta refresh.
+
+        The first page gives the total, the remaining pages are fetched
+        concurrently with If-None-Match when an ETag of the page is known.
+
+        Args:
+            etags (dict[int, str] | None): ETags of previously fetched pages by offset.
+            max_results (int): Page size.
+
+        Returns:
+            list[dict]: Pages in offset order, see _get_test_cases_page.
+        """
+        etags = etags or {}
+        first_page = self._get_test_cases_page(max_results, 0)
+        offsets = range(max_results, first_page['data']['result']['filtered'], max_results)
+        self._transport.observe_pages('qase', 'get_all_test_case_pages', len(offsets) + 1)
+        pages = [first_page]
+        with ThreadPoolExecutor(max_workers=self._max_workers) as executor:
+            pages += executor.map(
+                lambda offset: self._get_test_cases_page(max_results, offset, etags.get(offset)),
+                offsets
+            )
+        return pages
+
     def get_number_of_test_cases(
         self,
         type: str | None = None,
@@ -130,8 +329,9 @@ class QaseAPI:
         case_id: int
     ) -> dict:
         url = f'{self._base_url}/v1/case/{self._project_code}/{case_id}'
-        response = requests.get(
-            url=url, 
+        response = self._transport.get(
+            url=url,
+            client='qase',
             headers=self._headers
         )
         response.raise_for_status()
@@ -149,10 +349,18 @@ class QaseAPI:
                 str(custom_field.value): value
                 for custom_field, value in custom_fields.items()
             }
-        response = requests.patch(
-            url=url, 
+        response = self._transport.patch(
+            url=url,
+            client='qase',
             headers=self._headers, 
             json=payload
         )
         response.raise_for_status()
         return response.json()
+
+
+def decode_test_cases(
+    test_cases: list,
+    compact: bool
+) -> list:
+    return [TestCaseRecord.from_dict(test_case) for test_case in test_cases] if compact else list(test_cases)
@@ -0,0 +1,172 @@
+from datetime import datetime
+import logging
+import threading
+import time
+from urllib.parse import urlsplit
+
+from clients.http_transport import parse_retry_after
+
+
+def parse_rate_limit_reset(value: str | None) -> float | None:
+    """Get seconds until a rate limit window resets.
+
+    Accepts the forms the services use: Unix time in seconds (GitHub, Qase),
+    seconds from now, or an ISO 8601 timestamp (Jira Cloud).
+    """
+    if not value:
+        return None
+    try:
+        number = float(value)
+    except ValueError:
+        try:
+            reset_at = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        except ValueError:
+            return None
+        return max(0.0, reset_at.timestamp() - time.time())
+    if number > 1e9:
+        return max(0.0, number - time.time())
+    return max(0.0, number)
+
+
+def get_rate_limit_resource(url: str) -> str:
+    """Get the rate limit resource of a request by its path.
+
+    Uses GitHub's resource names: GraphQL and search requests have their own
+    limits, every other request counts against core.
+    """
+    segments = [segment for segment in urlsplit(url).path.split('/') if segment]
+    if segments[-1:] == ['graphql']:
+        return 'graphql'
+    if segments[:1] == ['search'] or segments[:3] == ['api', 'v3', 'search']:
+        return 'search'
+    return 'core'
+
+
+class TokenBucket:
+    """Request allowance of one host refilled at a steady rate up to the burst size."""
+
+    def __init__(
+        self,
+        rate: float,
+        burst: float
+    ):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated_at = time.monotonic()
+        self.blocked_until = 0.0
+
+    def refill(self, now: float):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def reserve(self, deadline: float | None = None) -> float | None:
+        now = time.monotonic()
+        self.refill(now)
+        tokens = self.tokens - 1
+        delay = max(-tokens / self.rate if tokens < 0 else 0.0, self.blocked_until - now)
+        if deadline is not None and now + delay >= deadline:
+            return None
+        self.tokens = tokens
+        return delay
+
+
+class RateLimitBudget:
+    """Request budget per host and rate limit resource shared by every client of a transport.
+
+    Each host gets a token bucket per resource, e.g. GitHub REST and GraphQL,
+    that starts at the default rate. Rate limit headers of the responses
+    retune it: once the remaining requests drop below the reserve fraction of
+    the window's limit they are spread over the time left until the window
+    resets, and Retry-After or an exhausted window pause the resource for
+    every caller. Headers naming another resource in X-RateLimit-Resource
+    leave the bucket alone. Requests reserve a token before they are sent and
+    wait for it, so bulk refreshes slow down ahead of the limit instead of
+    running into 429 responses.
+    """
+
+    def __init__(
+        self,
+        default_rate: float = 10.0,
+        burst: float = 20.0,
+        rates: dict[str, float] | None = None,
+        reserve_fraction: float = 0.2
+    ):
+        """Create a budget without any host.
+
+        Args:
+            default_rate (float): Requests per second allowed to a host until its headers tell otherwise.
+            burst (float): Requests a host may receive at once.
+            rates (dict[str, float] | None): Starting rates by host.
+            reserve_fraction (float): Share of a window's limit below which requests are paced to the reset.
+                Windows without an X-RateLimit-Limit header are always paced.
+        """
+        self._log = logging.getLogger(__name__)
+        self._default_rate = default_rate
+        self._burst = burst
+        self._rates = rates or {}
+        self._reserve_fraction = reserve_fraction
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def _get_bucket(self, url: str) -> TokenBucket:
+        key = (urlsplit(url).netloc, get_rate_limit_resource(url))
+        if key not in self._buckets:
+            self._buckets[key] = TokenBucket(self._rates.get(key[0], self._default_rate), self._burst)
+        return self._buckets[key]
+
+    def reserve(
+        self,
+        url: str,
+        deadline: float | None = None
+    ) -> float | None:
+        """Take a token for a request to the URL's host and rate limit resource.
+
+        Args:
+            url (str): Request URL.
+            deadline (float | None): time.monotonic() value the request must start before.
+
+        Returns:
+            float | None: Seconds to wait before sending the request, or None
+                without taking a token if the wait would pass the deadline.
+        """
+        with self._lock:
+            return self._get_bucket(url).reserve(deadline)
+
+    def update(
+        self,
+        url: str,
+        headers,
+        status_code: int
+    ):
+        """Adjust the budget of the request's resource to the rate limit headers of a response."""
+        resource = headers.get('X-RateLimit-Resource')
+        if resource and resource != get_rate_limit_resource(url):
+            return
+        retry_after = parse_retry_after(headers.get('Retry-After'))
+        remaining = headers.get('X-RateLimit-Remaining')
+        limit = headers.get('X-RateLimit-Limit')
+        reset_in = parse_rate_limit_reset(headers.get('X-RateLimit-Reset'))
+        with self._lock:
+            bucket = self._get_bucket(url)
+            now = time.monotonic()
+            if retry_after is not None and status_code in (429, 503):
+                bucket.blocked_until = max(bucket.blocked_until, now + retry_after)
+                self._log.warning(f'{urlsplit(url).netloc} asked to retry after {retry_after:.1f}s, pausing its requests')
+            if remaining is None or reset_in is None:
+                return
+            try:
+                remaining = float(remaining)
+                limit = float(limit) if limit else None
+            except ValueError:
+                return
+            bucket.refill(now)
+            if remaining <= 0:
+                bucket.blocked_until = max(bucket.blocked_until, now + reset_in)
+                return
+            paced_rate = max(remaining / max(reset_in, 1.0), 0.01)
+            if limit and remaining > limit * self._reserve_fraction:
+                bucket.rate = max(self._rates.get(urlsplit(url).netloc, self._default_rate), paced_rate)
+            else:
+                bucket.rate = paced_rate
+            bucket.tokens = min(bucket.tokens, remaining)
@@ -0,0 +1,171 @@
+from datetime import date, datetime
+from typing import Callable
+
+
+def parse_datetime(value: str | None) -> datetime | None:
+    return datetime.fromisoformat(value) if value else None
+
+
+def parse_date(value: str | None) -> date | None:
+    return date.fromisoformat(value[:10]) if value else None
+
+
+class Record:
+    """Compact decoded API entity.
+
+    Keeps only the fields the metrics use in slots. Item access by field name
+    is supported so records can be passed where raw dicts were read by key.
+    """
+    __slots__ = ()
+
+    def __getitem__(self, key: str):
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def __repr__(self) -> str:
+        fields = ', '.join(f'{name}={getattr(self, name)!r}' for name in self.__slots__)
+        return f'{type(self).__name__}({fields})'
+
+
+class TestCaseRecord(Record):
+    """Qase test case with custom fields indexed by id and dates parsed once."""
+    __slots__ = ('id', 'title', 'type', 'status', 'automation', 'updated_at', 'custom_fields')
+
+    def __init__(
+        self,
+        id: int,
+        title: str,
+        type: int | None,
+        status: int | None,
+        automation: int | None,
+        updated_at: datetime | None,
+        custom_fields: dict[int, str]
+    ):
+        self.id = id
+        self.title = title
+        self.type = type
+        self.status = status
+        self.automation = automation
+        self.updated_at = updated_at
+        self.custom_fields = custom_fields
+
+    @classmethod
+    def from_dict(cls, test_case: dict) -> 'TestCaseRecord':
+        return cls(
+            id=test_case['id'],
+            title=test_case.get('title'),
+            type=test_case.get('type'),
+            status=test_case.get('status'),
+            automation=test_case.get('automation'),
+            updated_at=parse_datetime(test_case.get('updated_at')),
+            custom_fields={
+                custom_field['id']: custom_field['value']
+                for custom_field in test_case.get('custom_fields') or []
+            }
+        )
+
+
+class IssueRecord(Record):
+    """Jira issue with the status, labels and dates the metrics use."""
+    __slots__ = (
+        'id', 'key', 'status_id', 'status_category_id', 'resolution', 'labels',
+        'duedate', 'status_category_change_date', 'updated'
+    )
+
+    def __init__(
+        self,
+        id: str,
+        key: str,
+        status_id: str | None,
+        status_category_id: str | None,
+        resolution: str | None,
+        labels: tuple[str, ...],
+        duedate: date | None,
+        status_category_change_date: datetime | None,
+        updated: datetime | None
+    ):
+        self.id = id
+        self.key = key
+        self.status_id = status_id
+        self.status_category_id = status_category_id
+        self.resolution = resolution
+        self.labels = labels
+        self.duedate = duedate
+        self.status_category_change_date = status_category_change_date
+        self.updated = updated
+
+    @classmethod
+    def from_dict(cls, issue: dict) -> 'IssueRecord':
+        fields = issue.get('fields') or {}
+        status = fields.get('status') or {}
+        status_category = status.get('statusCategory') or {}
+        resolution = fields.get('resolution') or {}
+        return cls(
+            id=issue['id'],
+            key=issue['key'],
+            status_id=status.get('id'),
+            status_category_id=str(status_category['id']) if 'id' in status_category else None,
+            resolution=resolution.get('name'),
+            labels=tuple(fields.get('labels') or ()),
+            duedate=parse_date(fields.get('duedate')),
+            status_category_change_date=parse_datetime(fields.get('statuscategorychangedate')),
+            updated=parse_datetime(fields.get('updated'))
+        )
+
+
+def as_issue_record(issue: dict | IssueRecord) -> IssueRecord:
+    return issue if isinstance(issue, IssueRecord) else IssueRecord.from_dict(issue)
+
+
+class PullRequestRecord(Record):
+    """GitHub pull request with its review timestamps and test file churn."""
+    __slots__ = (
+        'number', 'created_at', 'merged_at', 'first_review_at', 'changed_files',
+        'test_files_changed', 'test_lines_changed'
+    )
+
+    def __init__(
+        self,
+        number: int,
+        created_at: datetime,
+        merged_at: datetime | None,
+        first_review_at: datetime | None,
+        changed_files: int,
+        test_files_changed: int,
+        test_lines_changed: int
+    ):
+        self.number = number
+        self.created_at = created_at
+        self.merged_at = merged_at
+        self.first_review_at = first_review_at
+        self.changed_files = changed_files
+        self.test_files_changed = test_files_changed
+        self.test_lines_changed = test_lines_changed
+
+    @classmethod
+    def from_dict(
+        cls,
+        pull_request: dict,
+        files: list[dict],
+        is_test_file: Callable[[str], bool]
+    ) -> 'PullRequestRecord':
+        """Decode a pull request node of the GitHub GraphQL API.
+
+        Args:
+            pull_request (dict): Pull request node.
+            files (list[dict]): All changed files with path, additions and deletions.
+            is_test_file (Callable[[str], bool]): Tells test files apart by path.
+        """
+        reviews = pull_request.get('reviews', {}).get('nodes') or []
+        test_files = [file for file in files if is_test_file(file['path'])]
+        return cls(
+            number=pull_request['number'],
+            created_at=parse_datetime(pull_request['createdAt']),
+            merged_at=parse_datetime(pull_request.get('mergedAt')),
+            first_review_at=parse_datetime(reviews[0]['submittedAt']) if reviews else None,
+            changed_files=len(files),
+            test_files_changed=len(test_files),
+            test_lines_changed=sum(file['additions'] + file['deletions'] for file in test_files)
+        )
@@ -1,3 +1,5 @@
+from functools import lru_cache
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -6,10 +8,49 @@ class EnvVars(BaseSettings):
     JIRA_URL: str
     JIRA_EMAIL: str
     JIRA_API_TOKEN: str
+    JIRA_MAX_WORKERS: int = 8
+    JIRA_STORE_PATH: str | None = None
+    JIRA_FULL_SYNC_INTERVAL: float = 86400.0
+    JIRA_SLA_GROUP_LABELS: list[str] | None = None
     QASE_URL: str
     QASE_API_TOKEN: str
     QASE_PROJECT_CODE: str
+    QASE_MAX_WORKERS: int = 8
+    QASE_STORE_PATH: str | None = None
+    QASE_RESULTS_PATH: str | None = None
+    QASE_RESULTS_DAYS: int = 30
+    QASE_RESULTS_TOP_CASES: int = 20
     GITHUB_TOKEN: str
     GITHUB_REPO: str
+    GITHUB_API_URL: str = 'https://api.github.com'
+    GITHUB_METRICS_DAYS: int = 30
+    GITHUB_TEST_FILE_PATTERNS: list[str] | None = None
+    GITHUB_ETAG_CACHE_SIZE: int = 1024
+    HTTP_POOL_SIZE: int = 16
+    HTTP_TIMEOUT: float = 30.0
+    HTTP_TOTAL_TIMEOUT: float = 120.0
+    HTTP_MAX_RETRIES: int = 3
+    HTTP_BACKOFF_FACTOR: float = 0.5
+    HTTP_BACKOFF_MAX: float = 30.0
+    RATE_LIMIT_DEFAULT_RATE: float = 10.0
+    RATE_LIMIT_BURST: float = 20.0
+    RATE_LIMIT_RESERVE_FRACTION: float = 0.2
+    SNAPSHOT_TTL: float = 1800.0
+    SNAPSHOT_MAX_ENTRIES: int = 64
+    COMPACT_RECORDS: bool = True
+    QASE_METRICS_INTERVAL: float = 600.0
+    QASE_RESULTS_INTERVAL: float = 900.0
+    JIRA_METRICS_INTERVAL: float = 900.0
+    AUTOMATION_TIME_DIFF_INTERVAL: float = 3600.0
+    GITHUB_METRICS_INTERVAL: float = 900.0
+    SCHEDULER_JITTER: float = 0.1
+    PUSHGATEWAY_URL: str = 'http://pushgateway:9091'
+    PUSHGATEWAY_JOB: str = 'test_pulse'
         
     model_config = SettingsConfigDict(env_file='../.env')
+
+
+@lru_cache(maxsize=None)
+def get_env_vars() -> EnvVars:
+    """Get settings read and validated once per process."""
+    return EnvVars()
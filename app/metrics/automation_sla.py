@@ -0,0 +1,155 @@
+import logging
+from typing import Iterable
+
+import numpy as np
+
+from clients.jira_api import Status, StatusCategory
+from clients.records import IssueRecord, as_issue_record
+
+
+LATENESS_BUCKETS = (-30, -14, -7, -3, -1, 0, 1, 3, 7, 14, 30, 60)
+DURATION_BUCKETS = (1, 2, 3, 5, 7, 10, 14, 21, 30, 60, 90)
+SLA_PERCENTILES = (50, 90, 99)
+# Group of tasks without any of the group labels
+OTHER_GROUP = 'other'
+# Group of every task when no group labels are configured
+ALL_GROUP = 'all'
+
+log = logging.getLogger(__name__)
+
+
+def to_datetime64(
+    values: Iterable,
+    unit: str = 's'
+) -> np.ndarray:
+    """Parse ISO 8601 strings, dates or datetimes in one call.
+
+    Values keep the wall time of their own offset, as the metrics always did,
+    and missing values become NaT.
+    """
+    return np.array(
+        [str(value)[:19] if value else 'NaT' for value in values],
+        dtype='datetime64[s]'
+    ).astype(f'datetime64[{unit}]')
+
+
+def days_between(
+    start: np.ndarray,
+    end: np.ndarray
+) -> np.ndarray:
+    """Get days from start to end dates as floats, NaN where either is NaT."""
+    days = (end - start).astype(np.float64)
+    days[np.isnat(start) | np.isnat(end)] = np.nan
+    return days
+
+
+def get_group(
+    issue: IssueRecord,
+    group_labels: list[str] | None
+) -> str:
+    if not group_labels:
+        return ALL_GROUP
+    return next((label for label in group_labels if label in issue.labels), OTHER_GROUP)
+
+
+def get_automation_task_times(
+    issues: list,
+    changelogs: dict[str, list],
+    group_labels: list[str] | None = None
+) -> dict[str, np.ndarray]:
+    """Get due, completion and start dates of done automation tasks as arrays.
+
+    Timestamps of all tasks and of their status changes are parsed in bulk.
+    The start of a task is its first move to In Progress. Tasks that are not
+    done or have no due date are left out.
+
+    Args:
+        issues (list): Done automation tasks as raw issues or IssueRecord objects.
+        changelogs (dict[str, list]): Status changes by issue key.
+        group_labels (list[str] | None): Labels that assign a task to a group,
+            the first matching one wins. Every task is in one group when not given.
+
+    Returns:
+        dict[str, np.ndarray]: key, group, due, done and started, dates as datetime64[D].
+    """
+    issues = [as_issue_record(issue) for issue in issues]
+    skipped = [
+        issue.key for issue in issues
+        if issue.status_category_id != StatusCategory.DONE.value or issue.duedate is None
+    ]
+    if skipped:
+        log.warning(f'Skipping automation tasks that are not done or have no due date: {", ".join(skipped)}')
+        skipped = set(skipped)
+        issues = [issue for issue in issues if issue.key not in skipped]
+
+    change_positions = []
+    change_dates = []
+    for position, issue in enumerate(issues):
+        for change in changelogs.get(issue.key, []):
+            if any(item['field'] == 'status' and item['to'] == Status.IN_PROGRESS.value for item in change['items']):
+                change_positions.append(position)
+                change_dates.append(change['created'])
+    change_positions = np.array(change_positions, dtype=np.int64)
+    change_dates = to_datetime64(change_dates, 'D')
+    started = np.full(len(issues), np.datetime64('NaT'), dtype='datetime64[D]')
+    order = np.lexsort((change_dates, change_positions))
+    positions, first_changes = np.unique(change_positions[order], return_index=True)
+    started[positions] = change_dates[order][first_changes]
+
+    return {
+        'key': np.array([issue.key for issue in issues], dtype=object),
+        'group': np.array([get_group(issue, group_labels) for issue in issues], dtype=object),
+        'due': to_datetime64((issue.duedate for issue in issues), 'D'),
+        'done': to_datetime64((issue.status_category_change_date for issue in issues), 'D'),
+        'started': started
+    }
+
+
+def get_automation_task_days(times: dict[str, np.ndarray]) -> dict[str, np.ndarray]:
+    """Get lateness and durations of every task at once.
+
+    Lateness is the days from due date to completion, negative when done
+    early. Expected and actual durations count the days from the start to the
+    due date or completion inclusively and are NaN for tasks never started.
+    """
+    return {
+        'lateness': days_between(times['due'], times['done']),
+        'expected_duration': days_between(times['started'], times['due']) + 1,
+        'actual_duration': days_between(times['started'], times['done']) + 1
+    }
+
+
+def get_distributions(
+    values: np.ndarray,
+    groups: np.ndarray,
+    buckets: tuple[float, ...]
+) -> dict[str, dict]:
+    """Get percentiles and cumulative histogram buckets of values per group.
+
+    NaN values are left out. Bucket counts of all groups come from a single
+    bincount over group and bucket indexes.
+
+    Returns:
+        dict[str, dict]: By group, percentiles by percentile, buckets as
+        (upper bound, cumulative count) pairs ending with +Inf, sum and count.
+    """
+    known = ~np.isnan(values)
+    values = values[known]
+    group_names, group_indexes = np.unique(groups[known].astype(str), return_inverse=True)
+    bucket_indexes = np.searchsorted(np.array(buckets, dtype=np.float64), values, side='left')
+    bucket_counts = np.bincount(
+        group_indexes * (len(buckets) + 1) + bucket_indexes,
+        minlength=len(group_names) * (len(buckets) + 1)
+    ).reshape(len(group_names), len(buckets) + 1).cumsum(axis=1)
+    sums = np.bincount(group_indexes, weights=values, minlength=len(group_names))
+    bounds = [str(float(bound)) for bound in buckets] + ['+Inf']
+    distributions = {}
+    for group_index, group_name in enumerate(group_names):
+        group_values = values[group_indexes == group_index]
+        distributions[str(group_name)] = {
+            'percentiles': dict(zip(SLA_PERCENTILES, np.percentile(group_values, SLA_PERCENTILES).round(1).tolist())),
+            'buckets': list(zip(bounds, bucket_counts[group_index].tolist())),
+            'sum': float(sums[group_index]),
+            'count': len(group_values)
+        }
+    return distributions
@@ -0,0 +1,146 @@
+import threading
+import time
+
+from prometheus_client.core import GaugeMetricFamily, HistogramMetricFamily
+from prometheus_client.registry import Collector
+
+
+METRIC_DESCRIPTIONS = {
+    'automated_smoke_tests': 'Number of automated smoke tests',
+    'manual_smoke_tests': 'Number of manual smoke tests',
+    'automated_smoke_tests_execution_hours': 'Manual execution time of automated smoke tests in hours',
+    'manual_smoke_tests_execution_hours': 'Manual execution time of manual smoke tests in hours',
+    'blocked_manual_smoke_tests': 'Number of manual smoke tests with a blocked automation task',
+    'blocked_manual_smoke_tests_execution_hours': 'Manual execution time of smoke tests with a blocked automation task in hours',
+    'smoke_tests_without_automation_task': 'Number of manual smoke tests without automation task',
+    'smoke_tests_without_automation_task_execution_hours': 'Manual execution time of smoke tests without automation task in hours',
+    'smoke_automation_days_diff': 'Total days between due date and completion of smoke automation tasks',
+    'smoke_automation_expected_days': 'Total planned days of smoke automation tasks',
+    'open_pull_requests': 'Number of open pull requests',
+    'merged_pull_requests': 'Number of pull requests merged in the metrics window',
+    'merged_pull_requests_with_test_changes': 'Number of merged pull requests that changed test files',
+    'pull_request_cycle_time_hours': 'Median time from opening to merging a pull request in hours',
+    'pull_request_time_to_first_review_hours': 'Median time from opening a pull request to its first review in hours',
+    'pull_request_test_files_changed': 'Number of test files changed by merged pull requests',
+    'pull_request_test_lines_changed': 'Number of test lines added and deleted by merged pull requests',
+    'qase_test_results': 'Number of Qase test results that ended in the results window',
+    'qase_test_pass_rate': 'Share of passed results among passed and failed Qase test results',
+    'qase_flaky_test_cases': 'Number of Qase test cases whose result flipped between passed and failed',
+    'qase_test_status_flips': 'Number of flips between passed and failed over all Qase test cases',
+    'qase_test_run_duration_seconds': 'Percentiles of the time spent on the results of a Qase test run',
+    'qase_flaky_test_case_status_flips': 'Number of flips between passed and failed of the flakiest Qase test cases',
+    'qase_flaky_test_case_pass_rate': 'Share of passed results of the flakiest Qase test cases',
+    'smoke_automation_lateness_days': 'Days from due date to completion of done smoke automation tasks, negative when done early',
+    'smoke_automation_lateness_days_quantile': 'Percentiles of the lateness of done smoke automation tasks in days',
+    'smoke_automation_expected_duration_days': 'Planned days from start to due date of done smoke automation tasks',
+    'smoke_automation_expected_duration_days_quantile': 'Percentiles of the planned duration of done smoke automation tasks in days',
+    'smoke_automation_actual_duration_days': 'Days from start to completion of done smoke automation tasks',
+    'smoke_automation_actual_duration_days_quantile': 'Percentiles of the actual duration of done smoke automation tasks in days',
+}
+
+# Label names of metrics whose values are given per label values
+METRIC_LABELS = {
+    'qase_test_run_duration_seconds': ['quantile'],
+    'qase_flaky_test_case_status_flips': ['case_id'],
+    'qase_flaky_test_case_pass_rate': ['case_id'],
+    'smoke_automation_lateness_days': ['group'],
+    'smoke_automation_lateness_days_quantile': ['group', 'quantile'],
+    'smoke_automation_expected_duration_days': ['group'],
+    'smoke_automation_expected_duration_days_quantile': ['group', 'quantile'],
+    'smoke_automation_actual_duration_days': ['group'],
+    'smoke_automation_actual_duration_days_quantile': ['group', 'quantile'],
+}
+
+# Labelled metrics exposed as histograms, their values are (buckets, sum) pairs
+HISTOGRAM_METRICS = {
+    'smoke_automation_lateness_days',
+    'smoke_automation_expected_duration_days',
+    'smoke_automation_actual_duration_days',
+}
+
+
+class MetricsCollector(Collector):
+    """Exposes the last computed value of every metric as a gauge or histogram.
+
+    Metric groups hand over all values computed from one snapshot at once and
+    a scrape only reads them, so scrapes never trigger API requests. Every
+    sample carries the time its value was computed, so Prometheus can tell
+    stale values apart. Values of labelled metrics are dicts by label values
+    and replace all series of the metric. Histogram values are pairs of
+    cumulative (upper bound, count) buckets ending with +Inf and the sum.
+    """
+
+    def __init__(
+        self,
+        descriptions: dict[str, str] = METRIC_DESCRIPTIONS,
+        timestamps: bool = True,
+        labels: dict[str, list[str]] = METRIC_LABELS,
+        histograms: set[str] = HISTOGRAM_METRICS
+    ):
+        """Create a collector without values.
+
+        Args:
+            descriptions (dict[str, str]): Help text by metric name.
+            timestamps (bool): Attach computation times to samples. The Pushgateway rejects timestamped samples.
+            labels (dict[str, list[str]]): Label names of labelled metrics by metric name.
+            histograms (set[str]): Names of labelled metrics exposed as histograms.
+        """
+        self._descriptions = descriptions
+        self._labels = labels
+        self._histograms = histograms
+        self._timestamps = timestamps
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def set_values(
+        self,
+        values: dict[str, float | dict[tuple[str, ...], float]],
+        timestamp: float | None = None
+    ):
+        """Store values computed together.
+
+        Args:
+            values (dict[str, float | dict[tuple[str, ...], float]]): Values by metric name,
+                labelled metrics take values by label values.
+            timestamp (float | None): Unix time the values were computed at, now by default.
+        """
+        unknown_names = values.keys() - self._descriptions.keys()
+        if unknown_names:
+            raise ValueError(f'Unknown metrics: {sorted(unknown_names)}')
+        timestamp = time.time() if timestamp is None else timestamp
+        with self._lock:
+            for name, value in values.items():
+                self._values[name] = (value, timestamp)
+
+    def get_values(self) -> dict[str, float | dict[tuple[str, ...], float]]:
+        with self._lock:
+            return {name: value for name, (value, _) in self._values.items()}
+
+    def collect(self):
+        with self._lock:
+            values = dict(self._values)
+        for name, documentation in self._descriptions.items():
+            if name not in values:
+                continue
+            value, timestamp = values[name]
+            timestamp = timestamp if self._timestamps else None
+            if name in self._histograms:
+                metric = HistogramMetricFamily(name, documentation, labels=self._labels[name])
+                for label_values, (buckets, sum_value) in value.items():
+                    metric.add_metric(list(label_values), buckets, sum_value, timestamp=timestamp)
+            elif name in self._labels:
+                metric = GaugeMetricFamily(name, documentation, labels=self._labels[name])
+                for label_values, label_value in value.items():
+                    metric.add_metric(list(label_values), label_value, timestamp=timestamp)
+            else:
+                metric = GaugeMetricFamily(name, documentation)
+                metric.add_metric([], value, timestamp=timestamp)
+            yield metric
+
+    def describe(self):
+        return [
+            HistogramMetricFamily(name, documentation, labels=self._labels.get(name))
+            if name in self._histograms
+            else GaugeMetricFamily(name, documentation, labels=self._labels.get(name))
+            for name, documentation in self._descriptions.items()
+        ]
@@ -0,0 +1,136 @@
+from datetime import date
+from typing import Iterable, Iterator
+
+import numpy as np
+
+from clients.qase_api import AutomationStatus
+from clients.qase_api import CustomField as QaseCustomField
+from metrics.task_index import get_task_key_from_url
+
+
+# Cases without a creation date count as existing since the epoch
+UNKNOWN_CREATION_DATE = np.datetime64('1970-01-01', 'D')
+
+
+def get_dates(
+    start: date,
+    end: date,
+    step_days: int = 1
+) -> np.ndarray:
+    """Get dates from start to end inclusively as datetime64[D]."""
+    return np.arange(np.datetime64(start, 'D'), np.datetime64(end, 'D') + 1, step_days)
+
+
+def sum_before(
+    event_dates: np.ndarray,
+    dates: np.ndarray,
+    weights: np.ndarray | None = None
+) -> np.ndarray:
+    """Get the number or total weight of events before each date.
+
+    Events without a date (NaT) never count.
+    """
+    order = np.argsort(event_dates)
+    positions = np.searchsorted(event_dates[order], dates, side='left')
+    if weights is None:
+        return positions
+    return np.concatenate(([0], np.cumsum(weights[order])))[positions]
+
+
+def get_smoke_test_history(
+    tests: Iterable[dict],
+    automation_dates: dict[str, date]
+) -> dict[str, np.ndarray]:
+    """Get creation and automation dates and manual execution hours of smoke tests.
+
+    The Qase API keeps no history of test cases, so a test counts from its
+    creation and an automated test counts as manual until its automation task
+    was done. Automated tests without a done task count as automated since
+    their creation. Only the three columns are kept per test, so tests can be
+    streamed from Qase.
+
+    Args:
+        tests (Iterable[dict]): Raw smoke test cases from the Qase case list.
+        automation_dates (dict[str, date]): Completion dates of automation tasks by key.
+
+    Returns:
+        dict[str, np.ndarray]: created and automated as datetime64[D], NaT for
+        manual tests, and execution_hours.
+    """
+    created = []
+    automated = []
+    execution_hours = []
+    for test in tests:
+        created_at = test.get('created_at') or test.get('created')
+        created_date = np.datetime64(created_at[:10], 'D') if created_at else UNKNOWN_CREATION_DATE
+        created.append(created_date)
+        if test.get('automation') == AutomationStatus.AUTOMATED.value:
+            task_url = QaseCustomField.AUTOMATION_TASK.get_value(test)
+            automation_date = automation_dates.get(get_task_key_from_url(task_url)) if task_url else None
+            automated.append(max(created_date, np.datetime64(automation_date, 'D')) if automation_date else created_date)
+        else:
+            automated.append(np.datetime64('NaT', 'D'))
+        execution_time = QaseCustomField.MANUAL_EXECUTION_TIME.get_value(test)
+        execution_hours.append(int(execution_time) / 60 if execution_time else 0.0)
+    return {
+        'created': np.array(created, dtype='datetime64[D]'),
+        'automated': np.array(automated, dtype='datetime64[D]'),
+        'execution_hours': np.array(execution_hours, dtype=np.float64)
+    }
+
+
+def get_smoke_test_values(
+    history: dict[str, np.ndarray],
+    dates: np.ndarray
+) -> dict[str, np.ndarray]:
+    """Get the smoke test gauges as they were at the start of each date."""
+    tests = sum_before(history['created'], dates)
+    automated_tests = sum_before(history['automated'], dates)
+    hours = sum_before(history['created'], dates, history['execution_hours'])
+    automated_hours = sum_before(history['automated'], dates, history['execution_hours'])
+    return {
+        'automated_smoke_tests': automated_tests,
+        'manual_smoke_tests': tests - automated_tests,
+        'automated_smoke_tests_execution_hours': automated_hours.round(1),
+        'manual_smoke_tests_execution_hours': (hours - automated_hours).round(1)
+    }
+
+
+def get_automation_time_diff_values(
+    done_dates: np.ndarray,
+    days_diffs: np.ndarray,
+    expected_days: np.ndarray,
+    dates: np.ndarray
+) -> dict[str, np.ndarray]:
+    """Get the automation time diff gauges as they were at the start of each date.
+
+    Args:
+        done_dates (np.ndarray): Completion dates of done automation tasks as datetime64[D].
+        days_diffs (np.ndarray): Days between due date and completion of the tasks.
+        expected_days (np.ndarray): Planned days of the tasks.
+        dates (np.ndarray): Dates of the values.
+    """
+    return {
+        'smoke_automation_days_diff': sum_before(done_dates, dates, days_diffs),
+        'smoke_automation_expected_days': sum_before(done_dates, dates, expected_days)
+    }
+
+
+def iter_openmetrics(
+    dates: np.ndarray,
+    values: dict[str, np.ndarray],
+    descriptions: dict[str, str]
+) -> Iterator[str]:
+    """Yield lines of an OpenMetrics exposition of gauges sampled at midnight UTC of each date.
+
+    Every metric family is written at once as the format requires and the
+    exposition ends with # EOF, as promtool tsdb create-blocks-from openmetrics
+    expects.
+    """
+    timestamps = dates.astype('datetime64[s]').astype(np.int64).tolist()
+    for name, metric_values in values.items():
+        yield f'# HELP {name} {descriptions[name]}\n'
+        yield f'# TYPE {name} gauge\n'
+        for timestamp, value in zip(timestamps, metric_values.tolist()):
+            yield f'{name} {value} {timestamp}\n'
+    yield '# EOF\n'
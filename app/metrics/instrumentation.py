@@ -0,0 +1,61 @@
+from contextlib import contextmanager
+from functools import wraps
+import time
+
+from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram
+
+from clients.instrumentation import ClientMetrics
+
+
+# Registry served by the exporter, it holds the exported metrics and the
+# exporter's own metrics.
+registry = CollectorRegistry()
+client_metrics = ClientMetrics(registry)
+metric_duration = Histogram(
+    'metric_function_duration_seconds',
+    'Duration of metric functions',
+    ['metric'],
+    registry=registry
+)
+collection_duration = Histogram(
+    'collection_duration_seconds',
+    'Duration of collection cycles by metric group',
+    ['group'],
+    buckets=(0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800),
+    registry=registry
+)
+collection_failures = Counter(
+    'collection_failures',
+    'Number of failed collection cycles by metric group',
+    ['group'],
+    registry=registry
+)
+collection_last_success = Gauge(
+    'collection_last_success_timestamp_seconds',
+    'Unix time of the last successful collection cycle by metric group',
+    ['group'],
+    registry=registry
+)
+
+
+def timed(func):
+    """Measure every call of a metric function."""
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        with metric_duration.labels(func.__name__).time():
+            return func(*args, **kwargs)
+    return wrapper
+
+
+@contextmanager
+def track_collection(group: str):
+    """Measure one collection cycle of a metric group and record its outcome."""
+    started_at = time.monotonic()
+    try:
+        yield
+    except Exception:
+        collection_failures.labels(group).inc()
+        raise
+    finally:
+        collection_duration.labels(group).observe(time.monotonic() - started_at)
+    collection_last_success.labels(group).set_to_current_time()
@@ -1,106 +1,317 @@
-from datetime import datetime
-from clients.jira_api import JiraAPI, Status, StatusCategory
-from clients.qase_api import CustomField, QaseAPI
-from config.env_vars import EnvVars
-from usecases import Usecases
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+import statistics
+from typing import TYPE_CHECKING
 
+import numpy as np
 
-qase_api = QaseAPI(
-    base_url=EnvVars().QASE_URL,
-    api_token=EnvVars().QASE_API_TOKEN,
-    project_code=EnvVars().QASE_PROJECT_CODE
+from clients.github_graphql_api import GithubGraphQLAPI
+from clients.http_transport import HttpTransport, RetryPolicy
+from clients.jira_api import JiraAPI, Status
+from clients.qase_api import QaseAPI
+from clients.rate_limit import RateLimitBudget
+from clients.records import as_issue_record
+from config.env_vars import get_env_vars
+from metrics.automation_sla import (
+    DURATION_BUCKETS,
+    LATENESS_BUCKETS,
+    get_automation_task_days,
+    get_automation_task_times,
+    get_distributions
 )
-jira_api = JiraAPI(
-    base_url=EnvVars().JIRA_URL, 
-    email=EnvVars().JIRA_EMAIL, 
-    api_token=EnvVars().JIRA_API_TOKEN
-)
-usecases = Usecases(qase_api=qase_api, jira_api=jira_api)
+from metrics.instrumentation import client_metrics, timed
+from metrics.qase_results import compute_result_stats, ingest_test_run_results
+from metrics.snapshot_cache import SnapshotCache
+from metrics.usecases import Usecases
+from storage.jira_store import JiraStore
+from storage.qase_result_store import QaseResultStore
+from storage.qase_store import QaseStore
+
+if TYPE_CHECKING:
+    from clients.async_http_transport import AsyncHttpTransport
+    from clients.github_api import GithubCollector
+
+# Clients are built on first use and shared afterwards, so importing this
+# module reads no settings and opens no connections. The aiohttp and PyGithub
+# based clients are also imported on first use, they dominate the import time.
+
+def get_retry_policy() -> RetryPolicy:
+    env_vars = get_env_vars()
+    return RetryPolicy(
+        max_retries=env_vars.HTTP_MAX_RETRIES,
+        backoff_factor=env_vars.HTTP_BACKOFF_FACTOR,
+        backoff_max=env_vars.HTTP_BACKOFF_MAX
+    )
+
+
+@lru_cache(maxsize=None)
+def get_rate_limit_budget() -> RateLimitBudget:
+    """Budget shared by the sync, async and GitHub clients, which may call the same hosts."""
+    env_vars = get_env_vars()
+    return RateLimitBudget(
+        default_rate=env_vars.RATE_LIMIT_DEFAULT_RATE,
+        burst=env_vars.RATE_LIMIT_BURST,
+        reserve_fraction=env_vars.RATE_LIMIT_RESERVE_FRACTION
+    )
+
+
+@lru_cache(maxsize=None)
+def get_transport() -> HttpTransport:
+    env_vars = get_env_vars()
+    return HttpTransport(
+        pool_size=env_vars.HTTP_POOL_SIZE,
+        timeout=env_vars.HTTP_TIMEOUT,
+        total_timeout=env_vars.HTTP_TOTAL_TIMEOUT,
+        retry_policy=get_retry_policy(),
+        metrics=client_metrics,
+        rate_limit=get_rate_limit_budget()
+    )
+
+
+@lru_cache(maxsize=None)
+def get_qase_api() -> QaseAPI:
+    env_vars = get_env_vars()
+    return QaseAPI(
+        base_url=env_vars.QASE_URL,
+        api_token=env_vars.QASE_API_TOKEN,
+        project_code=env_vars.QASE_PROJECT_CODE,
+        max_workers=env_vars.QASE_MAX_WORKERS,
+        transport=get_transport()
+    )
+
+
+@lru_cache(maxsize=None)
+def get_jira_api() -> JiraAPI:
+    env_vars = get_env_vars()
+    return JiraAPI(
+        base_url=env_vars.JIRA_URL,
+        email=env_vars.JIRA_EMAIL,
+        api_token=env_vars.JIRA_API_TOKEN,
+        max_workers=env_vars.JIRA_MAX_WORKERS,
+        transport=get_transport()
+    )
+
+
+@lru_cache(maxsize=None)
+def get_async_transport() -> 'AsyncHttpTransport':
+    from clients.async_http_transport import AsyncHttpTransport
+
+    env_vars = get_env_vars()
+    return AsyncHttpTransport(
+        per_host_limit=env_vars.HTTP_POOL_SIZE,
+        timeout=env_vars.HTTP_TIMEOUT,
+        total_timeout=env_vars.HTTP_TOTAL_TIMEOUT,
+        retry_policy=get_retry_policy(),
+        metrics=client_metrics,
+        rate_limit=get_rate_limit_budget()
+    )
+
+
+@lru_cache(maxsize=None)
+def get_usecases() -> Usecases:
+    from clients.async_jira_api import AsyncJiraAPI
+    from clients.async_qase_api import AsyncQaseAPI
+
+    env_vars = get_env_vars()
+    return Usecases(
+        qase_api=get_qase_api(),
+        jira_api=get_jira_api(),
+        async_qase_api=AsyncQaseAPI(
+            base_url=env_vars.QASE_URL,
+            api_token=env_vars.QASE_API_TOKEN,
+            project_code=env_vars.QASE_PROJECT_CODE,
+            transport=get_async_transport()
+        ),
+        async_jira_api=AsyncJiraAPI(
+            base_url=env_vars.JIRA_URL,
+            email=env_vars.JIRA_EMAIL,
+            api_token=env_vars.JIRA_API_TOKEN,
+            transport=get_async_transport()
+        ),
+        snapshot_cache=SnapshotCache(
+            ttl=env_vars.SNAPSHOT_TTL,
+            max_entries=env_vars.SNAPSHOT_MAX_ENTRIES
+        ),
+        jira_store=JiraStore(env_vars.JIRA_STORE_PATH) if env_vars.JIRA_STORE_PATH else None,
+        jira_full_sync_interval=env_vars.JIRA_FULL_SYNC_INTERVAL,
+        qase_store=QaseStore(env_vars.QASE_STORE_PATH) if env_vars.QASE_STORE_PATH else None,
+        compact_records=env_vars.COMPACT_RECORDS
+    )
+
+
+@lru_cache(maxsize=None)
+def get_qase_result_store() -> QaseResultStore:
+    return QaseResultStore(get_env_vars().QASE_RESULTS_PATH)
+
+
+@lru_cache(maxsize=None)
+def get_github_collector() -> 'GithubCollector':
+    from clients.github_api import GithubCollector
+
+    env_vars = get_env_vars()
+    return GithubCollector(
+        github_token=env_vars.GITHUB_TOKEN,
+        repo_name=env_vars.GITHUB_REPO,
+        metrics=client_metrics,
+        rate_limit=get_rate_limit_budget(),
+        base_url=env_vars.GITHUB_API_URL
+    )
 
 
+@lru_cache(maxsize=None)
+def get_github_graphql_api() -> GithubGraphQLAPI:
+    env_vars = get_env_vars()
+    return GithubGraphQLAPI(
+        token=env_vars.GITHUB_TOKEN,
+        repo_name=env_vars.GITHUB_REPO,
+        base_url=env_vars.GITHUB_API_URL,
+        test_file_patterns=env_vars.GITHUB_TEST_FILE_PATTERNS,
+        transport=get_transport(),
+        etag_cache_size=env_vars.GITHUB_ETAG_CACHE_SIZE
+    )
+
+
+@timed
 def get_number_of_smoke_tests(automated: bool) -> int:
-    smoke_tests = usecases.get_smoke_tests(automated)
-    number_of_tests = len(smoke_tests)
+    summary = get_usecases().get_smoke_tests_summary(automated)
+    number_of_tests = summary['number_of_tests']
     return number_of_tests
 
 
+@timed
 def get_total_manual_execution_time_for_smoke_tests(automated: bool) -> float:
     """Get total manual execution time for current smoke tests in hours"""
-    smoke_tests = usecases.get_smoke_tests(automated)
-    total_execution_time = usecases.get_total_manual_execution_time_for_tests(smoke_tests)
+    summary = get_usecases().get_smoke_tests_summary(automated)
+    total_execution_time = summary['total_manual_execution_time']
     return total_execution_time
 
 
+@timed
+def get_blocked_manual_smoke_tests() -> list:
+    """Get current manual smoke tests whose automation task is blocked"""
+    index = get_usecases().get_smoke_test_task_index(automated=False)
+    blocked_tasks = [
+        task for task in index.tasks
+        if as_issue_record(task).status_id == Status.DEVELOPMENT_BLOCKED.value
+    ]
+    return index.get_tests_for_tasks(blocked_tasks)
+
+
+@timed
 def get_total_manual_execution_time_for_blocked_manual_smoke_tests() -> float:
-    smoke_manual_tests = usecases.get_smoke_tests(automated=False)
-    automation_tasks = usecases.get_automation_tasks_for_tests(smoke_manual_tests)
-    blocked_tests = []
-    for task in automation_tasks:
-        if task['fields']['status']['id'] == Status.DEVELOPMENT_BLOCKED.value:
-            blocked_tests.append(next(test for test in smoke_manual_tests if CustomField.AUTOMATION_TASK.get_value(test) == usecases.get_jira_task_url(task['key'])))
-    total_execution_time = usecases.get_total_manual_execution_time_for_tests(blocked_tests)
+    blocked_tests = get_blocked_manual_smoke_tests()
+    total_execution_time = get_usecases().get_total_manual_execution_time_for_tests(blocked_tests)
     return total_execution_time
 
 
+@timed
 def get_number_of_blocked_manual_smoke_tests() -> int:
-    smoke_manual_tests = usecases.get_smoke_tests(automated=False)
-    automation_tasks = usecases.get_automation_tasks_for_tests(smoke_manual_tests)
-    blocked_tests = []
-    for task in automation_tasks:
-        if task['fields']['status']['id'] == Status.DEVELOPMENT_BLOCKED.value:
-            blocked_tests.append(next(test for test in smoke_manual_tests if CustomField.AUTOMATION_TASK.get_value(test) == usecases.get_jira_task_url(task['key'])))
+    blocked_tests = get_blocked_manual_smoke_tests()
     number_of_tests = len(blocked_tests)
     return number_of_tests
 
 
+@timed
 def get_total_manual_execution_time_for_tests_without_automation_task() -> float:
     """Get total execution time for current manual smoke tests without automation task in hours"""
-    smoke_manual_tests = usecases.get_smoke_tests(automated=False)
-    tests_without_automation_task = []
-    for test in smoke_manual_tests:
-        if CustomField.AUTOMATION_TASK.get_value(test) == '':
-            tests_without_automation_task.append(test)
-    total_execution_time = usecases.get_total_manual_execution_time_for_tests(tests_without_automation_task)
+    index = get_usecases().get_smoke_test_task_index(automated=False)
+    total_execution_time = get_usecases().get_total_manual_execution_time_for_tests(index.tests_without_task)
     return total_execution_time
 
 
+@timed
 def get_number_of_tests_without_automation_task() -> int:
     """Get number of current smoke tests without automation task"""
-    smoke_manual_tests = usecases.get_smoke_tests(automated=False)
-    tests_without_automation_task = []
-    for test in smoke_manual_tests:
-        if CustomField.AUTOMATION_TASK.get_value(test) == '':
-            tests_without_automation_task.append(test)
-    number_of_tests = len(tests_without_automation_task)
+    index = get_usecases().get_smoke_test_task_index(automated=False)
+    number_of_tests = len(index.tests_without_task)
     return number_of_tests
 
 
-def get_smoke_automation_time_diff():
-    issues = jira_api.get_all_issues(jql='labels IN (automation) AND labels IN (new_test) AND labels IN (smoke) AND statusCategory = Done')
-    total_days_diff = 0
-    total_expected_days = 0
-    for issue in issues:
-        if str(issue['fields']['status']['statusCategory']['id']) != StatusCategory.DONE.value:
-            print(f'Issue {issue["key"]} status category is not id {StatusCategory.DONE.value} but {issue["fields"]["status"]["statusCategory"]["id"]}')
+@timed
+def get_manual_smoke_test_task_summary() -> dict:
+    """Get blocked tests and tests without automation task in one pass over manual smoke tests"""
+    index = get_usecases().get_smoke_test_task_index(automated=False)
+    blocked_tests = []
+    tests_without_task = []
+    for test in index.tests:
+        if test['id'] not in index.task_key_by_case_id:
+            tests_without_task.append(test)
             continue
-        if issue['fields']['duedate'] is None:
-            print(f'Issue {issue["key"]} has no due date')
+        task = index.get_task(test['id'])
+        if task is not None and as_issue_record(task).status_id == Status.DEVELOPMENT_BLOCKED.value:
+            blocked_tests.append(test)
+    return {
+        'number_of_blocked_tests': len(blocked_tests),
+        'blocked_tests_execution_time': get_usecases().get_total_manual_execution_time_for_tests(blocked_tests),
+        'number_of_tests_without_task': len(tests_without_task),
+        'tests_without_task_execution_time': get_usecases().get_total_manual_execution_time_for_tests(tests_without_task)
+    }
+
+
+@timed
+def get_test_run_result_metrics() -> dict:
+    """Ingest new Qase test run results and get pass rate, flakiness and run durations of the last QASE_RESULTS_DAYS days"""
+    env_vars = get_env_vars()
+    store = get_qase_result_store()
+    ingest_test_run_results(get_qase_api(), store, env_vars.QASE_RESULTS_DAYS)
+    return compute_result_stats(store.get_columns(), env_vars.QASE_RESULTS_TOP_CASES)
+
+
+@timed
+def get_smoke_automation_time_diff():
+    """Get totals and distributions of lateness and durations of done smoke automation tasks.
+
+    Distributions are per group of JIRA_SLA_GROUP_LABELS, see metrics.automation_sla.get_distributions.
+    """
+    issues = get_usecases().get_done_smoke_automation_tasks()
+    changelogs = get_usecases().get_jira_issues_changelogs(issues, 'status')
+    times = get_automation_task_times(issues, changelogs, get_env_vars().JIRA_SLA_GROUP_LABELS)
+    days = get_automation_task_days(times)
+    return {
+        'total_days_diff': int(-np.nansum(days['lateness'])),
+        'total_expected_days': int(np.nansum(days['expected_duration'])),
+        'lateness': get_distributions(days['lateness'], times['group'], LATENESS_BUCKETS),
+        'expected_duration': get_distributions(days['expected_duration'], times['group'], DURATION_BUCKETS),
+        'actual_duration': get_distributions(days['actual_duration'], times['group'], DURATION_BUCKETS)
+    }
+
+
+@timed
+def get_number_of_open_pull_requests() -> int:
+    pulls = get_github_collector()._get_pulls(state='open')
+    number_of_pulls = pulls.totalCount
+    return number_of_pulls
+
+
+@timed
+def get_pull_request_metrics() -> dict:
+    """Get cycle time and test churn of pull requests merged in the last GITHUB_METRICS_DAYS days.
+
+    Times are medians in hours, churn counts changed test files and their added and deleted lines.
+    """
+    merged_since = datetime.now(timezone.utc) - timedelta(days=get_env_vars().GITHUB_METRICS_DAYS)
+    number_of_pulls = 0
+    pulls_with_test_changes = 0
+    cycle_times = []
+    review_times = []
+    test_files_changed = 0
+    test_lines_changed = 0
+    for pull in get_github_graphql_api().iter_pull_requests(states=['MERGED'], updated_since=merged_since):
+        if pull.merged_at is None or pull.merged_at < merged_since:
             continue
-        due_date = datetime.fromisoformat(issue['fields']['duedate']).replace(tzinfo=None)
-        status_change_date = datetime.fromisoformat(issue['fields']['statuscategorychangedate']).replace(tzinfo=None)
-        difference_in_days = (due_date.date() - status_change_date.date()).days
-        total_days_diff += difference_in_days
-        
-        changelog = usecases.get_jira_issue_changelog(issue['key'], 'status')
-        def get_expected_automation_days():
-            for change in changelog:
-                for item in change['items']:
-                    if item['field'] == 'status' and item['to'] == Status.IN_PROGRESS.value:
-                        status_change_date = datetime.fromisoformat(change['created']).replace(tzinfo=None)
-                        difference_in_days = (due_date.date() - status_change_date.date()).days + 1
-                        return difference_in_days
-        total_expected_days += get_expected_automation_days()
+        number_of_pulls += 1
+        cycle_times.append((pull.merged_at - pull.created_at).total_seconds() / 3600)
+        if pull.first_review_at is not None:
+            review_times.append((pull.first_review_at - pull.created_at).total_seconds() / 3600)
+        if pull.test_files_changed:
+            pulls_with_test_changes += 1
+        test_files_changed += pull.test_files_changed
+        test_lines_changed += pull.test_lines_changed
     return {
-        'total_days_diff': total_days_diff,
-        'total_expected_days': total_expected_days
+        'number_of_pulls': number_of_pulls,
+        'pulls_with_test_changes': pulls_with_test_changes,
+        'cycle_time': round(statistics.median(cycle_times), 1) if cycle_times else 0,
+        'time_to_first_review': round(statistics.median(review_times), 1) if review_times else 0,
+        'test_files_changed': test_files_changed,
+        'test_lines_changed': test_lines_changed
     }
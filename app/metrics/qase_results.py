@@ -0,0 +1,138 @@
+from datetime import datetime, timedelta, timezone
+import logging
+
+import numpy as np
+
+from clients.qase_api import QaseAPI
+from storage.qase_result_store import STATUS_CODES, QaseResultStore
+
+
+QASE_TIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+RUN_DURATION_PERCENTILES = (50, 90, 99)
+
+log = logging.getLogger(__name__)
+
+
+def ingest_test_run_results(
+    qase_api: QaseAPI,
+    store: QaseResultStore,
+    days: int,
+    now: datetime | None = None,
+    checkpoint_pages: int = 20,
+    max_results: int = 100,
+    prefetch: int = 4
+) -> int:
+    """Add the results that ended since the last ingestion to the store.
+
+    Every ingestion reads a window of end times up to now, which stays fixed
+    until all of its pages are stored, so page offsets do not shift. The
+    cursor is saved with the results every checkpoint_pages pages and an
+    interrupted window is resumed from its last saved page. Results that
+    ended more than days ago are dropped afterwards.
+
+    Args:
+        qase_api (QaseAPI): Client the results are read with.
+        store (QaseResultStore): Store the results and the cursor are kept in.
+        days (int): Days of results to keep.
+        now (datetime | None): End of the window, now by default.
+        checkpoint_pages (int): Pages between two saves of the store.
+        max_results (int): Page size, at most 100.
+        prefetch (int): Number of pages read ahead.
+
+    Returns:
+        int: Number of added results.
+    """
+    now = (now or datetime.now(timezone.utc)).replace(microsecond=0)
+    cursor = store.cursor
+    if cursor is None:
+        cursor = {'from_end_time': (now - timedelta(days=days)).strftime(QASE_TIME_FORMAT), 'to_end_time': None, 'offset': 0}
+    if cursor['to_end_time'] is None:
+        cursor['to_end_time'] = now.strftime(QASE_TIME_FORMAT)
+    elif cursor['offset'] > 0:
+        log.info(f"Resuming Qase results from {cursor['from_end_time']} to {cursor['to_end_time']} at offset {cursor['offset']}")
+    store.cursor = cursor
+
+    added = 0
+    pages = qase_api.iter_test_run_result_pages(
+        from_end_time=cursor['from_end_time'],
+        to_end_time=cursor['to_end_time'],
+        start_result=cursor['offset'],
+        max_results=max_results,
+        prefetch=prefetch
+    )
+    for page_number, (next_offset, results) in enumerate(pages, start=1):
+        store.extend(results)
+        added += len(results)
+        cursor['offset'] = next_offset
+        if page_number % checkpoint_pages == 0:
+            store.save()
+
+    # Qase filters end times by the second inclusively, the next window starts after this one
+    to_end_time = datetime.strptime(cursor['to_end_time'], QASE_TIME_FORMAT)
+    store.cursor = {
+        'from_end_time': (to_end_time + timedelta(seconds=1)).strftime(QASE_TIME_FORMAT),
+        'to_end_time': None,
+        'offset': 0
+    }
+    store.prune(np.datetime64((now - timedelta(days=days)).replace(tzinfo=None), 's'))
+    store.save()
+    return added
+
+
+def compute_result_stats(
+    columns: dict[str, np.ndarray],
+    top_cases: int = 20
+) -> dict:
+    """Get pass rates, flakiness and run durations of stored results.
+
+    Only passed and failed results count towards pass rates and flips, a flip
+    is a passed result followed by a failed one of the same case or the other
+    way round, in end time order. The duration of a run is the time spent on
+    all of its results.
+
+    Args:
+        columns (dict[str, np.ndarray]): Columns from QaseResultStore.get_columns.
+        top_cases (int): Number of cases with the most flips to report.
+
+    Returns:
+        dict: number_of_results, pass_rate, number_of_flaky_cases,
+        number_of_status_flips, run_duration_percentiles by percentile and
+        flaky_cases as (case_id, flips, pass_rate) tuples, most flips first.
+    """
+    status = columns['status']
+    decided = (status == STATUS_CODES['passed']) | (status == STATUS_CODES['failed'])
+    case_ids = columns['case_id'][decided]
+    passed = status[decided] == STATUS_CODES['passed']
+    end_times = columns['end_time'][decided]
+
+    cases, case_index, case_counts = np.unique(case_ids, return_inverse=True, return_counts=True)
+    case_pass_rates = np.bincount(case_index, weights=passed, minlength=len(cases)) / np.maximum(case_counts, 1)
+    order = np.lexsort((end_times, case_ids))
+    sorted_index = case_index[order]
+    sorted_passed = passed[order]
+    flipped = (sorted_index[1:] == sorted_index[:-1]) & (sorted_passed[1:] != sorted_passed[:-1])
+    case_flips = np.bincount(sorted_index[1:][flipped], minlength=len(cases))
+
+    flaky = np.flatnonzero(case_flips)
+    flakiest = flaky[np.argsort(-case_flips[flaky], kind='stable')][:top_cases]
+
+    runs, run_index = np.unique(columns['run_id'], return_inverse=True)
+    run_durations = np.bincount(run_index, weights=np.nan_to_num(columns['time_spent_ms']), minlength=len(runs)) / 1000
+    if len(runs):
+        percentiles = np.percentile(run_durations, RUN_DURATION_PERCENTILES)
+    else:
+        percentiles = np.zeros(len(RUN_DURATION_PERCENTILES))
+    return {
+        'number_of_results': len(status),
+        'pass_rate': round(float(passed.mean()), 4) if len(passed) else 0,
+        'number_of_flaky_cases': len(flaky),
+        'number_of_status_flips': int(case_flips.sum()),
+        'run_duration_percentiles': {
+            percentile: round(float(value), 1)
+            for percentile, value in zip(RUN_DURATION_PERCENTILES, percentiles)
+        },
+        'flaky_cases': [
+            (int(cases[index]), int(case_flips[index]), round(float(case_pass_rates[index]), 4))
+            for index in flakiest
+        ]
+    }
@@ -0,0 +1,110 @@
+from collections import OrderedDict
+import logging
+import threading
+import time
+from typing import Callable, Hashable, Iterable
+
+
+class SnapshotCache:
+    """Memoizes datasets fetched during one collection cycle.
+
+    Entries belong to the refresh epoch they were fetched in. Starting a new
+    epoch drops every entry, so all metrics of one cycle are computed from the
+    same snapshot. Entries also expire after the TTL and the least recently
+    used ones are evicted once max_entries is reached.
+    """
+
+    def __init__(
+        self,
+        ttl: float = 1800.0,
+        max_entries: int = 64
+    ):
+        self._log = logging.getLogger(__name__)
+        self._ttl = ttl
+        self._max_entries = max_entries
+        self._epoch = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._key_locks = {}
+
+    @property
+    def epoch(self) -> int:
+        return self._epoch
+
+    def new_epoch(self) -> int:
+        """Start a new refresh epoch and drop the previous snapshot."""
+        with self._lock:
+            self._epoch += 1
+            self._entries.clear()
+            return self._epoch
+
+    def invalidate(self, key: Hashable | None = None):
+        """Drop one entry, or every entry when no key is given."""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def invalidate_datasets(self, names: Iterable[str]):
+        """Drop every entry whose key starts with one of the dataset names."""
+        names = set(names)
+        with self._lock:
+            for key in [key for key in self._entries if isinstance(key, tuple) and key[:1] and key[0] in names]:
+                del self._entries[key]
+
+    def get(self, key: Hashable):
+        """Get a cached value.
+
+        Raises:
+            KeyError: If the key is missing, expired or from another epoch.
+        """
+        with self._lock:
+            epoch, created_at, value = self._entries[key]
+            if epoch != self._epoch or time.monotonic() - created_at > self._ttl:
+                del self._entries[key]
+                raise KeyError(key)
+            self._entries.move_to_end(key)
+            return value
+
+    def put(self, key: Hashable, value, epoch: int | None = None):
+        """Cache a value for the current epoch.
+
+        A value fetched during an epoch that has already ended is not cached.
+        """
+        with self._lock:
+            if epoch is not None and epoch != self._epoch:
+                return
+            self._entries[key] = (self._epoch, time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def get_or_fetch(self, key: Hashable, fetch: Callable[[], object]):
+        """Get a cached value or fetch and cache it.
+
+        Concurrent callers asking for the same key wait for a single fetch.
+        The lock of a key is dropped once its fetch is done, callers still
+        waiting on it find the cached value.
+        """
+        try:
+            return self.get(key)
+        except KeyError:
+            pass
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            try:
+                return self.get(key)
+            except KeyError:
+                pass
+            self._log.debug(f'Snapshot cache miss: {key}')
+            epoch = self._epoch
+            try:
+                value = fetch()
+                self.put(key, value, epoch)
+            finally:
+                with self._lock:
+                    if self._key_locks.get(key) is key_lock:
+                        del self._key_locks[key]
+            return value
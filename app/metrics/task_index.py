@@ -0,0 +1,55 @@
+from clients.qase_api import CustomField as QaseCustomField
+
+
+def get_task_key_from_url(task_url: str) -> str:
+    return task_url.rstrip('/').split('/')[-1]
+
+
+class TaskIndex:
+    """Join index between Qase test cases and their Jira automation tasks.
+
+    Custom fields of every test case are read once while the index is built,
+    after that tests and tasks are looked up by Jira key or Qase case id in constant time.
+    """
+
+    def __init__(
+        self,
+        tests: list,
+        tasks: list | None = None
+    ):
+        self.tests = tests
+        self.tests_by_task_key = {}
+        self.task_key_by_case_id = {}
+        self.tests_without_task = []
+        for test in tests:
+            task_url = QaseCustomField.AUTOMATION_TASK.get_value(test)
+            if not task_url:
+                self.tests_without_task.append(test)
+                continue
+            task_key = get_task_key_from_url(task_url)
+            self.tests_by_task_key.setdefault(task_key, []).append(test)
+            self.task_key_by_case_id[test['id']] = task_key
+        self.tasks_by_key = {}
+        self.add_tasks(tasks or [])
+
+    def add_tasks(self, tasks: list):
+        for task in tasks:
+            self.tasks_by_key[task['key']] = task
+
+    @property
+    def task_keys(self) -> list[str]:
+        return list(self.tests_by_task_key)
+
+    @property
+    def tasks(self) -> list:
+        return list(self.tasks_by_key.values())
+
+    def get_task(self, case_id: int) -> dict | None:
+        task_key = self.task_key_by_case_id.get(case_id)
+        return self.tasks_by_key.get(task_key)
+
+    def get_tests_for_tasks(self, tasks: list) -> list:
+        tests = []
+        for task in tasks:
+            tests.extend(self.tests_by_task_key.get(task['key'], []))
+        return tests
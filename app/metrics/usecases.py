@@ -1,10 +1,28 @@
+import asyncio
 from datetime import datetime
 import logging
+import time
+from typing import TYPE_CHECKING, Iterable, Iterator
 
-from clients.jira_api import StatusCategory, JiraAPI
+from clients.jira_api import Status, StatusCategory, JiraAPI, decode_issues
 from clients.jira_api import CustomField as JiraCustomField
-from clients.qase_api import QaseAPI
+from clients.qase_api import QaseAPI, decode_test_cases
 from clients.qase_api import CustomField as QaseCustomField
+from clients.records import IssueRecord, as_issue_record
+from metrics.snapshot_cache import SnapshotCache
+from metrics.task_index import TaskIndex
+from storage.jira_store import JiraStore
+from storage.qase_store import QaseStore
+
+if TYPE_CHECKING:
+    from clients.async_jira_api import AsyncJiraAPI
+    from clients.async_qase_api import AsyncQaseAPI
+
+NEW_SMOKE_TEST_TASKS_JQL = 'labels in (automation) AND labels in (new_test) AND labels in (smoke)'
+FINISHED_NEW_TEST_TASKS_JQL = f'{NEW_SMOKE_TEST_TASKS_JQL} AND status = Done AND resolution = Done'
+DONE_SMOKE_AUTOMATION_TASKS_JQL = f'{NEW_SMOKE_TEST_TASKS_JQL} AND statusCategory = Done'
+# Fields kept in the local Jira store, enough to evaluate the JQLs above locally
+SYNCED_ISSUE_FIELDS = ['resolution', 'duedate', 'statuscategorychangedate', 'updated']
 
 
 class Usecases:
@@ -12,11 +30,52 @@ class Usecases:
         self, 
         qase_api: QaseAPI | None = None, 
         jira_api: JiraAPI | None = None, 
+        async_qase_api: 'AsyncQaseAPI | None' = None,
+        async_jira_api: 'AsyncJiraAPI | None' = None,
+        snapshot_cache: SnapshotCache | None = None,
+        jira_store: JiraStore | None = None,
+        jira_full_sync_interval: float = 86400,
+        qase_store: QaseStore | None = None,
+        compact_records: bool = False,
     ):
         self._log = logging.getLogger(__name__)
         
         self._qase_api = qase_api
         self._jira_api = jira_api
+        self._async_qase_api = async_qase_api
+        self._async_jira_api = async_jira_api
+        self._snapshot_cache = snapshot_cache or SnapshotCache()
+        self._jira_store = jira_store
+        self._jira_full_sync_interval = jira_full_sync_interval
+        self._qase_store = qase_store
+        # Hold TestCaseRecord and IssueRecord objects instead of raw API dicts
+        self._compact_records = compact_records
+        # Datasets fetched ahead of the metric groups in the current refresh
+        self._prefetched = set()
+
+    def new_refresh(self) -> int:
+        """Start a new collection cycle.
+
+        Datasets are fetched at most once per cycle and shared by every metric
+        computed in it. Returns the new refresh epoch.
+        """
+        self._prefetched = set()
+        return self._snapshot_cache.new_epoch()
+
+    def invalidate_snapshot(self):
+        self._snapshot_cache.invalidate()
+
+    def refresh_datasets(self, *names: str):
+        """Drop the named datasets from the snapshot so they are fetched again.
+
+        Lets metric groups refreshed on their own schedules renew only the
+        data they own without ending the snapshot of the others. Datasets
+        prefetched for the current refresh are already fresh, so the first
+        call naming them keeps them.
+        """
+        prefetched = self._prefetched
+        self._prefetched = prefetched.difference(names)
+        self._snapshot_cache.invalidate_datasets([name for name in names if name not in prefetched])
     
     def get_qase_test_url(
         self, 
@@ -37,57 +96,293 @@ class Usecases:
     
     def get_smoke_tests(
         self, 
-        automated: bool
-    ) -> int:
-        automation = 'automated' if automated else 'is-not-automated,to-be-automated'
-        tests = self._qase_api.get_all_test_cases(
-            type='smoke', 
+        automated: bool | None
+    ) -> list:
+        """Get actual smoke tests, all of them when automated is None."""
+        if self._qase_store:
+            self.sync_qase_test_cases()
+            get_test_cases = lambda **filters: decode_test_cases(
+                self._qase_store.get_test_cases(**filters),
+                self._compact_records
+            )
+        else:
+            get_test_cases = lambda **filters: self._qase_api.get_all_test_cases(
+                **filters,
+                compact=self._compact_records
+            )
+        tests = self._snapshot_cache.get_or_fetch(
+            ('smoke_tests', automated),
+            lambda: get_test_cases(
+                type='smoke', 
+                status='actual',
+                automation=self._get_smoke_automation_filter(automated)
+            )
+        )
+        return tests
+
+    def iter_smoke_tests(
+        self,
+        automated: bool | None
+    ) -> Iterator[dict]:
+        """Iterate actual smoke tests without holding the whole suite.
+
+        Uses the snapshot or the local store when they have the tests,
+        otherwise streams them from Qase page by page.
+        """
+        try:
+            yield from self._snapshot_cache.get(('smoke_tests', automated))
+            return
+        except KeyError:
+            pass
+        if self._qase_store:
+            yield from self.get_smoke_tests(automated)
+            return
+        yield from self._qase_api.iter_all_test_cases(
+            type='smoke',
+            status='actual',
+            automation=self._get_smoke_automation_filter(automated),
+            compact=self._compact_records
+        )
+
+    def get_smoke_tests_summary(
+        self,
+        automated: bool | None
+    ) -> dict:
+        """Get number of smoke tests and their total manual execution time in hours.
+
+        Computed in one streaming pass and cached in the snapshot, so only the
+        summary is kept in memory.
+        """
+        def summarize() -> dict:
+            number_of_tests = 0
+
+            def count(tests: Iterable[dict]) -> Iterator[dict]:
+                nonlocal number_of_tests
+                for test in tests:
+                    number_of_tests += 1
+                    yield test
+
+            total_execution_time = self.get_total_manual_execution_time_for_tests(
+                count(self.iter_smoke_tests(automated))
+            )
+            return {
+                'number_of_tests': number_of_tests,
+                'total_manual_execution_time': total_execution_time
+            }
+
+        return self._snapshot_cache.get_or_fetch(('smoke_tests_summary', automated), summarize)
+
+    def sync_qase_test_cases(self) -> int:
+        """Refresh the local Qase store once per refresh.
+
+        The case list API has no filter for updated cases, so every page is
+        requested conditionally with its ETag and only pages whose body changed
+        are applied to the store. Returns the number of upserted test cases.
+        """
+        return self._snapshot_cache.get_or_fetch(
+            ('qase_sync',),
+            lambda: self._qase_store.save_pages(
+                self._qase_api.get_all_test_case_pages(self._qase_store.get_page_etags())
+            )
+        )
+
+    async def get_smoke_tests_async(
+        self,
+        automated: bool | None
+    ) -> list:
+        tests = await self._async_qase_api.get_all_test_cases(
+            type='smoke',
             status='actual',
-            automation=automation
+            automation=self._get_smoke_automation_filter(automated)
         )
         return tests
 
+    def _get_smoke_automation_filter(self, automated: bool | None) -> str | None:
+        if automated is None:
+            return None
+        return 'automated' if automated else 'is-not-automated,to-be-automated'
+
     def get_all_finished_new_test_tasks(self):
-        jql = 'labels in (automation) AND labels in (new_test) AND labels in (smoke) AND status = Done AND resolution = Done'
-        issues = self._jira_api.get_all_issues(jql)
+        if self._jira_store:
+            return [
+                issue for issue in self.get_synced_new_smoke_test_tasks()
+                if as_issue_record(issue).status_id == Status.DONE.value
+                and as_issue_record(issue).resolution == 'Done'
+            ]
+        issues = self._snapshot_cache.get_or_fetch(
+            ('finished_new_test_tasks',),
+            lambda: self._jira_api.get_all_issues(FINISHED_NEW_TEST_TASKS_JQL, compact=self._compact_records)
+        )
+        return issues
+
+    def get_done_smoke_automation_tasks(self):
+        if self._jira_store:
+            return [
+                issue for issue in self.get_synced_new_smoke_test_tasks()
+                if as_issue_record(issue).status_category_id == StatusCategory.DONE.value
+            ]
+        issues = self._snapshot_cache.get_or_fetch(
+            ('done_smoke_automation_tasks',),
+            lambda: self._jira_api.get_all_issues(
+                DONE_SMOKE_AUTOMATION_TASKS_JQL,
+                extra_fields=['duedate', 'statuscategorychangedate'],
+                compact=self._compact_records
+            )
+        )
         return issues
         
+    def get_synced_new_smoke_test_tasks(self) -> list:
+        """Get new smoke test tasks from the local Jira store, syncing it once per refresh."""
+        return self._snapshot_cache.get_or_fetch(
+            ('synced_issues', NEW_SMOKE_TEST_TASKS_JQL),
+            lambda: decode_issues(self.sync_jira_issues(NEW_SMOKE_TEST_TASKS_JQL), self._compact_records)
+        )
+
+    def sync_jira_issues(
+        self,
+        jql: str,
+        full: bool = False
+    ) -> list:
+        """Sync issues matching the JQL and their status changelogs into the local Jira store.
+
+        Only issues updated since the previous sync are downloaded and upserted.
+        A full sync runs on the first call, when forced and after the full sync
+        interval, which also drops issues that stopped matching the JQL.
+
+        Returns:
+            list: All stored issues matching the JQL.
+        """
+        started_at = time.time()
+        sync_state = self._jira_store.get_sync_state(jql)
+        full = full or sync_state is None or started_at - sync_state[1] > self._jira_full_sync_interval
+        if full:
+            self._log.info(f'Full Jira sync: {jql}')
+            issues = self._jira_api.get_all_issues(jql, extra_fields=SYNCED_ISSUE_FIELDS)
+        else:
+            self._log.info(f'Incremental Jira sync: {jql}')
+            issues = self._jira_api.get_updated_issues(jql, sync_state[0], extra_fields=SYNCED_ISSUE_FIELDS)
+        if issues:
+            changelogs = self._jira_api.get_bulk_changelogs([issue['id'] for issue in issues], ['status'])
+            self._jira_store.save_changelogs({issue['id']: changelogs.get(issue['id'], []) for issue in issues})
+        self._jira_store.save_issues(jql, issues, started_at, full)
+        self._log.info(f'Synced {len(issues)} Jira issues')
+        return self._jira_store.get_issues(jql)
+
     def get_automation_tasks_for_tests(self, tests: list) -> list:
-        automation_task_keys = []
-        for test in tests:
-            automation_task_url = QaseCustomField.AUTOMATION_TASK.get_value(test)
-            if not automation_task_url:
-                print(f'No AUTOMATION_TASK for {self.get_qase_test_url(test["id"])}')
-                continue
-            automation_task_keys.append(automation_task_url.split('/')[-1])
-        automation_tasks = self._jira_api.get_all_issues(f'key in ({",".join(automation_task_keys)})')
+        return self._get_automation_tasks(self._get_automation_task_keys(tests))
+
+    def _get_automation_tasks(self, automation_task_keys: list[str]) -> list:
+        if not automation_task_keys:
+            return []
+        automation_tasks = self._snapshot_cache.get_or_fetch(
+            ('automation_tasks', tuple(sorted(automation_task_keys))),
+            lambda: self._get_issues_by_keys(automation_task_keys)
+        )
         return automation_tasks
 
-    def find_automation_tasks_without_required_labels(self):
-        smoke_tests = self._qase_api.get_all_test_cases(
-            type='smoke', 
-            status='actual'
+    def _get_issues_by_keys(self, issue_keys: list[str]) -> list:
+        issues, unresolved_keys = self._jira_api.get_issues_by_keys(issue_keys, compact=self._compact_records)
+        if unresolved_keys:
+            self._log.warning(f'Automation tasks not found: {", ".join(unresolved_keys)}')
+        return issues
+
+    def _get_automation_task_keys(self, tests: list) -> list[str]:
+        index = TaskIndex(tests)
+        for test in index.tests_without_task:
+            self._log.info(f'No AUTOMATION_TASK for test case {test["id"]}')
+        return index.task_keys
+
+    def get_smoke_test_task_index(
+        self,
+        automated: bool | None
+    ) -> TaskIndex:
+        """Get the join index between smoke tests and their automation tasks.
+
+        Built once per snapshot from the cached smoke tests and automation tasks.
+        """
+        index = self._snapshot_cache.get_or_fetch(
+            ('smoke_test_task_index', automated),
+            lambda: self._build_task_index(self.get_smoke_tests(automated))
         )
-        for test in smoke_tests:
-            if not QaseCustomField.AUTOMATION_TASK.get_value(test):
-                # print(f'Empty AUTOMATION_TASK {test["id"]}')
+        return index
+
+    def _build_task_index(self, tests: list) -> TaskIndex:
+        index = TaskIndex(tests)
+        index.add_tasks(self._get_automation_tasks(index.task_keys))
+        return index
+
+    async def get_refresh_data_async(self) -> dict:
+        """Fetch the API datasets of a metrics refresh with the async clients.
+
+        The Qase and Jira requests run concurrently on the current event loop;
+        only the automation tasks lookup waits for the manual smoke tests it is based on.
+        Datasets kept in a local store are left to the store sync. The results
+        are decoded like the sync getters decode them and stored in the snapshot
+        of the current refresh epoch, where the metric groups find them.
+
+        Returns:
+            dict: Fetched datasets by snapshot key.
+        """
+        async def get_manual_smoke_tests_with_tasks() -> dict:
+            manual_smoke_tests = decode_test_cases(await self.get_smoke_tests_async(automated=False), self._compact_records)
+            datasets = {('smoke_tests', False): manual_smoke_tests}
+            automation_task_keys = self._get_automation_task_keys(manual_smoke_tests)
+            if automation_task_keys:
+                automation_tasks, unresolved_keys = await self._async_jira_api.get_issues_by_keys(automation_task_keys)
+                if unresolved_keys:
+                    self._log.warning(f'Automation tasks not found: {", ".join(unresolved_keys)}')
+                datasets[('automation_tasks', tuple(sorted(automation_task_keys)))] = decode_issues(automation_tasks, self._compact_records)
+            return datasets
+
+        async def get_automated_smoke_tests() -> dict:
+            automated_smoke_tests = await self.get_smoke_tests_async(automated=True)
+            return {('smoke_tests', True): decode_test_cases(automated_smoke_tests, self._compact_records)}
+
+        async def get_done_smoke_automation_tasks() -> dict:
+            issues = await self._async_jira_api.get_all_issues(
+                DONE_SMOKE_AUTOMATION_TASKS_JQL,
+                extra_fields=['duedate', 'statuscategorychangedate']
+            )
+            return {('done_smoke_automation_tasks',): decode_issues(issues, self._compact_records)}
+
+        epoch = self._snapshot_cache.epoch
+        fetches = []
+        if self._qase_store is None:
+            fetches += [get_manual_smoke_tests_with_tasks(), get_automated_smoke_tests()]
+        if self._jira_store is None:
+            fetches.append(get_done_smoke_automation_tasks())
+        datasets = {}
+        for fetched in await asyncio.gather(*fetches):
+            datasets.update(fetched)
+        for key, value in datasets.items():
+            self._snapshot_cache.put(key, value, epoch)
+        if epoch == self._snapshot_cache.epoch:
+            self._prefetched = {key[0] for key in datasets}
+        return datasets
+
+    def find_automation_tasks_without_required_labels(self):
+        index = self.get_smoke_test_task_index(automated=None)
+        for automation_task_key in index.task_keys:
+            automation_task = index.tasks_by_key.get(automation_task_key)
+            if automation_task is None:
+                self._log.warning(f'Automation task not found {automation_task_key}')
                 continue
-            automation_task_key = QaseCustomField.AUTOMATION_TASK.get_value(test).split('/')[-1]
-            jira_task_labels = self._jira_api.get_issue(automation_task_key)['fields']['labels']
+            jira_task_labels = as_issue_record(automation_task).labels
             if not all(label in jira_task_labels for label in ['automation', 'new_test', 'smoke']):
-                print(f'No required labels {automation_task_key}. Labels: {jira_task_labels}')
+                self._log.warning(f'No required labels {automation_task_key}. Labels: {jira_task_labels}')
 
     def get_due_date_status_change_diff_days(
         self,
-        jira_issue: dict, 
+        jira_issue: dict | IssueRecord, 
         status_category: StatusCategory
     ) -> int:
-        if jira_issue['fields']['status']['statusCategory']['id'] != status_category.value:
+        jira_issue = as_issue_record(jira_issue)
+        if jira_issue.status_category_id != status_category.value:
             raise Exception(f'Issue status category is not {status_category.name}')
-        if jira_issue['fields']['duedate'] is None:
+        if jira_issue.duedate is None:
             raise Exception('Issue has no due date')
-        due_date = datetime.fromisoformat(jira_issue['fields']['duedate']).replace(tzinfo=None)
-        status_change_date = datetime.fromisoformat(jira_issue['fields']['statuscategorychangedate']).replace(tzinfo=None)
+        due_date = datetime.combine(jira_issue.duedate, datetime.min.time())
+        status_change_date = jira_issue.status_category_change_date.replace(tzinfo=None)
         days_diff = (due_date - status_change_date).days
         return days_diff
 
@@ -96,22 +391,53 @@ class Usecases:
         issue_key: str, 
         field: str
     ) -> list:
-        issue_changes = self._jira_api.get_changelogs(issue_key)
-        filtered_changes = []
-        for value in issue_changes['values']:
-            for item in value['items']:
-                if item['field'] == field:
-                    filtered_changes.append(value)
+        filtered_changes = self._snapshot_cache.get_or_fetch(
+            ('changelog', issue_key, field),
+            lambda: self._jira_api.get_all_changelogs(issue_key, [field])
+        )
         return filtered_changes
 
+    def get_jira_issues_changelogs(
+        self,
+        issues: list,
+        field: str
+    ) -> dict[str, list]:
+        """Get changelogs of many issues with bulk requests.
+
+        Args:
+            issues (list): Jira issues with id and key.
+            field (str): Keep only changes of this field.
+
+        Returns:
+            dict[str, list]: Changes of the field by issue key.
+        """
+        if not issues:
+            return {}
+        issue_keys_by_id = {issue['id']: issue['key'] for issue in issues}
+        if self._jira_store and field == 'status':
+            # Status changelogs of synced issues are kept in the store
+            changelogs = self._jira_store.get_changelogs(list(issue_keys_by_id))
+            return {
+                issue_key: changelogs.get(issue_id, [])
+                for issue_id, issue_key in issue_keys_by_id.items()
+            }
+        changelogs = self._snapshot_cache.get_or_fetch(
+            ('changelogs', tuple(sorted(issue_keys_by_id)), field),
+            lambda: self._jira_api.get_bulk_changelogs(list(issue_keys_by_id), [field])
+        )
+        return {
+            issue_key: changelogs.get(issue_id, [])
+            for issue_id, issue_key in issue_keys_by_id.items()
+        }
+
     def get_total_manual_execution_time_for_tests(
         self, 
-        tests: list
+        tests: Iterable[dict]
     ) -> float:
         """Get total execution time for tests in hours
 
         Args:
-            tests (list): list of test cases from Qase API
+            tests (Iterable[dict]): list or stream of test cases from Qase API
 
         Returns:
             float: total execution time in hours
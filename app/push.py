@@ -0,0 +1,101 @@
+import argparse
+import logging
+import sys
+
+from prometheus_client import CollectorRegistry, Gauge, pushadd_to_gateway
+
+from config.env_vars import get_env_vars
+from metrics.collector import MetricsCollector
+from service import collector, get_metric_groups, start_refresh
+
+
+EXIT_OK = 0
+EXIT_PARTIAL_FAILURE = 1
+EXIT_FAILURE = 2
+
+log = logging.getLogger(__name__)
+
+
+def collect() -> list[str]:
+    """Run every metric group once from a single snapshot.
+
+    Returns:
+        list[str]: Names of the groups that failed.
+    """
+    start_refresh()
+    failed_groups = []
+    for group in get_metric_groups():
+        try:
+            group.update()
+        except Exception:
+            log.exception(f'Metric group {group.name} failed')
+            failed_groups.append(group.name)
+    return failed_groups
+
+
+def get_push_registry(
+    values: dict[str, float | dict[tuple[str, ...], float]],
+    failed_groups: list[str]
+) -> CollectorRegistry:
+    registry = CollectorRegistry()
+    push_collector = MetricsCollector(timestamps=False)
+    push_collector.set_values(values)
+    registry.register(push_collector)
+    failed_groups_gauge = Gauge(
+        'collection_failed_groups',
+        'Number of metric groups that failed in the pushed collection',
+        registry=registry
+    )
+    failed_groups_gauge.set(len(failed_groups))
+    last_push = Gauge(
+        'collection_last_push_timestamp_seconds',
+        'Unix time of the last pushed collection',
+        registry=registry
+    )
+    last_push.set_to_current_time()
+    return registry
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Collect every metric once and push it to the Pushgateway in one request.
+
+    Metrics of failed groups are left out of the push. The push replaces only
+    the pushed metrics of the group, so the Pushgateway keeps their last good values.
+
+    Returns:
+        int: 0 when every group succeeded, 1 when some groups failed and 2
+        when every group failed or the push itself failed.
+    """
+    env_vars = get_env_vars()
+    parser = argparse.ArgumentParser(description='Collect metrics once and push them to the Pushgateway')
+    parser.add_argument('--gateway', default=env_vars.PUSHGATEWAY_URL, help='Pushgateway URL')
+    parser.add_argument('--job', default=env_vars.PUSHGATEWAY_JOB, help='Job name of the pushed group')
+    parser.add_argument('--project', default=env_vars.QASE_PROJECT_CODE, help='Value of the project grouping key')
+    parser.add_argument('--source', default='batch', help='Value of the source grouping key, e.g. cron or ci')
+    args = parser.parse_args(argv)
+
+    failed_groups = collect()
+    values = collector.get_values()
+    if not values:
+        log.error('Every metric group failed, nothing to push')
+        return EXIT_FAILURE
+    try:
+        pushadd_to_gateway(
+            args.gateway,
+            job=args.job,
+            registry=get_push_registry(values, failed_groups),
+            grouping_key={'project': args.project, 'source': args.source}
+        )
+    except OSError:
+        log.exception(f'Push to {args.gateway} failed')
+        return EXIT_FAILURE
+    print(f'Pushed {len(values)} metrics to {args.gateway}')
+    if failed_groups:
+        log.error(f'Failed metric groups: {", ".join(failed_groups)}')
+        return EXIT_PARTIAL_FAILURE
+    return EXIT_OK
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(main())
@@ -0,0 +1,79 @@
+import logging
+import random
+import threading
+import time
+from typing import Callable
+
+
+class MetricGroup:
+    def __init__(
+        self,
+        name: str,
+        update: Callable[[], None],
+        interval: float,
+        jitter: float = 0.1
+    ):
+        """Group of metrics refreshed together.
+
+        Args:
+            name (str): Group name used in logs and thread names.
+            update (Callable[[], None]): Computes and sets the group's metrics.
+            interval (float): Seconds between refreshes.
+            jitter (float): Relative random spread of the interval, 0.1 means ±10%.
+        """
+        self.name = name
+        self.update = update
+        self.interval = interval
+        self.jitter = jitter
+        self.last_success = None
+        self.last_error = None
+
+    def get_delay(self) -> float:
+        return self.interval * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+
+class MetricScheduler:
+    """Refreshes every metric group on its own interval in its own worker thread.
+
+    A slow or failing group does not delay the others, and the exporter keeps
+    serving the last values a group set until its next successful refresh.
+    """
+
+    def __init__(self, groups: list[MetricGroup]):
+        self._log = logging.getLogger(__name__)
+        self._groups = groups
+        self._stop = threading.Event()
+        self._threads = []
+
+    def start(self):
+        for group in self._groups:
+            thread = threading.Thread(
+                target=self._run,
+                args=(group,),
+                name=f'metrics-{group.name}',
+                daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def _run(self, group: MetricGroup):
+        while not self._stop.is_set():
+            started_at = time.monotonic()
+            try:
+                group.update()
+            except Exception as e:
+                group.last_error = e
+                self._log.exception(f'Metric group {group.name} failed')
+            else:
+                group.last_success = time.time()
+                self._log.info(f'Metric group {group.name} updated in {time.monotonic() - started_at:.1f}s')
+            self._stop.wait(group.get_delay())
+
+    def stop(self, timeout: float | None = None):
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout)
+
+    def wait(self):
+        """Block until the scheduler is stopped."""
+        self._stop.wait()
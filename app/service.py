@@ -1,23 +1,152 @@
-from prometheus_client import start_http_server, Gauge, CollectorRegistry
-import time
+import logging
 
-from metrics.metrics import get_number_of_smoke_tests
+from prometheus_client import start_http_server
 
+from config.env_vars import get_env_vars
+from metrics.collector import MetricsCollector
+from metrics.instrumentation import registry, track_collection
+from metrics.metrics import (
+    get_async_transport,
+    get_manual_smoke_test_task_summary,
+    get_number_of_open_pull_requests,
+    get_pull_request_metrics,
+    get_smoke_automation_time_diff,
+    get_test_run_result_metrics,
+    get_usecases
+)
+from scheduler import MetricGroup, MetricScheduler
 
-registry = CollectorRegistry()
-automated_smoke_tests = Gauge('automated_smoke_tests', 'Number of automated smoke tests', registry=registry)
-manual_smoke_tests = Gauge('manual_smoke_tests', 'Number of manual smoke tests', registry=registry)
+
+log = logging.getLogger(__name__)
+
+collector = MetricsCollector()
+registry.register(collector)
+
+
+# Every group computes all of its values before handing them to the collector,
+# so a failed refresh leaves the last good values of the group in place.
+
+def update_qase_metrics():
+    get_usecases().refresh_datasets('qase_sync', 'smoke_tests', 'smoke_tests_summary')
+    automated_summary = get_usecases().get_smoke_tests_summary(automated=True)
+    manual_summary = get_usecases().get_smoke_tests_summary(automated=False)
+    collector.set_values({
+        'automated_smoke_tests': automated_summary['number_of_tests'],
+        'manual_smoke_tests': manual_summary['number_of_tests'],
+        'automated_smoke_tests_execution_hours': automated_summary['total_manual_execution_time'],
+        'manual_smoke_tests_execution_hours': manual_summary['total_manual_execution_time']
+    })
+
+
+def update_qase_result_metrics():
+    stats = get_test_run_result_metrics()
+    collector.set_values({
+        'qase_test_results': stats['number_of_results'],
+        'qase_test_pass_rate': stats['pass_rate'],
+        'qase_flaky_test_cases': stats['number_of_flaky_cases'],
+        'qase_test_status_flips': stats['number_of_status_flips'],
+        'qase_test_run_duration_seconds': {
+            (str(percentile / 100),): duration
+            for percentile, duration in stats['run_duration_percentiles'].items()
+        },
+        'qase_flaky_test_case_status_flips': {
+            (str(case_id),): flips for case_id, flips, _ in stats['flaky_cases']
+        },
+        'qase_flaky_test_case_pass_rate': {
+            (str(case_id),): pass_rate for case_id, _, pass_rate in stats['flaky_cases']
+        }
+    })
+
+
+def update_jira_metrics():
+    get_usecases().refresh_datasets('automation_tasks', 'smoke_test_task_index')
+    summary = get_manual_smoke_test_task_summary()
+    collector.set_values({
+        'blocked_manual_smoke_tests': summary['number_of_blocked_tests'],
+        'blocked_manual_smoke_tests_execution_hours': summary['blocked_tests_execution_time'],
+        'smoke_tests_without_automation_task': summary['number_of_tests_without_task'],
+        'smoke_tests_without_automation_task_execution_hours': summary['tests_without_task_execution_time']
+    })
+
+
+def update_automation_time_diff_metrics():
+    get_usecases().refresh_datasets('done_smoke_automation_tasks', 'changelogs', 'synced_issues')
+    time_diff = get_smoke_automation_time_diff()
+    values = {
+        'smoke_automation_days_diff': time_diff['total_days_diff'],
+        'smoke_automation_expected_days': time_diff['total_expected_days']
+    }
+    for distribution in ('lateness', 'expected_duration', 'actual_duration'):
+        name = f'smoke_automation_{distribution}_days'
+        values[name] = {
+            (group,): (stats['buckets'], stats['sum'])
+            for group, stats in time_diff[distribution].items()
+        }
+        values[f'{name}_quantile'] = {
+            (group, str(percentile / 100)): value
+            for group, stats in time_diff[distribution].items()
+            for percentile, value in stats['percentiles'].items()
+        }
+    collector.set_values(values)
+
+
+def update_github_metrics():
+    number_of_open_pulls = get_number_of_open_pull_requests()
+    pull_request_metrics = get_pull_request_metrics()
+    collector.set_values({
+        'open_pull_requests': number_of_open_pulls,
+        'merged_pull_requests': pull_request_metrics['number_of_pulls'],
+        'merged_pull_requests_with_test_changes': pull_request_metrics['pulls_with_test_changes'],
+        'pull_request_cycle_time_hours': pull_request_metrics['cycle_time'],
+        'pull_request_time_to_first_review_hours': pull_request_metrics['time_to_first_review'],
+        'pull_request_test_files_changed': pull_request_metrics['test_files_changed'],
+        'pull_request_test_lines_changed': pull_request_metrics['test_lines_changed']
+    })
+
+
+def tracked(group: str, update):
+    def run():
+        with track_collection(group):
+            update()
+    return run
+
+
+def get_metric_groups() -> list[MetricGroup]:
+    env_vars = get_env_vars()
+    return [
+        MetricGroup('qase', tracked('qase', update_qase_metrics), env_vars.QASE_METRICS_INTERVAL, env_vars.SCHEDULER_JITTER),
+        MetricGroup('qase_results', tracked('qase_results', update_qase_result_metrics), env_vars.QASE_RESULTS_INTERVAL, env_vars.SCHEDULER_JITTER),
+        MetricGroup('jira', tracked('jira', update_jira_metrics), env_vars.JIRA_METRICS_INTERVAL, env_vars.SCHEDULER_JITTER),
+        MetricGroup('automation_time_diff', tracked('automation_time_diff', update_automation_time_diff_metrics), env_vars.AUTOMATION_TIME_DIFF_INTERVAL, env_vars.SCHEDULER_JITTER),
+        MetricGroup('github', tracked('github', update_github_metrics), env_vars.GITHUB_METRICS_INTERVAL, env_vars.SCHEDULER_JITTER)
+    ]
+
+
+def start_refresh():
+    """Start a new snapshot and fetch its Qase and Jira datasets concurrently.
+
+    When the concurrent fetch fails the metric groups fetch the datasets
+    themselves, so each of them still succeeds or fails on its own.
+    """
+    get_usecases().new_refresh()
+    try:
+        get_async_transport().run(get_usecases().get_refresh_data_async())
+    except Exception:
+        log.exception('Concurrent refresh failed, metric groups fetch their datasets one by one')
 
 
 def update_metrics():
-    automated_smoke_tests.set(get_number_of_smoke_tests(automated=True))
-    manual_smoke_tests.set(get_number_of_smoke_tests(automated=False))
+    """Refresh every metric group once from a single snapshot."""
+    with track_collection('cycle'):
+        start_refresh()
+        for group in get_metric_groups():
+            group.update()
 
 
 if __name__ == "__main__":
     start_http_server(8000, registry=registry)
     print("Prometheus server started on port 8000")
-    
-    while True:
-        update_metrics()
-        time.sleep(1800)
+
+    scheduler = MetricScheduler(get_metric_groups())
+    scheduler.start()
+    scheduler.wait()
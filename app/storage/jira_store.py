@@ -0,0 +1,127 @@
+import json
+import sqlite3
+import threading
+
+
+class JiraStore:
+    """Local SQLite store of Jira issues and their changelogs.
+
+    Issues are stored once by key together with the scopes (JQL queries) they
+    were synced for, so a scope can be refreshed incrementally by upserting
+    only the issues updated since its last sync.
+    """
+
+    def __init__(self, path: str):
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._connection:
+            self._connection.executescript('''
+                CREATE TABLE IF NOT EXISTS issues (
+                    key TEXT PRIMARY KEY,
+                    id TEXT NOT NULL,
+                    fields TEXT NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS scope_issues (
+                    scope TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    PRIMARY KEY (scope, key)
+                );
+                CREATE TABLE IF NOT EXISTS changelogs (
+                    issue_id TEXT NOT NULL,
+                    history_id INTEGER NOT NULL,
+                    history TEXT NOT NULL,
+                    PRIMARY KEY (issue_id, history_id)
+                );
+                CREATE TABLE IF NOT EXISTS sync_state (
+                    scope TEXT PRIMARY KEY,
+                    synced_at REAL NOT NULL,
+                    full_synced_at REAL NOT NULL
+                );
+            ''')
+
+    def get_sync_state(self, scope: str) -> tuple[float, float] | None:
+        """Get (synced_at, full_synced_at) timestamps of a scope, None if it was never synced."""
+        with self._lock:
+            row = self._connection.execute(
+                'SELECT synced_at, full_synced_at FROM sync_state WHERE scope = ?',
+                (scope,)
+            ).fetchone()
+        return row
+
+    def save_issues(
+        self,
+        scope: str,
+        issues: list,
+        synced_at: float,
+        full: bool = False
+    ):
+        """Upsert issues of a scope and move its watermark.
+
+        A full sync also replaces the scope membership, dropping issues that no longer match it.
+        """
+        with self._lock, self._connection:
+            if full:
+                self._connection.execute('DELETE FROM scope_issues WHERE scope = ?', (scope,))
+            self._connection.executemany(
+                'INSERT OR REPLACE INTO issues (key, id, fields) VALUES (?, ?, ?)',
+                ((issue['key'], issue['id'], json.dumps(issue['fields'])) for issue in issues)
+            )
+            self._connection.executemany(
+                'INSERT OR IGNORE INTO scope_issues (scope, key) VALUES (?, ?)',
+                ((scope, issue['key']) for issue in issues)
+            )
+            full_synced_at = synced_at
+            if not full:
+                row = self._connection.execute(
+                    'SELECT full_synced_at FROM sync_state WHERE scope = ?',
+                    (scope,)
+                ).fetchone()
+                full_synced_at = row[0] if row else 0.0
+            self._connection.execute(
+                'INSERT OR REPLACE INTO sync_state (scope, synced_at, full_synced_at) VALUES (?, ?, ?)',
+                (scope, synced_at, full_synced_at)
+            )
+
+    def get_issues(self, scope: str) -> list:
+        with self._lock:
+            rows = self._connection.execute(
+                'SELECT issues.key, issues.id, issues.fields FROM issues '
+                'JOIN scope_issues ON scope_issues.key = issues.key '
+                'WHERE scope_issues.scope = ? ORDER BY issues.key',
+                (scope,)
+            ).fetchall()
+        return [{'key': key, 'id': id, 'fields': json.loads(fields)} for key, id, fields in rows]
+
+    def save_changelogs(self, changelogs: dict[str, list]):
+        """Replace the stored changelogs of the given issues."""
+        with self._lock, self._connection:
+            self._connection.executemany(
+                'DELETE FROM changelogs WHERE issue_id = ?',
+                ((issue_id,) for issue_id in changelogs)
+            )
+            self._connection.executemany(
+                'INSERT INTO changelogs (issue_id, history_id, history) VALUES (?, ?, ?)',
+                (
+                    (issue_id, int(history['id']), json.dumps(history))
+                    for issue_id, histories in changelogs.items()
+                    for history in histories
+                )
+            )
+
+    def get_changelogs(self, issue_ids: list[str]) -> dict[str, list]:
+        """Get stored changelogs by issue ID, oldest first."""
+        changelogs = {issue_id: [] for issue_id in issue_ids}
+        with self._lock:
+            for i in range(0, len(issue_ids), 500):
+                chunk = issue_ids[i:i + 500]
+                rows = self._connection.execute(
+                    f'SELECT issue_id, history FROM changelogs WHERE issue_id IN ({",".join("?" * len(chunk))}) '
+                    'ORDER BY issue_id, history_id',
+                    chunk
+                ).fetchall()
+                for issue_id, history in rows:
+                    changelogs[issue_id].append(json.loads(history))
+        return changelogs
+
+    def close(self):
+        self._connection.close()
@@ -0,0 +1,132 @@
+import json
+import os
+import threading
+
+import numpy as np
+
+
+# Result statuses as stored in the status column, other statuses are stored as -1
+STATUS_CODES = {
+    'passed': 0,
+    'failed': 1,
+    'blocked': 2,
+    'skipped': 3,
+    'invalid': 4
+}
+
+COLUMN_DTYPES = {
+    'case_id': np.int64,
+    'run_id': np.int64,
+    'status': np.int8,
+    'time_spent_ms': np.float64,
+    'end_time': 'datetime64[s]'
+}
+
+
+def get_time_spent_ms(result: dict) -> float:
+    if result.get('time_spent_ms') is not None:
+        return result['time_spent_ms']
+    if result.get('time') is not None:
+        return result['time'] * 1000
+    return np.nan
+
+
+class QaseResultStore:
+    """Columnar store of Qase test run results backed by NumPy arrays.
+
+    Every result field the metrics use is a column of a growable array, so a
+    hundred thousand results take a few megabytes and are aggregated without
+    touching Python objects. The ingestion cursor is saved in the same .npz
+    file as the columns and the file is replaced atomically, so a restart
+    resumes from the last saved page without losing or duplicating results.
+    Without a path the store lives in memory only.
+    """
+
+    def __init__(
+        self,
+        path: str | None = None,
+        capacity: int = 1024
+    ):
+        self._lock = threading.Lock()
+        self._path = path
+        self._size = 0
+        self._columns = {name: np.empty(capacity, dtype=dtype) for name, dtype in COLUMN_DTYPES.items()}
+        self.cursor = None
+        if path and os.path.exists(path):
+            self._load(path)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _load(self, path: str):
+        with np.load(path) as data:
+            for name in COLUMN_DTYPES:
+                self._columns[name] = data[name]
+            self._size = len(data['case_id'])
+            self.cursor = json.loads(str(data['cursor'])) or None
+
+    def _reserve(self, size: int):
+        capacity = len(self._columns['case_id'])
+        if size <= capacity:
+            return
+        capacity = max(size, capacity * 2)
+        for name, column in self._columns.items():
+            grown = np.empty(capacity, dtype=column.dtype)
+            grown[:self._size] = column[:self._size]
+            self._columns[name] = grown
+
+    def extend(self, results: list[dict]):
+        """Append results as returned by the Qase result list.
+
+        Each field is decoded into its column in one pass, so no object is
+        kept per result.
+        """
+        count = len(results)
+        if not count:
+            return
+        end_times = np.array([(result.get('end_time') or 'NaT')[:19] for result in results], dtype='datetime64[s]')
+        with self._lock:
+            self._reserve(self._size + count)
+            chunk = slice(self._size, self._size + count)
+            columns = self._columns
+            columns['case_id'][chunk] = np.fromiter((result['case_id'] or 0 for result in results), np.int64, count)
+            columns['run_id'][chunk] = np.fromiter((result['run_id'] or 0 for result in results), np.int64, count)
+            columns['status'][chunk] = np.fromiter((STATUS_CODES.get(result['status'], -1) for result in results), np.int8, count)
+            columns['time_spent_ms'][chunk] = np.fromiter(map(get_time_spent_ms, results), np.float64, count)
+            columns['end_time'][chunk] = end_times
+            self._size += count
+
+    def prune(self, before: np.datetime64) -> int:
+        """Drop results that ended before a time.
+
+        Returns:
+            int: Number of dropped results.
+        """
+        with self._lock:
+            keep = ~(self._columns['end_time'][:self._size] < before)
+            kept = int(keep.sum())
+            if kept == self._size:
+                return 0
+            for name, column in self._columns.items():
+                column[:kept] = column[:self._size][keep]
+            dropped = self._size - kept
+            self._size = kept
+        return dropped
+
+    def get_columns(self) -> dict[str, np.ndarray]:
+        """Get copies of the stored columns by name."""
+        with self._lock:
+            return {name: column[:self._size].copy() for name, column in self._columns.items()}
+
+    def save(self):
+        """Write the columns and the cursor to the store file."""
+        if not self._path:
+            return
+        temp_path = f'{self._path}.tmp.npz'
+        with self._lock:
+            np.savez(
+                temp_path,
+                cursor=np.array(json.dumps(self.cursor)),
+                **{name: column[:self._size] for name, column in self._columns.items()}
+            )
+        os.replace(temp_path, self._path)
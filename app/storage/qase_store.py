@@ -0,0 +1,137 @@
+import json
+import sqlite3
+import threading
+
+from clients.qase_api import CASE_AUTOMATION_IDS, CASE_STATUS_IDS, CASE_TYPE_IDS
+
+
+class QaseStore:
+    """Local SQLite store of Qase test cases keyed by case id.
+
+    Besides the cases it keeps the ETag, body hash and case ids of every page
+    of the case list, so a refresh only decodes and upserts pages that changed.
+    The type, status and automation filters of the case list API run locally.
+    """
+
+    def __init__(self, path: str):
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._connection:
+            self._connection.executescript('''
+                CREATE TABLE IF NOT EXISTS cases (
+                    id INTEGER PRIMARY KEY,
+                    updated_at TEXT,
+                    type INTEGER,
+                    status INTEGER,
+                    automation INTEGER,
+                    data TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS cases_filters ON cases (type, status, automation);
+                CREATE TABLE IF NOT EXISTS pages (
+                    page_offset INTEGER PRIMARY KEY,
+                    etag TEXT,
+                    hash TEXT NOT NULL,
+                    case_ids TEXT NOT NULL
+                );
+            ''')
+
+    def get_page_etags(self) -> dict[int, str]:
+        with self._lock:
+            rows = self._connection.execute('SELECT page_offset, etag FROM pages WHERE etag IS NOT NULL').fetchall()
+        return dict(rows)
+
+    def save_pages(self, pages: list[dict]) -> int:
+        """Apply a full list of case pages and drop cases that are gone.
+
+        Not modified pages and pages whose body hash is unchanged keep their
+        stored cases, other pages upsert cases whose updated_at changed.
+
+        Args:
+            pages (list[dict]): Pages from QaseAPI.get_all_test_case_pages.
+
+        Returns:
+            int: Number of upserted test cases.
+        """
+        upserted = 0
+        with self._lock, self._connection:
+            stored_pages = {
+                offset: (page_hash, case_ids)
+                for offset, page_hash, case_ids in self._connection.execute('SELECT page_offset, hash, case_ids FROM pages')
+            }
+            stored_updated_at = dict(self._connection.execute('SELECT id, updated_at FROM cases'))
+            current_case_ids = set()
+            for page in pages:
+                stored_page = stored_pages.get(page['offset'])
+                if stored_page and (page['data'] is None or stored_page[0] == page['hash']):
+                    current_case_ids.update(json.loads(stored_page[1]))
+                    continue
+                if page['data'] is None:
+                    continue
+                entities = page['data']['result']['entities']
+                changed = [
+                    test_case for test_case in entities
+                    if test_case['id'] not in stored_updated_at
+                    or stored_updated_at[test_case['id']] != test_case.get('updated_at')
+                ]
+                self._connection.executemany(
+                    'INSERT OR REPLACE INTO cases (id, updated_at, type, status, automation, data) VALUES (?, ?, ?, ?, ?, ?)',
+                    (
+                        (
+                            test_case['id'],
+                            test_case.get('updated_at'),
+                            test_case.get('type'),
+                            test_case.get('status'),
+                            test_case.get('automation'),
+                            json.dumps(test_case)
+                        )
+                        for test_case in changed
+                    )
+                )
+                upserted += len(changed)
+                case_ids = [test_case['id'] for test_case in entities]
+                current_case_ids.update(case_ids)
+                self._connection.execute(
+                    'INSERT OR REPLACE INTO pages (page_offset, etag, hash, case_ids) VALUES (?, ?, ?, ?)',
+                    (page['offset'], page['etag'], page['hash'], json.dumps(case_ids))
+                )
+            self._connection.execute(
+                'DELETE FROM pages WHERE page_offset > ?',
+                (max(page['offset'] for page in pages),)
+            )
+            self._connection.executemany(
+                'DELETE FROM cases WHERE id = ?',
+                ((case_id,) for case_id in stored_updated_at.keys() - current_case_ids)
+            )
+        return upserted
+
+    def get_test_cases(
+        self,
+        type: str | None = None,
+        status: str | None = None,
+        automation: str | None = None
+    ) -> list:
+        """Get stored test cases with the same filters as QaseAPI.get_all_test_cases.
+
+        Filters take the API values, several values are separated by commas.
+        """
+        conditions = []
+        params = []
+        for column, value, ids in (
+            ('type', type, CASE_TYPE_IDS),
+            ('status', status, CASE_STATUS_IDS),
+            ('automation', automation, CASE_AUTOMATION_IDS)
+        ):
+            if not value:
+                continue
+            values = [ids[item] for item in value.split(',')]
+            conditions.append(f'{column} IN ({",".join("?" * len(values))})')
+            params += values
+        query = 'SELECT data FROM cases'
+        if conditions:
+            query += ' WHERE ' + ' AND '.join(conditions)
+        with self._lock:
+            rows = self._connection.execute(query + ' ORDER BY id', params).fetchall()
+        return [json.loads(data) for data, in rows]
+
+    def close(self):
+        self._connection.close()
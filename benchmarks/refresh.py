@@ -0,0 +1,405 @@
+"""End-to-end refresh benchmark of the metrics service on synthetic projects.
+
+Every scenario generates a Qase project, a Jira project with status
+changelogs, Qase test run results and GitHub pull requests of its scale and
+serves them from the stub servers of the tests. The service runs in a child
+process pointed at the stubs, so its peak RSS does not include the datasets.
+Each metric function of metrics.metrics runs once on an empty snapshot,
+followed by a full service.update_metrics, and for each of them the wall
+time, the requests the stubs answered and the response bytes are reported.
+The stubs do not limit requests, so client pacing is disabled and the
+numbers show throughput. The Qase result store is kept between steps like
+in the service, so update_metrics ingests results incrementally.
+
+Results are printed as JSON and written to --output. With --baseline, a
+previous output, the process exits with status 1 when a step got slower or
+made more requests or transferred more bytes than the tolerance allows, or
+when peak RSS grew by more than that.
+
+Usage:
+    python benchmarks/refresh.py [--scenarios small medium large] [--latency 0.0]
+        [--output refresh.json] [--baseline baseline.json] [--tolerance 0.2]
+"""
+import argparse
+from datetime import date, datetime, timedelta, timezone
+import json
+import logging
+import os
+import random
+import resource
+import subprocess
+import sys
+import time
+
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_DIR = os.path.join(ROOT_DIR, 'app')
+TESTS_DIR = os.path.join(ROOT_DIR, 'tests')
+SCENARIOS = {
+    'small': {'qase_cases': 1000, 'jira_issues': 500, 'test_results': 5000, 'pull_requests': 100},
+    'medium': {'qase_cases': 10000, 'jira_issues': 5000, 'test_results': 50000, 'pull_requests': 500},
+    'large': {'qase_cases': 100000, 'jira_issues': 50000, 'test_results': 200000, 'pull_requests': 2000},
+}
+PROJECT_CODE = 'PRJ'
+REPO_NAME = 'owner/repo'
+GROUP_LABELS = ['team_web', 'team_mobile', 'team_api']
+# Status id, status category id and share of the automation tasks
+TASK_STATUSES = [('10001', '3', 0.5), ('3', '4', 0.2), ('10160', '4', 0.15), ('10000', '2', 0.15)]
+RESULT_STATUSES = [('passed', 0.85), ('failed', 0.1), ('skipped', 0.03), ('blocked', 0.02)]
+# Values compared with the baseline, the tolerance applies to every one of them
+COMPARED_VALUES = ['wall_time_s', 'requests', 'bytes']
+# Growth below these amounts is noise even when it is beyond the tolerance, e.g. on millisecond steps
+NOISE = {'wall_time_s': 0.05, 'requests': 0, 'bytes': 0, 'peak_rss_mb': 5.0}
+
+
+def get_peak_rss_mb() -> float:
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return round(peak_rss / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def choose(rng: random.Random, weighted: list[tuple]) -> tuple:
+    return rng.choices(weighted, weights=[item[-1] for item in weighted])[0]
+
+
+def make_qase_cases(
+    rng: random.Random,
+    count: int,
+    number_of_tasks: int
+) -> list[dict]:
+    """Make cases of all types, a third automated, with manual execution times and task links on most manual ones."""
+    cases = []
+    for case_id in range(1, count + 1):
+        automation = rng.choice([0, 1, 2])
+        custom_fields = [{'id': 6, 'value': str(rng.randint(5, 60))}]
+        if automation != 2 and rng.random() < 0.8:
+            task_number = rng.randint(1, number_of_tasks)
+            custom_fields.append({'id': 5, 'value': f'https://jira.example.com/browse/{PROJECT_CODE}-{task_number}'})
+        cases.append({
+            'id': case_id,
+            'title': f'Test case {case_id}',
+            'type': 3 if rng.random() < 0.7 else rng.choice([2, 4]),
+            'status': 0 if rng.random() < 0.9 else 2,
+            'automation': automation,
+            'custom_fields': custom_fields
+        })
+    return cases
+
+
+def format_jira_time(moment: datetime) -> str:
+    return moment.strftime('%Y-%m-%dT%H:%M:%S.000+0000')
+
+
+def make_jira_issues(
+    rng: random.Random,
+    count: int,
+    today: date
+) -> tuple[list[dict], dict[str, list[dict]]]:
+    """Make smoke automation tasks and their changelogs.
+
+    Started tasks move to In Progress, done ones also through Review to Done,
+    and some of the changes are followed by a label change.
+    """
+    issues = []
+    changelogs = {}
+    history_id = 0
+    for number in range(1, count + 1):
+        key = f'{PROJECT_CODE}-{number}'
+        status_id, category_id, _ = choose(rng, TASK_STATUSES)
+        created = datetime.combine(today, datetime.min.time()) - timedelta(days=rng.randint(30, 365))
+        started = created + timedelta(days=rng.randint(0, 20), hours=rng.randint(0, 23))
+        done = started + timedelta(days=rng.randint(1, 30), hours=rng.randint(0, 23))
+        transitions = []
+        if status_id != '10000':
+            transitions.append((started, '3'))
+        if status_id == '10001':
+            transitions.extend([(done - timedelta(hours=rng.randint(1, 48)), '10118'), (done, '10001')])
+        histories = []
+        for moment, to_status in transitions:
+            history_id += 1
+            histories.append({
+                'id': str(history_id),
+                'created': format_jira_time(moment),
+                'items': [{'field': 'status', 'from': None, 'to': to_status}]
+            })
+            if rng.random() < 0.3:
+                history_id += 1
+                histories.append({
+                    'id': str(history_id),
+                    'created': format_jira_time(moment + timedelta(minutes=5)),
+                    'items': [{'field': 'labels', 'from': None, 'to': 'smoke'}]
+                })
+        changelogs[key] = histories
+        issues.append({
+            'id': str(10000 + number),
+            'key': key,
+            'fields': {
+                'summary': f'Automate test {number}',
+                'status': {'id': status_id, 'statusCategory': {'id': int(category_id)}},
+                'labels': ['automation', 'new_test', 'smoke', rng.choice(GROUP_LABELS)],
+                'resolution': {'name': 'Done'} if status_id == '10001' else None,
+                'duedate': (started + timedelta(days=rng.randint(1, 30))).date().isoformat(),
+                'statuscategorychangedate': format_jira_time(transitions[-1][0] if transitions else created),
+                'updated': format_jira_time(transitions[-1][0] if transitions else created)
+            }
+        })
+    return issues, changelogs
+
+
+def match_jql(jql: str, issue: dict) -> bool:
+    """Match the searches of the service on top of the key searches of the stub."""
+    from stubs.jira import match_jql as match_keys
+
+    status = issue['fields']['status']
+    if 'statusCategory = Done' in jql:
+        return status['statusCategory']['id'] == 3
+    if 'status = Done' in jql:
+        return status['id'] == '10001' and match_keys(jql, issue)
+    return match_keys(jql, issue)
+
+
+def make_test_results(
+    rng: random.Random,
+    count: int,
+    case_ids: list[int],
+    now: datetime
+) -> list[dict]:
+    """Make results of the last 30 days, oldest first, spread over runs of 100 results."""
+    moments = sorted(now - timedelta(seconds=rng.randint(60, 29 * 86400)) for _ in range(count))
+    return [
+        {
+            'case_id': rng.choice(case_ids),
+            'run_id': position // 100 + 1,
+            'status': choose(rng, RESULT_STATUSES)[0],
+            'time_spent_ms': rng.randint(100, 120000),
+            'end_time': moment.strftime('%Y-%m-%dT%H:%M:%S+00:00')
+        }
+        for position, moment in enumerate(moments)
+    ]
+
+
+def format_github_time(moment: datetime) -> str:
+    return moment.strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+def make_pull_requests(
+    rng: random.Random,
+    count: int,
+    now: datetime
+) -> list[dict]:
+    """Make pull requests of the last 60 days, one in a hundred with more files than one GraphQL page holds."""
+    pull_requests = []
+    for number in range(1, count + 1):
+        created = now - timedelta(hours=rng.randint(2, 60 * 24))
+        state = rng.choices(['MERGED', 'OPEN', 'CLOSED'], weights=[0.7, 0.2, 0.1])[0]
+        merged = created + timedelta(hours=rng.randint(1, 72)) if state == 'MERGED' else None
+        number_of_files = 150 if rng.random() < 0.01 else rng.randint(1, 12)
+        pull_requests.append({
+            'number': number,
+            'state': state,
+            'createdAt': format_github_time(created),
+            'updatedAt': format_github_time(merged or created),
+            'mergedAt': format_github_time(merged) if merged else None,
+            'reviews': [{'submittedAt': format_github_time(created + timedelta(hours=1))}] if rng.random() < 0.8 else [],
+            'files': [
+                {
+                    'path': f'tests/test_module_{index}.py' if rng.random() < 0.3 else f'app/module_{index}.py',
+                    'additions': rng.randint(0, 200),
+                    'deletions': rng.randint(0, 50)
+                }
+                for index in range(number_of_files)
+            ]
+        })
+    return pull_requests
+
+
+def get_steps() -> list[tuple[str, object]]:
+    from metrics import metrics
+    import service
+
+    return [
+        ('get_number_of_smoke_tests[automated]', lambda: metrics.get_number_of_smoke_tests(True)),
+        ('get_number_of_smoke_tests[manual]', lambda: metrics.get_number_of_smoke_tests(False)),
+        ('get_total_manual_execution_time_for_smoke_tests[automated]', lambda: metrics.get_total_manual_execution_time_for_smoke_tests(True)),
+        ('get_total_manual_execution_time_for_smoke_tests[manual]', lambda: metrics.get_total_manual_execution_time_for_smoke_tests(False)),
+        ('get_blocked_manual_smoke_tests', metrics.get_blocked_manual_smoke_tests),
+        ('get_total_manual_execution_time_for_blocked_manual_smoke_tests', metrics.get_total_manual_execution_time_for_blocked_manual_smoke_tests),
+        ('get_number_of_blocked_manual_smoke_tests', metrics.get_number_of_blocked_manual_smoke_tests),
+        ('get_total_manual_execution_time_for_tests_without_automation_task', metrics.get_total_manual_execution_time_for_tests_without_automation_task),
+        ('get_number_of_tests_without_automation_task', metrics.get_number_of_tests_without_automation_task),
+        ('get_manual_smoke_test_task_summary', metrics.get_manual_smoke_test_task_summary),
+        ('get_test_run_result_metrics', metrics.get_test_run_result_metrics),
+        ('get_smoke_automation_time_diff', metrics.get_smoke_automation_time_diff),
+        ('get_number_of_open_pull_requests', metrics.get_number_of_open_pull_requests),
+        ('get_pull_request_metrics', metrics.get_pull_request_metrics),
+        ('service.update_metrics', service.update_metrics),
+    ]
+
+
+def run_steps():
+    """Run every step in this process and report each one as a JSON line on stdout.
+
+    Waits for a line on stdin after each report, so the parent can read the
+    counters of the stubs while no request is in flight.
+    """
+    sys.path.insert(0, APP_DIR)
+    logging.basicConfig(level=logging.ERROR)
+    from metrics.metrics import get_usecases
+
+    for name, step in get_steps():
+        get_usecases().invalidate_snapshot()
+        started_at = time.perf_counter()
+        step()
+        wall_time = time.perf_counter() - started_at
+        print(json.dumps({'step': name, 'wall_time_s': round(wall_time, 3), 'peak_rss_mb': get_peak_rss_mb()}), flush=True)
+        sys.stdin.readline()
+
+
+def run_scenario(
+    name: str,
+    scale: dict[str, int],
+    latency: float
+) -> dict:
+    """Serve a synthetic project from the stubs and measure the service against it."""
+    sys.path.insert(0, APP_DIR)
+    sys.path.insert(0, TESTS_DIR)
+    from stubs.github import GithubStub
+    from stubs.jira import JiraStub
+    from stubs.qase import QaseStub
+
+    rng = random.Random(f'{name}-{scale}')
+    now = datetime.now(timezone.utc).replace(microsecond=0)
+    generated_at = time.perf_counter()
+    cases = make_qase_cases(rng, scale['qase_cases'], scale['jira_issues'])
+    issues, changelogs = make_jira_issues(rng, scale['jira_issues'], now.date())
+    smoke_case_ids = [case['id'] for case in cases if case['type'] == 3] or [1]
+    results = make_test_results(rng, scale['test_results'], smoke_case_ids, now)
+    pull_requests = make_pull_requests(rng, scale['pull_requests'], now)
+    generation_time = time.perf_counter() - generated_at
+
+    stubs = [
+        QaseStub(cases, results, project_code=PROJECT_CODE, latency=latency),
+        JiraStub(issues, changelogs, match=match_jql, latency=latency),
+        GithubStub(pull_requests, repo_name=REPO_NAME, latency=latency)
+    ]
+    for stub in stubs:
+        stub.start()
+    qase, jira, github = stubs
+    env = {
+        **os.environ,
+        'PROMETHEUS_URL': 'http://localhost:9090',
+        'JIRA_URL': jira.url,
+        'JIRA_EMAIL': 'user@example.com',
+        'JIRA_API_TOKEN': 'token',
+        'JIRA_SLA_GROUP_LABELS': json.dumps(GROUP_LABELS),
+        'QASE_URL': qase.url,
+        'QASE_API_TOKEN': 'token',
+        'QASE_PROJECT_CODE': PROJECT_CODE,
+        'GITHUB_TOKEN': 'token',
+        'GITHUB_REPO': REPO_NAME,
+        'GITHUB_API_URL': github.url,
+        'RATE_LIMIT_DEFAULT_RATE': '1000000',
+        'RATE_LIMIT_BURST': '1000000',
+        'HTTP_TOTAL_TIMEOUT': '3600',
+    }
+    steps = {}
+    peak_rss_mb = 0.0
+    process = subprocess.Popen(
+        [sys.executable, os.path.abspath(__file__), '--run-steps'],
+        cwd=APP_DIR,
+        env=env,
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        text=True
+    )
+    try:
+        for line in process.stdout:
+            report = json.loads(line)
+            steps[report['step']] = {
+                'wall_time_s': report['wall_time_s'],
+                'requests': sum(len(stub.requests) for stub in stubs),
+                'bytes': sum(stub.bytes_sent for stub in stubs),
+                'failed_requests': sum(status >= 400 for stub in stubs for status in stub.statuses)
+            }
+            peak_rss_mb = report['peak_rss_mb']
+            for stub in stubs:
+                stub.reset_counters()
+            process.stdin.write('\n')
+            process.stdin.flush()
+    finally:
+        process.stdin.close()
+        returncode = process.wait()
+        for stub in stubs:
+            stub.stop()
+    if returncode != 0:
+        raise RuntimeError(f'Scenario {name} failed with status {returncode}')
+    return {
+        'scale': scale,
+        'latency_s': latency,
+        'generation_time_s': round(generation_time, 3),
+        'peak_rss_mb': peak_rss_mb,
+        'total': {
+            value: round(sum(step[value] for step in steps.values()), 3)
+            for value in COMPARED_VALUES + ['failed_requests']
+        },
+        'steps': steps
+    }
+
+
+def get_regressions(
+    results: dict,
+    baseline: dict,
+    tolerance: float
+) -> list[str]:
+    """Compare the scenarios run now with the same scenarios of the baseline."""
+    regressions = []
+    for name, scenario in results['scenarios'].items():
+        baseline_scenario = baseline['scenarios'].get(name)
+        if baseline_scenario is None:
+            continue
+        compared = [('peak_rss_mb', 'peak_rss_mb', scenario['peak_rss_mb'], baseline_scenario['peak_rss_mb'])]
+        for step, values in scenario['steps'].items():
+            baseline_values = baseline_scenario['steps'].get(step)
+            if baseline_values is not None:
+                compared.extend((f'{step} {value}', value, values[value], baseline_values[value]) for value in COMPARED_VALUES)
+        regressions.extend(
+            f'{name} {label} {current} > {previous}'
+            for label, value, current, previous in compared
+            if current > previous * (1 + tolerance) and current - previous > NOISE[value]
+        )
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scenarios', nargs='+', choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds every stub response is delayed by')
+    parser.add_argument('--output', default=None)
+    parser.add_argument('--baseline', default=None)
+    parser.add_argument('--tolerance', type=float, default=0.2, help='Allowed relative growth over the baseline')
+    parser.add_argument('--run-steps', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.run_steps:
+        run_steps()
+        return 0
+
+    results = {
+        'created_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': sys.version.split()[0],
+        'scenarios': {name: run_scenario(name, SCENARIOS[name], args.latency) for name in args.scenarios}
+    }
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump(results, output, indent=2)
+    if not args.baseline:
+        return 0
+    with open(args.baseline) as baseline:
+        regressions = get_regressions(results, json.load(baseline), args.tolerance)
+    for regression in regressions:
+        print(f'Regression: {regression}', file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,85 @@
+"""Import and startup time benchmark of the metrics service.
+
+Every measurement runs in a fresh interpreter with placeholder settings, so
+module caches of this process do not hide import costs and no request is
+sent. Exits with status 1 when a median exceeds its limit.
+
+Usage:
+    python benchmarks/startup.py [--runs 5] [--max-import-ms 400] [--max-startup-ms 600]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+
+APP_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'app')
+PLACEHOLDER_ENV = {
+    'PROMETHEUS_URL': 'http://localhost:9090',
+    'JIRA_URL': 'https://jira.example.com',
+    'JIRA_EMAIL': 'user@example.com',
+    'JIRA_API_TOKEN': 'token',
+    'QASE_URL': 'https://api.qase.io',
+    'QASE_API_TOKEN': 'token',
+    'QASE_PROJECT_CODE': 'PRJ',
+    'GITHUB_TOKEN': 'token',
+    'GITHUB_REPO': 'owner/repo',
+}
+SCENARIOS = {
+    # Importing the service must not read settings or build clients
+    'import_ms': 'import service',
+    # Import plus building every client the first collection uses
+    'startup_ms': (
+        'import service\n'
+        'from metrics.metrics import get_usecases, get_github_collector\n'
+        'get_usecases()\n'
+        'get_github_collector()'
+    ),
+}
+
+
+def measure(code: str) -> float:
+    script = (
+        'import time\n'
+        'started_at = time.perf_counter()\n'
+        f'{code}\n'
+        'print((time.perf_counter() - started_at) * 1000)'
+    )
+    result = subprocess.run(
+        [sys.executable, '-c', script],
+        cwd=APP_DIR,
+        env={**os.environ, **PLACEHOLDER_ENV},
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--max-import-ms', type=float, default=None)
+    parser.add_argument('--max-startup-ms', type=float, default=None)
+    args = parser.parse_args()
+
+    results = {
+        name: round(statistics.median(measure(code) for _ in range(args.runs)), 1)
+        for name, code in SCENARIOS.items()
+    }
+    print(json.dumps(results, indent=2))
+    limits = {'import_ms': args.max_import_ms, 'startup_ms': args.max_startup_ms}
+    regressions = [
+        f'{name} {results[name]} > {limit}'
+        for name, limit in limits.items()
+        if limit is not None and results[name] > limit
+    ]
+    for regression in regressions:
+        print(f'Regression: {regression}', file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Application modules import each other as top-level packages (clients, config, metrics)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), 'app'))
@@ -0,0 +1,121 @@
+import gzip
+import hashlib
+import json
+import os
+import threading
+
+import requests
+
+from stubs.server import StubRequest, StubResponse, StubServer
+
+
+# Response headers kept in cassettes, the rest depend on the recording session
+RECORDED_HEADERS = {'content-type', 'etag', 'link', 'retry-after', 'x-ratelimit-limit', 'x-ratelimit-remaining', 'x-ratelimit-reset'}
+# Request headers not forwarded upstream while recording
+HOP_HEADERS = {'host', 'content-length', 'connection', 'accept-encoding'}
+# Stands for the server URL in recorded bodies and headers, so pagination links point back at the server on replay
+BASE_URL_PLACEHOLDER = '{{base_url}}'
+
+
+def get_interaction_key(request: StubRequest) -> str:
+    body_hash = hashlib.sha256(request.body).hexdigest()[:16] if request.body else ''
+    return f'{request.method} {request.target} {body_hash}'
+
+
+class CassetteServer(StubServer):
+    """Records responses of a real service to a gzip cassette or replays them.
+
+    In record mode every request is forwarded to upstream_url with its
+    headers and the response is kept. The cassette, gzip compressed JSON
+    lines without request headers, is written on stop. In replay mode
+    requests are answered from the cassette by method, path, query and body
+    hash, so clients run offline against real payloads. Repeated requests get
+    their recorded responses in order, the last one is served again after
+    that. URLs of the service in bodies and headers are rewritten to the
+    server's URL, so clients follow pagination links through the server.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        upstream_url: str | None = None,
+        mode: str = 'replay',
+        **kwargs
+    ):
+        """Create a stopped cassette server.
+
+        Args:
+            path (str): Cassette file, conventionally ending with .jsonl.gz.
+            upstream_url (str | None): Base URL of the recorded service, required in record mode.
+            mode (str): record or replay.
+        """
+        super().__init__(**kwargs)
+        if mode not in ('record', 'replay'):
+            raise ValueError(f'Unknown cassette mode {mode}')
+        if mode == 'record' and not upstream_url:
+            raise ValueError('Recording needs an upstream URL')
+        self.path = path
+        self.upstream_url = upstream_url.rstrip('/') if upstream_url else None
+        self.mode = mode
+        self._interactions = []
+        self._replayed = {}
+        self._cassette_lock = threading.Lock()
+        self._session = requests.Session()
+        if mode == 'replay':
+            with gzip.open(path, 'rt', encoding='utf-8') as cassette:
+                for line in cassette:
+                    interaction = json.loads(line)
+                    self._replayed.setdefault(interaction['key'], []).append(interaction)
+
+    def _dispatch(self, request: StubRequest) -> StubResponse:
+        if self.mode == 'record':
+            return self._record(request)
+        return self._replay(request)
+
+    def _record(self, request: StubRequest) -> StubResponse:
+        response = self._session.request(
+            request.method,
+            f'{self.upstream_url}{request.target}',
+            headers={name: value for name, value in request.headers.items() if name.lower() not in HOP_HEADERS},
+            data=request.body or None
+        )
+        headers = {
+            name: value.replace(self.upstream_url, BASE_URL_PLACEHOLDER)
+            for name, value in response.headers.items() if name.lower() in RECORDED_HEADERS
+        }
+        body = response.content.decode('utf-8').replace(self.upstream_url, BASE_URL_PLACEHOLDER)
+        interaction = {
+            'key': get_interaction_key(request),
+            'status': response.status_code,
+            'headers': headers,
+            'body': body
+        }
+        with self._cassette_lock:
+            self._interactions.append(interaction)
+        return self._get_response(interaction)
+
+    def _get_response(self, interaction: dict) -> StubResponse:
+        return StubResponse(
+            interaction['status'],
+            interaction['body'].replace(BASE_URL_PLACEHOLDER, self.url).encode('utf-8'),
+            {name: value.replace(BASE_URL_PLACEHOLDER, self.url) for name, value in interaction['headers'].items()}
+        )
+
+    def _replay(self, request: StubRequest) -> StubResponse:
+        with self._cassette_lock:
+            interactions = self._replayed.get(get_interaction_key(request))
+            if not interactions:
+                return StubResponse(501, {'message': f'No recorded response for {request.method} {request.target}'})
+            interaction = interactions.pop(0) if len(interactions) > 1 else interactions[0]
+        return self._get_response(interaction)
+
+    def stop(self):
+        super().stop()
+        if self.mode != 'record':
+            return
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with gzip.open(self.path, 'wt', encoding='utf-8') as cassette:
+            for interaction in self._interactions:
+                cassette.write(json.dumps(interaction) + '\n')
@@ -0,0 +1,125 @@
+import hashlib
+import json
+from urllib.parse import urlencode
+
+from stubs.server import StubRequest, StubResponse, StubServer
+
+
+class GithubStub(StubServer):
+    """GitHub REST and GraphQL endpoints of one repository over a list of pull requests.
+
+    Pull requests are given in the GraphQL shape with their reviews and
+    files as lists. REST lists paginate with Link headers, including the
+    last page PyGithub reads totalCount from, and the files list supports
+    conditional requests with ETags.
+    """
+
+    def __init__(
+        self,
+        pull_requests: list[dict],
+        repo_name: str = 'owner/repo',
+        max_page_size: int = 100,
+        **kwargs
+    ):
+        super().__init__(**kwargs)
+        self.pull_requests = pull_requests
+        self.repo_name = repo_name
+        self.max_page_size = max_page_size
+        self.route('POST', r'/graphql', self.graphql)
+        self.route('GET', rf'/repos/{repo_name}', self.get_repo)
+        self.route('GET', rf'/repos/{repo_name}/pulls', self.list_pulls)
+        self.route('GET', rf'/repos/{repo_name}/pulls/(?P<number>\d+)/files', self.list_files)
+
+    def get_repo(self, request: StubRequest) -> StubResponse:
+        owner, name = self.repo_name.split('/')
+        return StubResponse(200, {
+            'id': 1,
+            'name': name,
+            'full_name': self.repo_name,
+            'owner': {'login': owner},
+            'url': f'{self.url}/repos/{self.repo_name}'
+        })
+
+    def _get_rest_page(
+        self,
+        request: StubRequest,
+        items: list
+    ) -> StubResponse:
+        per_page = min(int(request.query.get('per_page', 30)), self.max_page_size)
+        page = int(request.query.get('page', 1))
+        last_page = max(1, -(-len(items) // per_page))
+        links = []
+        for rel, number in (('next', page + 1), ('last', last_page)):
+            if page < last_page:
+                links.append(f'<{self.url}{request.path}?{urlencode({**request.query, "page": number})}>; rel="{rel}"')
+        body = json.dumps(items[(page - 1) * per_page:page * per_page]).encode()
+        etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+        if request.headers.get('If-None-Match') == etag:
+            return StubResponse(304, headers={'ETag': etag})
+        headers = {'Content-Type': 'application/json', 'ETag': etag}
+        if links:
+            headers['Link'] = ', '.join(links)
+        return StubResponse(200, body, headers)
+
+    def list_pulls(self, request: StubRequest) -> StubResponse:
+        state = request.query.get('state', 'open')
+        pulls = [
+            {
+                'number': pull_request['number'],
+                'state': 'open' if pull_request['state'] == 'OPEN' else 'closed',
+                'title': f'Pull request {pull_request["number"]}',
+                'created_at': pull_request['createdAt'],
+                'updated_at': pull_request['updatedAt'],
+                'merged_at': pull_request['mergedAt'],
+                'url': f'{self.url}/repos/{self.repo_name}/pulls/{pull_request["number"]}'
+            }
+            for pull_request in sorted(self.pull_requests, key=lambda pull_request: -pull_request['number'])
+        ]
+        if state != 'all':
+            pulls = [pull for pull in pulls if pull['state'] == state]
+        return self._get_rest_page(request, pulls)
+
+    def list_files(self, request: StubRequest) -> StubResponse:
+        pull_request = next(
+            (pull_request for pull_request in self.pull_requests if pull_request['number'] == int(request.params['number'])),
+            None
+        )
+        if pull_request is None:
+            return StubResponse(404, {'message': 'Not Found'})
+        files = [
+            {'filename': file['path'], 'additions': file['additions'], 'deletions': file['deletions']}
+            for file in pull_request['files']
+        ]
+        return self._get_rest_page(request, files)
+
+    def graphql(self, request: StubRequest) -> StubResponse:
+        """Answer the pull requests query of GithubGraphQLAPI, other queries are not supported."""
+        payload = request.json()
+        variables = payload['variables']
+        if 'pullRequests' not in payload['query']:
+            return StubResponse(200, {'errors': [{'message': 'Query is not supported by the stub'}]})
+        pull_requests = sorted(self.pull_requests, key=lambda pull_request: pull_request['updatedAt'], reverse=True)
+        if variables.get('states'):
+            pull_requests = [pull_request for pull_request in pull_requests if pull_request['state'] in variables['states']]
+        offset = int(variables.get('cursor') or 0)
+        page_size = min(variables['pageSize'], self.max_page_size)
+        files_page_size = variables['filesPageSize']
+        nodes = [
+            {
+                'number': pull_request['number'],
+                'createdAt': pull_request['createdAt'],
+                'updatedAt': pull_request['updatedAt'],
+                'mergedAt': pull_request['mergedAt'],
+                'reviews': {'nodes': pull_request['reviews'][:1]},
+                'files': {'totalCount': len(pull_request['files']), 'nodes': pull_request['files'][:files_page_size]}
+            }
+            for pull_request in pull_requests[offset:offset + page_size]
+        ]
+        has_next_page = offset + page_size < len(pull_requests)
+        return StubResponse(200, {'data': {
+            'repository': {'pullRequests': {
+                'pageInfo': {'hasNextPage': has_next_page, 'endCursor': str(offset + page_size) if has_next_page else None},
+                'nodes': nodes
+            }},
+            'rateLimit': {'cost': 1, 'remaining': 4999, 'resetAt': '2030-01-01T00:00:00Z'}
+        }})
@@ -0,0 +1,130 @@
+from functools import lru_cache
+import re
+
+from stubs.server import StubRequest, StubResponse, StubServer, get_page_bounds
+
+
+KEY_IN_JQL = re.compile(r'key in \(([^)]*)\)')
+
+
+@lru_cache(maxsize=64)
+def get_jql_keys(jql: str) -> frozenset[str] | None:
+    """Get the keys of a key in (...) search, parsed once per JQL."""
+    keys = KEY_IN_JQL.search(jql)
+    if keys is None:
+        return None
+    return frozenset(key.strip() for key in keys.group(1).split(','))
+
+
+def match_jql(jql: str, issue: dict) -> bool:
+    """Match key in (...) searches, every other JQL matches all issues."""
+    keys = get_jql_keys(jql)
+    return keys is None or issue['key'] in keys
+
+
+class JiraStub(StubServer):
+    """Jira Cloud search, issue and changelog endpoints over a list of issues.
+
+    Searches answer with the total and cap maxResults at max_page_size like
+    Jira does. Changelogs are given by issue key, oldest change first. Issues
+    are indexed by key and id and the issues matching a JQL are kept for its
+    later pages, so large projects are served without full scans per request.
+    """
+
+    def __init__(
+        self,
+        issues: list[dict],
+        changelogs: dict[str, list[dict]] | None = None,
+        match=match_jql,
+        max_page_size: int = 100,
+        changelog_page_size: int = 100,
+        bulk_changelog_page_size: int = 1000,
+        **kwargs
+    ):
+        super().__init__(**kwargs)
+        self.issues = issues
+        self.changelogs = changelogs or {}
+        self.match = match
+        self.max_page_size = max_page_size
+        self.changelog_page_size = changelog_page_size
+        self.bulk_changelog_page_size = bulk_changelog_page_size
+        self._issues_by_key_or_id = {issue['key']: issue for issue in issues}
+        self._issues_by_key_or_id.update((issue['id'], issue) for issue in issues)
+        self._matched = {}
+        self.route('POST', r'/rest/api/2/search', self.search)
+        self.route('GET', r'/rest/api/2/issue/(?P<key>[^/]+)/changelog', self.get_changelog)
+        self.route('GET', r'/rest/api/2/issue/(?P<key>[^/]+)', self.get_issue)
+        self.route('POST', r'/rest/api/3/changelog/bulkfetch', self.bulk_fetch_changelogs)
+
+    def _find_issue(self, key_or_id: str) -> dict | None:
+        return self._issues_by_key_or_id.get(key_or_id)
+
+    def _match_issues(self, jql: str) -> list[dict]:
+        keys = get_jql_keys(jql)
+        if keys is None:
+            candidates = self.issues
+        else:
+            candidates = [self._issues_by_key_or_id[key] for key in sorted(keys) if key in self._issues_by_key_or_id]
+        return [issue for issue in candidates if self.match(jql, issue)]
+
+    def search(self, request: StubRequest) -> StubResponse:
+        payload = request.json()
+        with self._lock:
+            if payload['jql'] not in self._matched:
+                self._matched[payload['jql']] = self._match_issues(payload['jql'])
+            issues = self._matched[payload['jql']]
+        start_at = payload.get('startAt', 0)
+        max_results = min(payload.get('maxResults', 50), self.max_page_size)
+        fields = payload.get('fields')
+        page = [
+            {**issue, 'fields': {name: value for name, value in issue['fields'].items() if not fields or name in fields}}
+            for issue in issues[start_at:start_at + max_results]
+        ]
+        return StubResponse(200, {'startAt': start_at, 'maxResults': max_results, 'total': len(issues), 'issues': page})
+
+    def get_issue(self, request: StubRequest) -> StubResponse:
+        issue = self._find_issue(request.params['key'])
+        if issue is None:
+            return StubResponse(404, {'errorMessages': ['Issue does not exist or you do not have permission to see it.']})
+        return StubResponse(200, issue)
+
+    def get_changelog(self, request: StubRequest) -> StubResponse:
+        issue = self._find_issue(request.params['key'])
+        if issue is None:
+            return StubResponse(404, {'errorMessages': ['Issue does not exist or you do not have permission to see it.']})
+        histories = self.changelogs.get(issue['key'], [])
+        start_at, max_results = get_page_bounds(request, 'startAt', 'maxResults', 100, self.changelog_page_size)
+        values = histories[start_at:start_at + max_results]
+        return StubResponse(200, {
+            'startAt': start_at,
+            'maxResults': max_results,
+            'total': len(histories),
+            'isLast': start_at + max_results >= len(histories),
+            'values': values
+        })
+
+    def bulk_fetch_changelogs(self, request: StubRequest) -> StubResponse:
+        payload = request.json()
+        field_ids = payload.get('fieldIds')
+        histories = []
+        for key_or_id in payload['issueIdsOrKeys']:
+            issue = self._find_issue(key_or_id)
+            if issue is None:
+                continue
+            for history in self.changelogs.get(issue['key'], []):
+                if not field_ids or any(item['field'] in field_ids for item in history['items']):
+                    histories.append((issue['id'], history))
+        offset = int(payload.get('nextPageToken') or 0)
+        page_size = min(payload.get('maxResults', 1000), self.bulk_changelog_page_size)
+        issue_changelogs = {}
+        for issue_id, history in histories[offset:offset + page_size]:
+            issue_changelogs.setdefault(issue_id, []).append(history)
+        body = {
+            'issueChangeLogs': [
+                {'issueId': issue_id, 'changeHistories': change_histories}
+                for issue_id, change_histories in issue_changelogs.items()
+            ]
+        }
+        if offset + page_size < len(histories):
+            body['nextPageToken'] = str(offset + page_size)
+        return StubResponse(200, body)
@@ -0,0 +1,111 @@
+import hashlib
+import json
+
+from clients.qase_api import CASE_AUTOMATION_IDS, CASE_STATUS_IDS, CASE_TYPE_IDS
+from stubs.server import StubRequest, StubResponse, StubServer, get_page_bounds
+
+
+CASE_FILTERS = (('type', CASE_TYPE_IDS), ('status', CASE_STATUS_IDS), ('automation', CASE_AUTOMATION_IDS))
+
+
+class QaseStub(StubServer):
+    """Qase case and result endpoints of one project over lists of entities.
+
+    The case list applies the type, status and automation filters, answers
+    with total and filtered counts and supports conditional requests with
+    ETags. Results are filtered by end time like the result list does.
+    """
+
+    def __init__(
+        self,
+        cases: list[dict],
+        results: list[dict] | None = None,
+        project_code: str = 'MRC',
+        max_page_size: int = 100,
+        **kwargs
+    ):
+        super().__init__(**kwargs)
+        self.cases = cases
+        self.results = results or []
+        self.max_page_size = max_page_size
+        # Filtered lists by filter values, so every page of a listing filters once
+        self._filtered = {}
+        self.route('GET', rf'/v1/case/{project_code}', self.list_cases)
+        self.route('GET', rf'/v1/case/{project_code}/(?P<case_id>\d+)', self.get_case)
+        self.route('PATCH', rf'/v1/case/{project_code}/(?P<case_id>\d+)', self.update_case)
+        self.route('GET', rf'/v1/result/{project_code}', self.list_results)
+
+    def _get_page(
+        self,
+        request: StubRequest,
+        entities: list[dict],
+        total: int
+    ) -> StubResponse:
+        offset, limit = get_page_bounds(request, 'offset', 'limit', 10, self.max_page_size)
+        page = entities[offset:offset + limit]
+        body = json.dumps({
+            'status': True,
+            'result': {'total': total, 'filtered': len(entities), 'count': len(page), 'entities': page}
+        }).encode()
+        etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+        if request.headers.get('If-None-Match') == etag:
+            return StubResponse(304, headers={'ETag': etag})
+        return StubResponse(200, body, {'Content-Type': 'application/json', 'ETag': etag})
+
+    def _filter_cases(self, filters: tuple) -> list[dict]:
+        cases = self.cases
+        for (field, ids), value in zip(CASE_FILTERS, filters):
+            if value:
+                values = {ids[name] for name in value.split(',')}
+                cases = [case for case in cases if case.get(field) in values]
+        return cases
+
+    def list_cases(self, request: StubRequest) -> StubResponse:
+        filters = tuple(request.query.get(field) for field, _ in CASE_FILTERS)
+        with self._lock:
+            if ('cases', filters) not in self._filtered:
+                self._filtered['cases', filters] = self._filter_cases(filters)
+            cases = self._filtered['cases', filters]
+        return self._get_page(request, cases, len(self.cases))
+
+    def _find_case(self, case_id: str) -> dict | None:
+        return next((case for case in self.cases if case['id'] == int(case_id)), None)
+
+    def get_case(self, request: StubRequest) -> StubResponse:
+        case = self._find_case(request.params['case_id'])
+        if case is None:
+            return StubResponse(404, {'status': False, 'errorMessage': 'Test case not found'})
+        return StubResponse(200, {'status': True, 'result': case})
+
+    def update_case(self, request: StubRequest) -> StubResponse:
+        case = self._find_case(request.params['case_id'])
+        if case is None:
+            return StubResponse(404, {'status': False, 'errorMessage': 'Test case not found'})
+        custom_fields = {custom_field['id']: custom_field for custom_field in case.setdefault('custom_fields', [])}
+        for field_id, value in (request.json().get('custom_field') or {}).items():
+            custom_fields[int(field_id)] = {'id': int(field_id), 'value': value}
+        case['custom_fields'] = list(custom_fields.values())
+        with self._lock:
+            self._filtered.clear()
+        return StubResponse(200, {'status': True, 'result': {'id': case['id']}})
+
+    def _filter_results(
+        self,
+        from_end_time: str | None,
+        to_end_time: str | None
+    ) -> list[dict]:
+        results = self.results
+        # End times share one format, so they compare as strings
+        if from_end_time:
+            results = [result for result in results if result['end_time'][:19].replace('T', ' ') >= from_end_time]
+        if to_end_time:
+            results = [result for result in results if result['end_time'][:19].replace('T', ' ') <= to_end_time]
+        return results
+
+    def list_results(self, request: StubRequest) -> StubResponse:
+        filters = (request.query.get('from_end_time'), request.query.get('to_end_time'))
+        with self._lock:
+            if ('results', filters) not in self._filtered:
+                self._filtered['results', filters] = self._filter_results(*filters)
+            results = self._filtered['results', filters]
+        return self._get_page(request, results, len(self.results))
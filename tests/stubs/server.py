@@ -0,0 +1,201 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import math
+import re
+import threading
+import time
+from typing import Callable
+from urllib.parse import parse_qs, urlsplit
+
+
+class StubRequest:
+    """Request received by a stub server."""
+
+    def __init__(
+        self,
+        method: str,
+        target: str,
+        headers,
+        body: bytes,
+        params: dict[str, str]
+    ):
+        parts = urlsplit(target)
+        self.method = method
+        self.path = parts.path
+        self.target = target
+        self.query = {name: values[-1] for name, values in parse_qs(parts.query).items()}
+        self.headers = headers
+        self.body = body
+        self.params = params
+
+    def json(self):
+        return json.loads(self.body or b'null')
+
+
+class StubResponse:
+    def __init__(
+        self,
+        status: int = 200,
+        body: dict | list | bytes | None = None,
+        headers: dict[str, str] | None = None
+    ):
+        self.status = status
+        self.body = body if isinstance(body, bytes) or body is None else json.dumps(body).encode()
+        self.headers = dict(headers or {})
+        if body is not None and not isinstance(body, bytes):
+            self.headers.setdefault('Content-Type', 'application/json')
+
+
+class StubServer:
+    """In-process HTTP server answering API routes from in-memory data.
+
+    Runs on a free local port in a background thread, so clients are pointed
+    at url instead of the real service. Every response can be delayed by a
+    fixed latency, and with a rate limit the server sends rate limit headers
+    and answers 429 with Retry-After once a window's budget is spent. Served
+    requests and response bytes are counted for tests and benchmarks.
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        rate_limit: int | None = None,
+        rate_limit_window: float = 60.0
+    ):
+        """Create a stopped server without routes.
+
+        Args:
+            latency (float): Seconds every response is delayed by.
+            rate_limit (int | None): Requests allowed per window, unlimited by default.
+            rate_limit_window (float): Length of a rate limit window in seconds.
+        """
+        self.latency = latency
+        self.rate_limit = rate_limit
+        self.rate_limit_window = rate_limit_window
+        self.requests = []
+        self.statuses = []
+        self.bytes_sent = 0
+        self._routes = []
+        self._lock = threading.Lock()
+        self._window_start = time.time()
+        self._window_requests = 0
+        self._server = None
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def route(
+        self,
+        method: str,
+        pattern: str,
+        handler: Callable[[StubRequest], StubResponse]
+    ):
+        """Answer requests whose path fully matches the pattern, named groups become request params."""
+        self._routes.append((method, re.compile(pattern), handler))
+
+    def reset_counters(self):
+        with self._lock:
+            self.requests = []
+            self.statuses = []
+            self.bytes_sent = 0
+
+    def _check_rate_limit(self) -> tuple[dict[str, str], bool]:
+        if self.rate_limit is None:
+            return {}, True
+        with self._lock:
+            now = time.time()
+            if now - self._window_start >= self.rate_limit_window:
+                self._window_start = now
+                self._window_requests = 0
+            self._window_requests += 1
+            allowed = self._window_requests <= self.rate_limit
+            reset_at = self._window_start + self.rate_limit_window
+            headers = {
+                'X-RateLimit-Limit': str(self.rate_limit),
+                'X-RateLimit-Remaining': str(max(0, self.rate_limit - self._window_requests)),
+                'X-RateLimit-Reset': str(math.ceil(reset_at))
+            }
+        if not allowed:
+            headers['Retry-After'] = str(max(1, int(reset_at - now)))
+        return headers, allowed
+
+    def handle(self, request: StubRequest) -> StubResponse:
+        rate_limit_headers, allowed = self._check_rate_limit()
+        if not allowed:
+            response = StubResponse(429, {'message': 'Rate limit exceeded'})
+        else:
+            response = self._dispatch(request)
+        response.headers.update(rate_limit_headers)
+        return response
+
+    def _dispatch(self, request: StubRequest) -> StubResponse:
+        for method, pattern, handler in self._routes:
+            match = pattern.fullmatch(request.path)
+            if method == request.method and match:
+                request.params = match.groupdict()
+                return handler(request)
+        return StubResponse(404, {'message': f'No route for {request.method} {request.path}'})
+
+    def start(self) -> 'StubServer':
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True
+
+            def _respond(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                request = StubRequest(self.command, self.path, self.headers, self.rfile.read(length), {})
+                if stub.latency:
+                    time.sleep(stub.latency)
+                response = stub.handle(request)
+                body = response.body or b''
+                self.send_response(response.status)
+                for name, value in response.headers.items():
+                    self.send_header(name, value)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                with stub._lock:
+                    stub.requests.append((request.method, request.target))
+                    stub.statuses.append(response.status)
+                    stub.bytes_sent += len(body)
+
+            do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = _respond
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, kwargs={'poll_interval': 0.01}, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> 'StubServer':
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+def get_page_bounds(
+    request: StubRequest,
+    offset_param: str,
+    limit_param: str,
+    default_limit: int,
+    max_page_size: int
+) -> tuple[int, int]:
+    """Get the offset and the page size of a request capped by the server's page size."""
+    offset = int(request.query.get(offset_param, 0))
+    limit = int(request.query.get(limit_param, default_limit))
+    return offset, min(limit, max_page_size)
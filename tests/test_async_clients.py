@@ -0,0 +1,55 @@
+import asyncio
+
+from aiohttp import web
+
+from clients.async_http_transport import AsyncHttpTransport
+from clients.async_qase_api import AsyncQaseAPI
+
+
+def test_async_get_all_test_cases_bounds_requests_per_host():
+    total = 450
+    in_flight = 0
+    max_in_flight = 0
+
+    async def get_cases(request):
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        offset, limit = int(request.query['offset']), int(request.query['limit'])
+        entities = [{'id': i} for i in range(offset, min(offset + limit, total))]
+        return web.json_response({'status': True, 'result': {'filtered': total, 'entities': entities}})
+
+    async def run():
+        app = web.Application()
+        app.router.add_get('/v1/case/PRJ', get_cases)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, '127.0.0.1', 0)
+        await site.start()
+        port = runner.addresses[0][1]
+        transport = AsyncHttpTransport(per_host_limit=2)
+        qase_api = AsyncQaseAPI(f'http://127.0.0.1:{port}', 'token', 'PRJ', transport=transport)
+        try:
+            return await qase_api.get_all_test_cases(type='smoke')
+        finally:
+            await transport.close()
+            await runner.cleanup()
+
+    test_cases = asyncio.run(run())
+    assert [test_case['id'] for test_case in test_cases] == list(range(total))
+    assert max_in_flight <= 2
+
+
+def test_run_closes_the_session_before_the_loop_ends():
+    transport = AsyncHttpTransport()
+    sessions = []
+
+    async def open_session():
+        sessions.append(transport._get_session())
+
+    transport.run(open_session())
+    transport.run(open_session())
+    assert len(sessions) == 2
+    assert all(session.closed for session in sessions)
@@ -0,0 +1,90 @@
+from types import SimpleNamespace
+
+import numpy as np
+
+from metrics import metrics
+from metrics.automation_sla import (
+    DURATION_BUCKETS,
+    LATENESS_BUCKETS,
+    get_automation_task_days,
+    get_automation_task_times,
+    get_distributions
+)
+
+
+def make_issue(key, duedate, done_at, labels=(), status_category_id=3):
+    return {
+        'id': key.split('-')[1],
+        'key': key,
+        'fields': {
+            'status': {'id': '10001', 'statusCategory': {'id': status_category_id}},
+            'labels': list(labels),
+            'duedate': duedate,
+            'statuscategorychangedate': done_at
+        }
+    }
+
+
+def in_progress(created):
+    return {'created': created, 'items': [{'field': 'status', 'to': '3'}]}
+
+
+def test_task_days_are_computed_for_all_tasks_at_once():
+    issues = [
+        make_issue('MRC-1', '2024-01-10', '2024-01-12T18:00:00.000+0300', ['team_a']),
+        make_issue('MRC-2', '2024-01-10', '2024-01-08T09:00:00.000+0300', ['team_b']),
+        make_issue('MRC-3', '2024-01-10', '2024-01-09T09:00:00.000+0300'),
+        make_issue('MRC-4', None, '2024-01-09T09:00:00.000+0300'),
+        make_issue('MRC-5', '2024-01-10', '2024-01-09T09:00:00.000+0300', status_category_id=4),
+    ]
+    changelogs = {
+        'MRC-1': [in_progress('2024-01-05T10:00:00.000+0300'), in_progress('2024-01-03T10:00:00.000+0300')],
+        'MRC-2': [{'created': '2024-01-01T10:00:00.000+0300', 'items': [{'field': 'status', 'to': '10160'}]}],
+        'MRC-3': [in_progress('2024-01-06T10:00:00.000+0300')],
+    }
+    times = get_automation_task_times(issues, changelogs, ['team_a', 'team_b'])
+    assert times['key'].tolist() == ['MRC-1', 'MRC-2', 'MRC-3']
+    assert times['group'].tolist() == ['team_a', 'team_b', 'other']
+    days = get_automation_task_days(times)
+    assert days['lateness'].tolist() == [2, -2, -1]
+    assert np.array_equal(days['expected_duration'], [8, np.nan, 5], equal_nan=True)
+    assert np.array_equal(days['actual_duration'], [10, np.nan, 4], equal_nan=True)
+
+
+def test_distributions_have_cumulative_buckets_and_percentiles_per_group():
+    lateness = np.array([-3, 0, 2, 40, 5, np.nan])
+    groups = np.array(['team_a', 'team_a', 'team_a', 'team_a', 'team_b', 'team_b'], dtype=object)
+    distributions = get_distributions(lateness, groups, LATENESS_BUCKETS)
+    assert set(distributions) == {'team_a', 'team_b'}
+    team_a = distributions['team_a']
+    assert team_a['count'] == 4
+    assert team_a['sum'] == 39
+    assert team_a['percentiles'][50] == 1.0
+    buckets = dict(team_a['buckets'])
+    assert buckets['-3.0'] == 1
+    assert buckets['0.0'] == 2
+    assert buckets['30.0'] == 3
+    assert buckets['+Inf'] == 4
+    assert get_distributions(np.array([]), np.array([], dtype=object), DURATION_BUCKETS) == {}
+
+
+class FakeUsecases:
+    def __init__(self, issues):
+        self.issues = issues
+
+    def get_done_smoke_automation_tasks(self):
+        return self.issues
+
+    def get_jira_issues_changelogs(self, issues, field):
+        return {'MRC-1': [in_progress('2024-01-05T10:00:00.000+0300')]}
+
+
+def test_time_diff_totals_leave_out_tasks_without_completion_date(monkeypatch):
+    monkeypatch.setattr(metrics, 'get_usecases', lambda: FakeUsecases([
+        make_issue('MRC-1', '2024-01-10', '2024-01-12T18:00:00.000+0300'),
+        make_issue('MRC-2', '2024-01-10', None)
+    ]))
+    monkeypatch.setattr(metrics, 'get_env_vars', lambda: SimpleNamespace(JIRA_SLA_GROUP_LABELS=None))
+    time_diff = metrics.get_smoke_automation_time_diff()
+    assert time_diff['total_days_diff'] == -2
+    assert time_diff['total_expected_days'] == 6
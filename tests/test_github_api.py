@@ -1,9 +1,48 @@
-from app.config.env_vars import EnvVars
-from app.clients.github_api import GithubCollector
+from github import Github
+from prometheus_client import CollectorRegistry
 
+from clients.github_api import GithubCollector
+from clients.instrumentation import ClientMetrics
+from stubs.github import GithubStub
 
-def test_github_collector():
-    collector = GithubCollector(EnvVars().github_token, EnvVars().github_repo)
-    pulls = collector._get_pulls()
-    for pull in pulls:
-        print(pull)
\ No newline at end of file
+
+def make_pull_request(number, state):
+    return {
+        'number': number,
+        'state': state,
+        'createdAt': '2024-05-01T10:00:00Z',
+        'updatedAt': f'2024-05-{number:02d}T10:00:00Z',
+        'mergedAt': '2024-05-02T10:00:00Z' if state == 'MERGED' else None,
+        'reviews': [],
+        'files': []
+    }
+
+
+def test_github_collector_counts_open_pulls_from_stub():
+    pull_requests = [make_pull_request(number, 'OPEN' if number % 2 else 'MERGED') for number in range(1, 26)]
+    with GithubStub(pull_requests) as stub:
+        collector = GithubCollector('token', 'owner/repo', base_url=stub.url)
+        assert collector._get_pulls(state='open').totalCount == 13
+        assert [pull.number for pull in collector._get_pulls(state='closed')] == list(range(24, 0, -2))
+
+
+def test_repo_is_fetched_on_first_use(monkeypatch):
+    requested_repos = []
+    monkeypatch.setattr(Github, 'get_repo', lambda self, name: requested_repos.append(name) or name)
+    collector = GithubCollector('token', 'owner/repo')
+    assert requested_repos == []
+    assert collector.repo == 'owner/repo'
+    assert collector.repo == 'owner/repo'
+    assert requested_repos == ['owner/repo']
+
+
+def test_github_collector_records_response_sizes_in_bytes():
+    registry = CollectorRegistry()
+    with GithubStub([make_pull_request(1, 'OPEN')]) as stub:
+        collector = GithubCollector('token', 'owner/repo', metrics=ClientMetrics(registry), base_url=stub.url)
+        list(collector._get_pulls(state='open'))
+    sizes = [
+        registry.get_sample_value('api_client_response_size_bytes_sum', {'client': 'github', 'endpoint': endpoint})
+        for endpoint in ('/repos/{repo}', '/repos/{repo}/pulls')
+    ]
+    assert sum(sizes) == stub.bytes_sent
@@ -0,0 +1,136 @@
+from datetime import datetime, timezone
+
+from clients.github_graphql_api import GithubGraphQLAPI
+from clients.http_transport import HttpTransport
+from stubs.github import GithubStub
+
+
+class FakeResponse:
+    def __init__(self, data, status_code: int = 200, headers: dict | None = None):
+        self.data = data
+        self.status_code = status_code
+        self.headers = headers or {}
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.data
+
+
+class FakeTransport:
+    def __init__(self, pages: list[dict], files: list[dict]):
+        self.pages = pages
+        self.files = files
+        self.cursors = []
+        self.rest_requests = []
+
+    def post(self, url, json, **kwargs):
+        self.cursors.append(json['variables']['cursor'])
+        return FakeResponse({'data': self.pages[len(self.cursors) - 1]})
+
+    def get(self, url, headers, params, **kwargs):
+        self.rest_requests.append(headers.get('If-None-Match'))
+        if headers.get('If-None-Match') == '"files"':
+            return FakeResponse(None, 304)
+        return FakeResponse(self.files, headers={'ETag': '"files"'})
+
+    def observe_pages(self, client, call, pages):
+        pass
+
+
+def make_pull_request(number: int, updated_at: str, files: list[str], total_files: int | None = None) -> dict:
+    return {
+        'number': number,
+        'createdAt': '2024-05-01T10:00:00Z',
+        'updatedAt': updated_at,
+        'mergedAt': '2024-05-02T10:00:00Z',
+        'reviews': {'nodes': [{'submittedAt': '2024-05-01T12:00:00Z'}]},
+        'files': {
+            'totalCount': total_files or len(files),
+            'nodes': [{'path': path, 'additions': 5, 'deletions': 1} for path in files]
+        }
+    }
+
+
+def make_page(pull_requests: list[dict], end_cursor: str | None) -> dict:
+    return {'repository': {'pullRequests': {
+        'pageInfo': {'hasNextPage': end_cursor is not None, 'endCursor': end_cursor},
+        'nodes': pull_requests
+    }}}
+
+
+def test_iter_pull_requests_follows_cursor_until_updated_since():
+    pages = [
+        make_page([make_pull_request(3, '2024-05-10T00:00:00Z', ['app/x.py', 'tests/test_x.py'])], 'c1'),
+        make_page([
+            make_pull_request(2, '2024-05-09T00:00:00Z', ['tests/test_a.py'], total_files=150),
+            make_pull_request(1, '2024-04-01T00:00:00Z', ['app/y.py'])
+        ], 'c2')
+    ]
+    rest_files = [{'filename': 'tests/test_b.py', 'additions': 10, 'deletions': 0}, {'filename': 'app/b.py', 'additions': 1, 'deletions': 1}]
+    transport = FakeTransport(pages, rest_files)
+    github_api = GithubGraphQLAPI('token', 'owner/repo', transport=transport)
+    updated_since = datetime(2024, 5, 1, tzinfo=timezone.utc)
+    pull_requests = list(github_api.iter_pull_requests(states=['MERGED'], updated_since=updated_since))
+    assert [pull_request.number for pull_request in pull_requests] == [3, 2]
+    assert transport.cursors == [None, 'c1']
+    assert (pull_requests[0].test_files_changed, pull_requests[0].test_lines_changed) == (1, 6)
+    assert (pull_requests[1].changed_files, pull_requests[1].test_files_changed) == (2, 1)
+    assert pull_requests[0].first_review_at.hour == 12
+
+    assert github_api.get_pull_request_files(2)[0]['path'] == 'tests/test_b.py'
+    assert transport.rest_requests == [None, '"files"']
+
+
+def test_pull_requests_with_many_files_fall_back_to_conditional_rest_requests():
+    files = [{'path': f'tests/test_{number}.py', 'additions': 2, 'deletions': 1} for number in range(150)]
+    pull_request = {
+        'number': 7,
+        'state': 'MERGED',
+        'createdAt': '2024-05-01T10:00:00Z',
+        'updatedAt': '2024-05-03T10:00:00Z',
+        'mergedAt': '2024-05-03T10:00:00Z',
+        'reviews': [{'submittedAt': '2024-05-02T10:00:00Z'}],
+        'files': files
+    }
+    with GithubStub([pull_request]) as stub:
+        github_api = GithubGraphQLAPI('token', 'owner/repo', base_url=stub.url, transport=HttpTransport())
+        [record] = github_api.iter_pull_requests(states=['MERGED'])
+        assert record.test_files_changed == 150
+        assert record.test_lines_changed == 450
+        github_api.get_pull_request_files(7)
+        assert [status for status in stub.statuses if status != 200] == [304, 304]
+
+
+def test_etag_cache_keeps_only_the_most_recently_used_responses():
+    pull_requests = [
+        {
+            'number': number,
+            'state': 'MERGED',
+            'createdAt': '2024-05-01T10:00:00Z',
+            'updatedAt': '2024-05-03T10:00:00Z',
+            'mergedAt': '2024-05-03T10:00:00Z',
+            'reviews': [],
+            'files': [{'path': f'app/module_{number}.py', 'additions': 1, 'deletions': 0}]
+        }
+        for number in range(1, 4)
+    ]
+    with GithubStub(pull_requests) as stub:
+        github_api = GithubGraphQLAPI('token', 'owner/repo', base_url=stub.url, transport=HttpTransport(), etag_cache_size=2)
+        for number in (1, 2, 1, 3):
+            github_api.get_pull_request_files(number)
+        assert [key[0].split('/')[-2] for key in github_api._etag_cache] == ['1', '3']
+        github_api.get_pull_request_files(1)
+        assert stub.statuses[-1] == 304
+
+
+def test_is_test_file_matches_name_patterns_against_the_file_name():
+    client = GithubGraphQLAPI('token', 'owner/repo', transport=HttpTransport())
+    assert client.is_test_file('tests/unit/test_api.py')
+    assert client.is_test_file('src/test/Api.java')
+    assert client.is_test_file('app/test_api.py')
+    assert client.is_test_file('web/button.spec.ts')
+    assert not client.is_test_file('latest_utils.py')
+    assert not client.is_test_file('app/latest_utils.py')
+    assert not client.is_test_file('src/contest_rules.py')
@@ -0,0 +1,51 @@
+from datetime import date
+
+import numpy as np
+
+from metrics.collector import METRIC_DESCRIPTIONS
+from metrics.history import (
+    get_automation_time_diff_values,
+    get_dates,
+    get_smoke_test_history,
+    get_smoke_test_values,
+    iter_openmetrics
+)
+
+
+def make_test(test_id, created_at, automation, task_key=None, execution_minutes='30'):
+    custom_fields = [{'id': 6, 'value': execution_minutes}]
+    if task_key:
+        custom_fields.append({'id': 5, 'value': f'https://jira.example.com/browse/{task_key}'})
+    return {'id': test_id, 'created_at': created_at, 'automation': automation, 'custom_fields': custom_fields}
+
+
+def test_smoke_tests_count_from_creation_and_switch_when_task_is_done():
+    tests = [
+        make_test(1, '2024-01-01T10:00:00+00:00', 2, 'MRC-1'),
+        make_test(2, '2024-01-02 09:00:00', 0, 'MRC-2'),
+        make_test(3, '2024-01-02T09:00:00+00:00', 2),
+    ]
+    history = get_smoke_test_history(iter(tests), {'MRC-1': date(2024, 1, 3), 'MRC-2': date(2024, 1, 2)})
+    values = get_smoke_test_values(history, get_dates(date(2024, 1, 1), date(2024, 1, 4)))
+    assert values['manual_smoke_tests'].tolist() == [0, 1, 2, 1]
+    assert values['automated_smoke_tests'].tolist() == [0, 0, 1, 2]
+    assert values['manual_smoke_tests_execution_hours'].tolist() == [0.0, 0.5, 1.0, 0.5]
+
+
+def test_openmetrics_groups_samples_by_metric_and_ends_with_eof():
+    dates = get_dates(date(2024, 1, 1), date(2024, 1, 15), step_days=7)
+    values = get_automation_time_diff_values(
+        np.array(['2024-01-03', '2024-01-09'], dtype='datetime64[D]'),
+        np.array([2, -1]),
+        np.array([5, 4]),
+        dates
+    )
+    lines = list(iter_openmetrics(dates, values, METRIC_DESCRIPTIONS))
+    assert lines[:5] == [
+        '# HELP smoke_automation_days_diff Total days between due date and completion of smoke automation tasks\n',
+        '# TYPE smoke_automation_days_diff gauge\n',
+        'smoke_automation_days_diff 0 1704067200\n',
+        'smoke_automation_days_diff 2 1704672000\n',
+        'smoke_automation_days_diff 1 1705276800\n',
+    ]
+    assert lines[-2:] == ['smoke_automation_expected_days 9 1705276800\n', '# EOF\n']
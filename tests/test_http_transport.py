@@ -0,0 +1,72 @@
+import io
+
+from prometheus_client import CollectorRegistry
+import pytest
+import requests
+
+from clients import http_transport
+from clients.http_transport import DeadlineExceeded, HttpTransport, RetryPolicy
+from clients.instrumentation import ClientMetrics
+from clients.rate_limit import RateLimitBudget
+
+
+def make_response(status_code: int, headers: dict | None = None) -> requests.Response:
+    response = requests.Response()
+    response.status_code = status_code
+    response.headers.update(headers or {})
+    response.raw = io.BytesIO(b'')
+    return response
+
+
+def test_request_retries_429_respecting_retry_after(monkeypatch):
+    responses = [make_response(429, {'Retry-After': '2'}), make_response(200)]
+    delays = []
+    transport = HttpTransport(retry_policy=RetryPolicy(max_retries=3))
+    monkeypatch.setattr(transport._session, 'request', lambda *args, **kwargs: responses.pop(0))
+    monkeypatch.setattr(http_transport.time, 'sleep', delays.append)
+    response = transport.post('https://jira.example.com/rest/api/2/issue')
+    assert response.status_code == 200
+    assert delays == [2.0]
+
+
+def test_request_does_not_retry_5xx_for_non_idempotent_requests(monkeypatch):
+    responses = [make_response(503), make_response(503), make_response(200)]
+    transport = HttpTransport()
+    monkeypatch.setattr(transport._session, 'request', lambda *args, **kwargs: responses.pop(0))
+    monkeypatch.setattr(http_transport.time, 'sleep', lambda delay: None)
+    assert transport.post('https://jira.example.com/rest/api/2/issue').status_code == 503
+    assert transport.post('https://jira.example.com/rest/api/2/search', idempotent=True).status_code == 200
+
+
+def test_request_records_metrics_by_client_and_endpoint_template(monkeypatch):
+    registry = CollectorRegistry()
+    responses = [make_response(503), make_response(200)]
+    transport = HttpTransport(metrics=ClientMetrics(registry))
+    monkeypatch.setattr(transport._session, 'request', lambda *args, **kwargs: responses.pop(0))
+    monkeypatch.setattr(http_transport.time, 'sleep', lambda delay: None)
+    transport.get('https://jira.example.com/rest/api/3/issue/MRC-12/changelog', client='jira')
+    transport.observe_pages('jira', 'get_all_changelogs', 3)
+    labels = {'client': 'jira', 'endpoint': '/rest/api/3/issue/{id}/changelog', 'method': 'GET'}
+    assert registry.get_sample_value('api_client_requests_total', {**labels, 'status': '503'}) == 1
+    assert registry.get_sample_value('api_client_requests_total', {**labels, 'status': '200'}) == 1
+    assert registry.get_sample_value('api_client_request_duration_seconds_count', labels) == 2
+    assert registry.get_sample_value('api_client_retries_total', {'client': 'jira', 'endpoint': labels['endpoint']}) == 1
+    assert registry.get_sample_value('api_client_pages_per_call_sum', {'client': 'jira', 'call': 'get_all_changelogs'}) == 3
+
+
+def test_request_deadline_counts_the_rate_limit_wait(monkeypatch):
+    clock = [0.0]
+    timeouts = []
+    rate_limit = RateLimitBudget()
+    transport = HttpTransport(timeout=30, total_timeout=10, rate_limit=rate_limit)
+    monkeypatch.setattr(http_transport.time, 'monotonic', lambda: clock[0])
+    monkeypatch.setattr(http_transport.time, 'sleep', lambda delay: clock.__setitem__(0, clock[0] + delay))
+    monkeypatch.setattr(transport._session, 'request', lambda *args, timeout, **kwargs: timeouts.append(timeout) or make_response(200))
+    rate_limit.update('https://jira.example.com/rest/api/3/issue/MRC-1', {'Retry-After': '4'}, 429)
+    transport.get('https://jira.example.com/rest/api/3/issue/MRC-1')
+    assert timeouts == [6.0]
+
+    rate_limit.update('https://jira.example.com/rest/api/3/issue/MRC-1', {'Retry-After': '20'}, 429)
+    with pytest.raises(DeadlineExceeded):
+        transport.get('https://jira.example.com/rest/api/3/issue/MRC-1')
+    assert rate_limit._buckets[('jira.example.com', 'core')].tokens == 20
@@ -1,10 +1,113 @@
 import json
 
-from app.config.env_vars import EnvVars
-from app.clients.jira_api import JiraAPI
+from clients.http_transport import HttpTransport
+from clients.jira_api import JiraAPI
+from stubs.jira import JiraStub
 
 
-def test_jira_collector():
-    collector = JiraAPI(EnvVars().JIRA_URL, EnvVars().JIRA_EMAIL, EnvVars().JIRA_API_TOKEN)
-    issues = collector._get_issues('project = MRC', max_results=0)
-    print(json.dumps(issues, indent=4))
+def make_issue(number):
+    return {
+        'id': str(10000 + number),
+        'key': f'MRC-{number}',
+        'fields': {'summary': f'Automate test {number}', 'status': {'id': '3'}, 'labels': ['smoke'], 'duedate': None}
+    }
+
+
+def test_jira_api_reads_issues_and_changelogs_from_stub():
+    issues = [make_issue(number) for number in range(230)]
+    changelogs = {
+        'MRC-1': [
+            {'id': str(history_id), 'created': '2024-01-01T10:00:00.000+0000', 'items': [{'field': field, 'to': '3'}]}
+            for history_id, field in zip(range(150), ['status', 'labels'] * 75)
+        ]
+    }
+    with JiraStub(issues, changelogs, bulk_changelog_page_size=40) as stub:
+        jira_api = JiraAPI(stub.url, 'user@example.com', 'token', transport=HttpTransport())
+        all_issues = jira_api.get_all_issues('project = MRC')
+        assert [issue['key'] for issue in all_issues] == [issue['key'] for issue in issues]
+        assert 'duedate' not in all_issues[0]['fields']
+        assert len(jira_api.get_all_changelogs('MRC-1', ['status'])) == 75
+        assert len(jira_api.get_bulk_changelogs(['MRC-1', 'MRC-2'], ['status'])['10001']) == 75
+        found_issues, unresolved_keys = jira_api.get_issues_by_keys(['MRC-3', 'MRC-404'])
+        assert [issue['key'] for issue in found_issues] == ['MRC-3']
+        assert unresolved_keys == ['MRC-404']
+        searches = [target for method, target in stub.requests if target == '/rest/api/2/search']
+        assert len(searches) == 4
+
+
+def test_get_all_issues_uses_first_page_total(monkeypatch):
+    total = 230
+    calls = []
+
+    def fake_get_issues(jql, max_results=15, start_at=0, fields=None, validate_query=None):
+        calls.append((max_results, start_at, tuple(fields)))
+        page_size = min(max_results, 100)
+        issues = [{'key': f'MRC-{i}'} for i in range(start_at, min(start_at + page_size, total))]
+        return {'total': total, 'maxResults': page_size, 'startAt': start_at, 'issues': issues}
+
+    collector = JiraAPI('https://jira.example.com', 'user@example.com', 'token', max_workers=4)
+    monkeypatch.setattr(collector, 'get_issues', fake_get_issues)
+    issues = collector.get_all_issues('project = MRC', extra_fields=['duedate'])
+    assert [issue['key'] for issue in issues] == [f'MRC-{i}' for i in range(total)]
+    assert calls[0] == (1000, 0, ('summary', 'status', 'labels', 'duedate'))
+    assert sorted(start_at for _, start_at, _ in calls[1:]) == [100, 200]
+
+
+def test_get_bulk_changelogs_follows_pagination_and_filters_fields(monkeypatch):
+    pages = [
+        {
+            'issueChangeLogs': [{'issueId': '1', 'changeHistories': [
+                {'id': '11', 'items': [{'field': 'status', 'to': '3'}]},
+                {'id': '12', 'items': [{'field': 'labels', 'to': 'smoke'}]},
+            ]}],
+            'nextPageToken': 'next'
+        },
+        {
+            'issueChangeLogs': [{'issueId': '1', 'changeHistories': [
+                {'id': '10', 'items': [{'field': 'status', 'to': '10000'}]},
+            ]}, {'issueId': '2', 'changeHistories': []}]
+        },
+    ]
+    payloads = []
+
+    class FakeResponse:
+        def __init__(self, data):
+            self._data = data
+
+        def raise_for_status(self):
+            pass
+
+        def json(self):
+            return self._data
+
+    def fake_post(url, data, **kwargs):
+        payloads.append(json.loads(data))
+        return FakeResponse(pages.pop(0))
+
+    collector = JiraAPI('https://jira.example.com', 'user@example.com', 'token')
+    monkeypatch.setattr(collector._transport, 'post', fake_post)
+    changelogs = collector.get_bulk_changelogs(['1', '2'], ['status'])
+    assert [history['id'] for history in changelogs['1']] == ['10', '11']
+    assert changelogs['2'] == []
+    assert payloads[1]['nextPageToken'] == 'next'
+
+
+def test_get_issues_by_keys_chunks_and_reports_unresolved_keys(monkeypatch):
+    existing_keys = {f'MRC-{i}' for i in range(5)}
+    jqls = []
+
+    def fake_get_all_issues(jql, fields=None, extra_fields=None, max_results=1000, validate_query=None, compact=False):
+        jqls.append(jql)
+        assert validate_query == 'warn'
+        keys = jql[len('key in ('):-1].split(',')
+        return [{'key': key} for key in keys if key in existing_keys]
+
+    collector = JiraAPI('https://jira.example.com', 'user@example.com', 'token')
+    monkeypatch.setattr(collector, 'get_all_issues', fake_get_all_issues)
+    issues, unresolved_keys = collector.get_issues_by_keys(
+        ['MRC-0', 'MRC-1', 'MRC-1', 'MRC-9', 'MRC-2', 'MRC-3', 'MRC-4'],
+        chunk_size=2
+    )
+    assert len(jqls) == 3
+    assert sorted(issue['key'] for issue in issues) == sorted(existing_keys)
+    assert unresolved_keys == ['MRC-9']
@@ -0,0 +1,39 @@
+import pytest
+from prometheus_client import CollectorRegistry, generate_latest
+
+from metrics.collector import MetricsCollector
+
+
+def test_collector_exposes_last_values_with_timestamps():
+    registry = CollectorRegistry()
+    collector = MetricsCollector()
+    registry.register(collector)
+    collector.set_values({'automated_smoke_tests': 10, 'manual_smoke_tests': 4}, timestamp=1700000000)
+    collector.set_values({'manual_smoke_tests': 5}, timestamp=1700000600)
+    output = generate_latest(registry).decode()
+    assert 'automated_smoke_tests 10.0 1700000000000' in output
+    assert 'manual_smoke_tests 5.0 1700000600000' in output
+    assert 'open_pull_requests' not in output
+    assert registry.get_sample_value('blocked_manual_smoke_tests') is None
+    with pytest.raises(ValueError):
+        collector.set_values({'unknown_metric': 1})
+
+
+def test_collector_replaces_series_of_labelled_metrics():
+    registry = CollectorRegistry()
+    collector = MetricsCollector(timestamps=False)
+    registry.register(collector)
+    collector.set_values({'qase_flaky_test_case_status_flips': {('1',): 3, ('2',): 1}})
+    collector.set_values({'qase_flaky_test_case_status_flips': {('2',): 2}})
+    assert registry.get_sample_value('qase_flaky_test_case_status_flips', {'case_id': '2'}) == 2
+    assert registry.get_sample_value('qase_flaky_test_case_status_flips', {'case_id': '1'}) is None
+
+
+def test_collector_exposes_histograms_per_label_values():
+    registry = CollectorRegistry()
+    collector = MetricsCollector(timestamps=False)
+    registry.register(collector)
+    collector.set_values({'smoke_automation_lateness_days': {('team_a',): ([('0.0', 1), ('7.0', 3), ('+Inf', 4)], 20.0)}})
+    assert registry.get_sample_value('smoke_automation_lateness_days_bucket', {'group': 'team_a', 'le': '7.0'}) == 3
+    assert registry.get_sample_value('smoke_automation_lateness_days_count', {'group': 'team_a'}) == 4
+    assert registry.get_sample_value('smoke_automation_lateness_days_sum', {'group': 'team_a'}) == 20
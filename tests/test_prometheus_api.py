@@ -0,0 +1,84 @@
+import threading
+import time
+
+import numpy as np
+
+from clients.prometheus_api import PrometheusAPI
+
+
+class FakeResponse:
+    def __init__(self, data):
+        self.data = data
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return {'status': 'success', 'data': self.data}
+
+
+class FakeTransport:
+    def __init__(self, delay: float = 0):
+        self.ranges = []
+        self.delay = delay
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+
+    def post(self, url, data, **kwargs):
+        with self.lock:
+            self.ranges.append((data['start'], data['end']))
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(self.delay)
+        with self.lock:
+            self.in_flight -= 1
+        timestamps = np.arange(data['start'], data['end'] + data['step'], data['step'])
+        return FakeResponse({'resultType': 'matrix', 'result': [{
+            'metric': {'__name__': 'manual_smoke_tests'},
+            'values': [[timestamp, str(timestamp / 60)] for timestamp in timestamps]
+        }]})
+
+    def get(self, url, params, **kwargs):
+        return FakeResponse({'resultType': 'vector', 'result': [
+            {'metric': {'group': name}, 'value': [1700000000.5, value]}
+            for name, value in (('qase', '4'), ('jira', 'NaN'))
+        ]})
+
+
+def test_query_range_splits_aligns_and_caches_chunks():
+    transport = FakeTransport()
+    prometheus_api = PrometheusAPI('http://prometheus:9090', transport=transport, max_points=10)
+    [series] = prometheus_api.query_range('manual_smoke_tests', 1030, 1000 + 60 * 25, 60, decode=True)
+    assert sorted(transport.ranges) == [(1020, 1140), (1200, 1740), (1800, 2340), (2400, 2460)]
+    assert series.timestamps[0] == np.datetime64(1020, 's')
+    assert np.array_equal(series.values, np.arange(1020, 2461, 60) / 60)
+
+    prometheus_api.query_range('manual_smoke_tests', 1200, 2400, 60)
+    assert transport.ranges[4:] == [(2400, 2400)]
+
+
+def test_query_range_batch_shares_one_pool_and_returns_copies_of_cached_chunks():
+    transport = FakeTransport(delay=0.01)
+    prometheus_api = PrometheusAPI('http://prometheus:9090', transport=transport, max_workers=2, max_points=10)
+    results = prometheus_api.query_range_batch(['a', 'b', 'c'], 1200, 1200 + 60 * 29, 60)
+    assert len(transport.ranges) == 9
+    assert transport.max_in_flight == 2
+    assert [len(data['result'][0]['values']) for data in results] == [30, 30, 30]
+
+    data = prometheus_api.query_range('a', 1200, 1740, 60)
+    data['result'][0]['values'].clear()
+    data['result'][0]['metric']['__name__'] = 'changed'
+    [series] = prometheus_api.query_range('a', 1200, 1740, 60)['result']
+    assert series['metric'] == {'__name__': 'manual_smoke_tests'}
+    assert len(series['values']) == 10
+    assert len(transport.ranges) == 9
+
+
+def test_query_batch_decodes_vectors_in_query_order():
+    prometheus_api = PrometheusAPI('http://prometheus:9090', transport=FakeTransport())
+    results = prometheus_api.query_batch(['up', 'collection_failures_total'], decode=True)
+    assert len(results) == 2
+    assert [series.labels['group'] for series in results[0]] == ['qase', 'jira']
+    assert results[0][0].values[0] == 4
+    assert np.isnan(results[0][1].values[0])
@@ -0,0 +1,36 @@
+import importlib
+
+import pytest
+
+from scheduler import MetricGroup
+
+
+@pytest.fixture
+def push(monkeypatch):
+    for name in (
+        'PROMETHEUS_URL', 'JIRA_URL', 'JIRA_EMAIL', 'JIRA_API_TOKEN', 'QASE_URL',
+        'QASE_API_TOKEN', 'QASE_PROJECT_CODE', 'GITHUB_TOKEN', 'GITHUB_REPO'
+    ):
+        monkeypatch.setenv(name, 'value')
+    return importlib.import_module('push')
+
+
+def test_push_sends_successful_groups_and_reports_partial_failure(push, monkeypatch):
+    pushes = []
+
+    def fail():
+        raise RuntimeError('Jira is down')
+
+    monkeypatch.setattr(push, 'start_refresh', lambda: None)
+    monkeypatch.setattr(push, 'get_metric_groups', lambda: [
+        MetricGroup('qase', lambda: push.collector.set_values({'manual_smoke_tests': 4}), 600),
+        MetricGroup('jira', fail, 900)
+    ])
+    monkeypatch.setattr(push, 'pushadd_to_gateway', lambda gateway, **kwargs: pushes.append((gateway, kwargs)))
+    exit_code = push.main(['--gateway', 'localhost:9091', '--project', 'PRJ', '--source', 'ci'])
+    assert exit_code == push.EXIT_PARTIAL_FAILURE
+    [(gateway, kwargs)] = pushes
+    assert gateway == 'localhost:9091'
+    assert kwargs['grouping_key'] == {'project': 'PRJ', 'source': 'ci'}
+    assert kwargs['registry'].get_sample_value('manual_smoke_tests') == 4
+    assert kwargs['registry'].get_sample_value('collection_failed_groups') == 1
@@ -0,0 +1,85 @@
+from clients.http_transport import HttpTransport
+from clients.qase_api import AutomationStatus, CustomField, QaseAPI
+from clients import records
+from stubs.qase import QaseStub
+
+
+def make_case(case_id, type=3, automation=AutomationStatus.AUTOMATED.value):
+    return {'id': case_id, 'title': f'Case {case_id}', 'type': type, 'status': 0, 'automation': automation, 'custom_fields': []}
+
+
+def test_get_all_test_cases_keeps_offset_order(monkeypatch):
+    total = 250
+    requested_offsets = []
+
+    def fake_get_test_cases(**kwargs):
+        offset = kwargs['start_result']
+        requested_offsets.append(offset)
+        entities = [{'id': i} for i in range(offset, min(offset + kwargs['max_results'], total))]
+        return {'result': {'filtered': total, 'entities': entities}}
+
+    qase_api = QaseAPI('https://api.qase.io', 'token', 'PRJ', max_workers=4)
+    monkeypatch.setattr(qase_api, '_get_test_cases', fake_get_test_cases)
+    test_cases = qase_api.get_all_test_cases(type='smoke')
+    assert [test_case['id'] for test_case in test_cases] == list(range(total))
+    assert sorted(requested_offsets) == [0, 100, 200]
+
+
+def test_iter_all_test_cases_streams_pages_in_order(monkeypatch):
+    total = 350
+    requested_offsets = []
+
+    def fake_get_test_cases(**kwargs):
+        offset = kwargs['start_result']
+        requested_offsets.append(offset)
+        entities = [{'id': i} for i in range(offset, min(offset + kwargs['max_results'], total))]
+        return {'result': {'filtered': total, 'entities': entities}}
+
+    qase_api = QaseAPI('https://api.qase.io', 'token', 'PRJ')
+    monkeypatch.setattr(qase_api, '_get_test_cases', fake_get_test_cases)
+    test_cases = qase_api.iter_all_test_cases(type='smoke', prefetch=1)
+    assert [next(test_cases)['id'] for _ in range(150)] == list(range(150))
+    assert 300 not in requested_offsets
+    assert [test_case['id'] for test_case in test_cases] == list(range(150, total))
+    assert sorted(requested_offsets) == [0, 100, 200, 300]
+
+
+def test_compact_test_case_record_indexes_custom_fields():
+    test_case = records.TestCaseRecord.from_dict({
+        'id': 7,
+        'title': 'Login',
+        'type': 3,
+        'status': 0,
+        'automation': 0,
+        'updated_at': '2024-03-01T10:00:00+00:00',
+        'steps': [{'action': 'open'}],
+        'custom_fields': [{'id': 5, 'value': 'https://jira.example.com/browse/MRC-1'}, {'id': 6, 'value': '30'}]
+    })
+    assert test_case['id'] == 7
+    assert CustomField.MANUAL_EXECUTION_TIME.get_value(test_case) == '30'
+    assert CustomField.AUTOMATION_TASK.get_value(records.TestCaseRecord.from_dict({'id': 8})) == ''
+    assert not hasattr(test_case, '__dict__')
+
+
+def test_qase_api_reads_filtered_cases_from_stub():
+    cases = [make_case(case_id, automation=case_id % 3) for case_id in range(1, 301)]
+    cases.append(make_case(301, type=2))
+    with QaseStub(cases) as stub:
+        qase_api = QaseAPI(stub.url, 'token', 'MRC', transport=HttpTransport())
+        page = qase_api._get_test_cases(type='smoke', status='actual', max_results=1)
+        assert page['result']['total'] == 301
+        assert page['result']['filtered'] == 300
+        assert qase_api.get_number_of_test_cases(type='smoke', status='actual', automation='automated') == 100
+        test_cases = qase_api.get_all_test_cases(type='smoke', status='actual', automation='is-not-automated,to-be-automated')
+        assert len(test_cases) == 200
+        assert all(test_case['automation'] != AutomationStatus.AUTOMATED.value for test_case in test_cases)
+
+
+def test_unchanged_case_pages_are_not_modified_for_stub():
+    with QaseStub([make_case(case_id) for case_id in range(1, 251)]) as stub:
+        qase_api = QaseAPI(stub.url, 'token', 'MRC', transport=HttpTransport())
+        pages = qase_api.get_all_test_case_pages()
+        etags = {page['offset']: page['etag'] for page in pages}
+        stub.cases[120]['title'] = 'Changed'
+        pages = qase_api.get_all_test_case_pages(etags)
+        assert [page['data'] is None for page in pages] == [False, False, True]
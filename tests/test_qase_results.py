@@ -0,0 +1,74 @@
+from datetime import datetime, timezone
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+import requests
+
+from clients.http_transport import HttpTransport, RetryPolicy
+from clients.qase_api import QaseAPI
+from metrics.qase_results import compute_result_stats, ingest_test_run_results
+from storage.qase_result_store import QaseResultStore
+from stubs.qase import QaseStub
+
+
+def make_result(case_id, run_id, status, minute, time_spent_ms=1000):
+    return {
+        'case_id': case_id,
+        'run_id': run_id,
+        'status': status,
+        'time_spent_ms': time_spent_ms,
+        'end_time': f'2024-05-01T10:{minute:02d}:00+00:00'
+    }
+
+
+RESULTS = [
+    make_result(1, 1, 'passed', 0),
+    make_result(2, 1, 'failed', 1),
+    make_result(1, 2, 'failed', 2, 3000),
+    make_result(3, 2, 'skipped', 3),
+    make_result(1, 3, 'passed', 4),
+    make_result(2, 3, 'failed', 5, None),
+]
+
+
+def test_compute_result_stats_counts_flips_pass_rates_and_run_durations():
+    store = QaseResultStore()
+    store.extend(RESULTS)
+    stats = compute_result_stats(store.get_columns())
+    assert stats['number_of_results'] == 6
+    assert stats['pass_rate'] == 0.4
+    assert stats['number_of_flaky_cases'] == 1
+    assert stats['number_of_status_flips'] == 2
+    assert stats['flaky_cases'] == [(1, 2, 0.6667)]
+    assert stats['run_duration_percentiles'][50] == 2.0
+
+
+def test_ingestion_resumes_interrupted_window_from_saved_cursor(tmp_path):
+    path = str(tmp_path / 'results.npz')
+    now = datetime(2024, 5, 2, tzinfo=timezone.utc)
+    results = [
+        {**make_result(2, 0, 'passed', 0), 'end_time': '2024-03-01T10:00:00+00:00'},
+        *RESULTS,
+        {**make_result(3, 4, 'passed', 0), 'end_time': '2024-05-02T00:00:05+00:00'}
+    ]
+    # The third request of the window, at offset 4, runs out of the rate limit
+    with QaseStub([], results, rate_limit=2) as stub:
+        qase_api = QaseAPI(stub.url, 'token', 'MRC', transport=HttpTransport(retry_policy=RetryPolicy(max_retries=0)))
+        with pytest.raises(requests.HTTPError):
+            ingest_test_run_results(qase_api, QaseResultStore(path), days=30, now=now, checkpoint_pages=1, max_results=2, prefetch=1)
+
+        store = QaseResultStore(path)
+        assert len(store) == 4
+        assert store.cursor == {'from_end_time': '2024-04-02 00:00:00', 'to_end_time': '2024-05-02 00:00:00', 'offset': 4}
+        stub.rate_limit = None
+        assert ingest_test_run_results(qase_api, store, days=30, now=now, max_results=2, prefetch=1) == 2
+        query = {name: values[0] for name, values in parse_qs(urlsplit(stub.requests[-1][1]).query).items()}
+        assert query == {'limit': '2', 'offset': '4', 'from_end_time': '2024-04-02 00:00:00', 'to_end_time': '2024-05-02 00:00:00'}
+
+        store = QaseResultStore(path)
+        assert len(store) == 6
+        assert store.cursor == {'from_end_time': '2024-05-02 00:00:01', 'to_end_time': None, 'offset': 0}
+        assert compute_result_stats(store.get_columns())['number_of_status_flips'] == 2
+
+        assert ingest_test_run_results(qase_api, store, days=30, now=datetime(2024, 5, 3, tzinfo=timezone.utc)) == 1
+        assert len(QaseResultStore(path)) == 7
@@ -0,0 +1,65 @@
+import time
+
+import pytest
+
+from clients.rate_limit import RateLimitBudget, parse_rate_limit_reset
+
+
+def test_budget_allows_burst_then_spaces_requests_per_host():
+    budget = RateLimitBudget(default_rate=10, burst=2)
+    assert budget.reserve('https://api.qase.io/v1/case/PRJ') == 0
+    assert budget.reserve('https://api.qase.io/v1/case/PRJ') == 0
+    assert budget.reserve('https://api.qase.io/v1/case/PRJ') == pytest.approx(0.1, abs=0.01)
+    assert budget.reserve('https://jira.example.com/rest/api/3/search/jql') == 0
+
+
+def test_budget_follows_rate_limit_headers():
+    budget = RateLimitBudget(default_rate=100, burst=10)
+    url = 'https://api.github.com/graphql'
+    budget.update(url, {'X-RateLimit-Remaining': '60', 'X-RateLimit-Reset': str(int(time.time()) + 60)}, 200)
+    for _ in range(10):
+        budget.reserve(url)
+    assert budget.reserve(url) == pytest.approx(1, abs=0.1)
+
+    budget.update(url, {'X-RateLimit-Remaining': '0', 'X-RateLimit-Reset': '30'}, 200)
+    assert budget.reserve(url) == pytest.approx(30, abs=0.5)
+
+
+def test_github_rest_and_graphql_budgets_are_kept_apart():
+    budget = RateLimitBudget(default_rate=100, burst=10)
+    reset = str(int(time.time()) + 3600)
+    graphql_url = 'https://api.github.com/graphql'
+    rest_url = 'https://api.github.com/repos/owner/repo/pulls'
+    budget.update(graphql_url, {'X-RateLimit-Resource': 'graphql', 'X-RateLimit-Remaining': '0', 'X-RateLimit-Reset': reset}, 200)
+    budget.update(rest_url, {'X-RateLimit-Resource': 'graphql', 'X-RateLimit-Remaining': '0', 'X-RateLimit-Reset': reset}, 200)
+    assert budget.reserve(graphql_url) == pytest.approx(3600, abs=2)
+    assert budget.reserve(rest_url) == 0
+
+
+@pytest.mark.parametrize('remaining, delay', [('4000', 0.01), ('360', 10)])
+def test_budget_paces_only_below_the_reserve_of_the_limit(remaining, delay):
+    budget = RateLimitBudget(default_rate=100, burst=1, reserve_fraction=0.2)
+    url = 'https://api.github.com/repos/owner/repo/pulls'
+    reset = str(int(time.time()) + 3600)
+    budget.update(url, {'X-RateLimit-Limit': '5000', 'X-RateLimit-Remaining': remaining, 'X-RateLimit-Reset': reset}, 200)
+    budget.reserve(url)
+    assert budget.reserve(url) == pytest.approx(delay, rel=0.1)
+
+
+def test_retry_after_pauses_host_for_every_caller():
+    budget = RateLimitBudget()
+    budget.update('https://jira.example.com/rest/api/3/issue/MRC-1', {'Retry-After': '5'}, 429)
+    assert budget.reserve('https://jira.example.com/rest/api/3/search/jql') == pytest.approx(5, abs=0.1)
+
+
+def test_parse_rate_limit_reset_accepts_unix_time_and_iso_timestamp():
+    assert parse_rate_limit_reset(str(time.time() + 10)) == pytest.approx(10, abs=1)
+    assert parse_rate_limit_reset('2000-01-01T00:00Z') == 0
+
+
+def test_reserve_keeps_the_token_when_the_wait_passes_the_deadline():
+    budget = RateLimitBudget(default_rate=1, burst=1)
+    url = 'https://api.qase.io/v1/case/PRJ'
+    assert budget.reserve(url) == 0
+    assert budget.reserve(url, deadline=time.monotonic() + 0.5) is None
+    assert budget.reserve(url, deadline=time.monotonic() + 5) == pytest.approx(1, abs=0.1)
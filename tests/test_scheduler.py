@@ -0,0 +1,23 @@
+import threading
+
+from scheduler import MetricGroup, MetricScheduler
+
+
+def test_failing_group_does_not_stall_other_groups():
+    runs = threading.Semaphore(0)
+
+    def fail():
+        raise RuntimeError('source is down')
+
+    failing_group = MetricGroup('failing', fail, interval=0.01)
+    working_group = MetricGroup('working', runs.release, interval=0.01)
+    scheduler = MetricScheduler([failing_group, working_group])
+    scheduler.start()
+    try:
+        for _ in range(3):
+            assert runs.acquire(timeout=5)
+    finally:
+        scheduler.stop(timeout=5)
+    assert working_group.last_success is not None
+    assert failing_group.last_success is None
+    assert isinstance(failing_group.last_error, RuntimeError)
@@ -0,0 +1,40 @@
+import time
+
+import pytest
+import requests
+
+from clients.http_transport import HttpTransport, RetryPolicy
+from clients.qase_api import QaseAPI
+from clients.rate_limit import RateLimitBudget
+from stubs.cassette import CassetteServer
+from stubs.qase import QaseStub
+
+
+def make_cases(count):
+    return [{'id': case_id, 'type': 3, 'status': 0, 'automation': 2, 'custom_fields': []} for case_id in range(1, count + 1)]
+
+
+def test_cassette_replays_recorded_responses_without_the_service(tmp_path):
+    path = str(tmp_path / 'cassettes' / 'qase.jsonl.gz')
+    with QaseStub(make_cases(250)) as upstream:
+        with CassetteServer(path, upstream.url, mode='record') as recorder:
+            recorded = QaseAPI(recorder.url, 'token', 'MRC', transport=HttpTransport()).get_all_test_cases(type='smoke')
+        assert len(upstream.requests) == 3
+
+    with CassetteServer(path) as player:
+        qase_api = QaseAPI(player.url, 'token', 'MRC', transport=HttpTransport(retry_policy=RetryPolicy(max_retries=0)))
+        assert qase_api.get_all_test_cases(type='smoke') == recorded
+        with pytest.raises(requests.HTTPError):
+            qase_api.get_test_case(1)
+
+
+def test_stub_rate_limit_headers_pace_the_shared_budget():
+    budget = RateLimitBudget(default_rate=100, burst=100)
+    with QaseStub(make_cases(10), rate_limit=2, rate_limit_window=1) as stub:
+        transport = HttpTransport(retry_policy=RetryPolicy(max_retries=0), rate_limit=budget)
+        started = time.monotonic()
+        responses = [transport.get(f'{stub.url}/v1/case/MRC') for _ in range(3)]
+        elapsed = time.monotonic() - started
+    assert [response.headers['X-RateLimit-Remaining'] for response in responses[:2]] == ['1', '0']
+    assert stub.statuses == [200, 200, 200]
+    assert elapsed > 0.1
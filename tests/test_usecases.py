@@ -0,0 +1,209 @@
+import asyncio
+
+import pytest
+
+from clients import records
+from metrics.snapshot_cache import SnapshotCache
+from metrics.usecases import Usecases
+from storage.jira_store import JiraStore
+from storage.qase_store import QaseStore
+
+
+class FakeQaseAPI:
+    def __init__(self):
+        self.calls = []
+
+    def get_all_test_cases(self, type=None, status=None, automation=None, compact=False):
+        self.calls.append(automation)
+        return [{'id': len(self.calls), 'custom_fields': []}]
+
+
+def test_smoke_tests_are_fetched_once_per_refresh():
+    qase_api = FakeQaseAPI()
+    usecases = Usecases(qase_api=qase_api)
+    usecases.new_refresh()
+    first = usecases.get_smoke_tests(automated=False)
+    assert usecases.get_smoke_tests(automated=False) is first
+    usecases.get_smoke_tests(automated=True)
+    assert len(qase_api.calls) == 2
+
+    usecases.new_refresh()
+    assert usecases.get_smoke_tests(automated=False) is not first
+    assert len(qase_api.calls) == 3
+
+
+def test_snapshot_cache_evicts_least_recently_used_entries():
+    cache = SnapshotCache(max_entries=2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    cache.get('a')
+    cache.put('c', 3)
+    assert cache.get_or_fetch('a', lambda: 'fetched') == 1
+    assert cache.get_or_fetch('b', lambda: 'fetched') == 'fetched'
+
+
+def test_snapshot_cache_invalidates_only_named_datasets():
+    cache = SnapshotCache()
+    cache.put(('smoke_tests', True), 1)
+    cache.put(('smoke_tests', False), 2)
+    cache.put(('automation_tasks', ()), 3)
+    cache.invalidate_datasets(['smoke_tests'])
+    assert cache.get_or_fetch(('smoke_tests', True), lambda: 'fetched') == 'fetched'
+    assert cache.get_or_fetch(('automation_tasks', ()), lambda: 'fetched') == 3
+
+
+def test_snapshot_cache_drops_key_locks_after_fetching():
+    cache = SnapshotCache()
+    for task_keys in (('MRC-1',), ('MRC-1', 'MRC-2')):
+        cache.get_or_fetch(('automation_tasks', task_keys), lambda: [])
+    with pytest.raises(ZeroDivisionError):
+        cache.get_or_fetch(('changelogs', ()), lambda: 1 / 0)
+    assert cache._key_locks == {}
+
+
+class FakeJiraAPI:
+    def __init__(self, statuses: dict):
+        self.statuses = statuses
+        self.requested_keys = []
+
+    def get_issues_by_keys(self, issue_keys, fields=None, extra_fields=None, compact=False):
+        self.requested_keys.append(issue_keys)
+        issues = [
+            {'key': key, 'fields': {'status': {'id': self.statuses[key]}, 'labels': []}}
+            for key in issue_keys if key in self.statuses
+        ]
+        return issues, [key for key in issue_keys if key not in self.statuses]
+
+
+def test_smoke_test_task_index_joins_tests_and_tasks_with_one_search():
+    qase_api = FakeQaseAPI()
+    qase_api.get_all_test_cases = lambda **kwargs: [
+        {'id': 1, 'custom_fields': [{'id': 5, 'value': 'https://jira.example.com/browse/MRC-1'}]},
+        {'id': 2, 'custom_fields': [{'id': 5, 'value': 'https://jira.example.com/browse/MRC-1'}]},
+        {'id': 3, 'custom_fields': [{'id': 5, 'value': 'https://jira.example.com/browse/MRC-2'}]},
+        {'id': 4, 'custom_fields': []},
+    ]
+    jira_api = FakeJiraAPI({'MRC-1': '10160', 'MRC-2': '3'})
+    usecases = Usecases(qase_api=qase_api, jira_api=jira_api)
+    index = usecases.get_smoke_test_task_index(automated=False)
+    assert usecases.get_smoke_test_task_index(automated=False) is index
+    assert jira_api.requested_keys == [['MRC-1', 'MRC-2']]
+    assert [test['id'] for test in index.get_tests_for_tasks([index.tasks_by_key['MRC-1']])] == [1, 2]
+    assert index.get_task(3)['key'] == 'MRC-2'
+    assert [test['id'] for test in index.tests_without_task] == [4]
+
+
+class FakeSyncJiraAPI:
+    def __init__(self):
+        self.issues = {}
+        self.calls = []
+
+    def get_all_issues(self, jql, fields=None, extra_fields=None, compact=False):
+        self.calls.append('full')
+        return list(self.issues.values())
+
+    def get_updated_issues(self, jql, since, fields=None, extra_fields=None):
+        self.calls.append('incremental')
+        return [issue for issue in self.issues.values() if issue['updated_at'] > since]
+
+    def get_bulk_changelogs(self, issue_ids, field_ids=None):
+        return {issue_id: [{'id': '1', 'items': [{'field': 'status', 'to': '3'}]}] for issue_id in issue_ids}
+
+
+def make_issue(issue_id: str, status_category_id: int, updated_at: float) -> dict:
+    return {
+        'id': issue_id,
+        'key': f'MRC-{issue_id}',
+        'updated_at': updated_at,
+        'fields': {'status': {'id': '3', 'statusCategory': {'id': status_category_id}}}
+    }
+
+
+def test_jira_sync_only_downloads_issues_updated_since_last_sync(tmp_path):
+    jira_api = FakeSyncJiraAPI()
+    jira_api.issues['1'] = make_issue('1', 3, 0)
+    jira_api.issues['2'] = make_issue('2', 4, 0)
+    usecases = Usecases(jira_api=jira_api, jira_store=JiraStore(str(tmp_path / 'jira.sqlite')))
+    usecases.new_refresh()
+    assert [issue['key'] for issue in usecases.get_done_smoke_automation_tasks()] == ['MRC-1']
+
+    jira_api.issues['2'] = make_issue('2', 3, float('inf'))
+    usecases.new_refresh()
+    done_tasks = usecases.get_done_smoke_automation_tasks()
+    assert [issue['key'] for issue in done_tasks] == ['MRC-1', 'MRC-2']
+    assert jira_api.calls == ['full', 'incremental']
+    assert usecases.get_jira_issues_changelogs(done_tasks, 'status')['MRC-2'][0]['id'] == '1'
+
+
+def make_case_page(offset: int, test_cases: list, page_hash: str) -> dict:
+    return {
+        'offset': offset,
+        'etag': f'"{page_hash}"',
+        'hash': page_hash,
+        'data': {'result': {'filtered': 3, 'entities': test_cases}}
+    }
+
+
+def test_qase_store_applies_only_changed_pages_and_filters_locally(tmp_path):
+    store = QaseStore(str(tmp_path / 'qase.sqlite'))
+    smoke_manual = {'id': 1, 'type': 3, 'status': 0, 'automation': 0, 'updated_at': 'a', 'custom_fields': []}
+    smoke_automated = {'id': 2, 'type': 3, 'status': 0, 'automation': 2, 'updated_at': 'a', 'custom_fields': []}
+    regression = {'id': 3, 'type': 4, 'status': 0, 'automation': 1, 'updated_at': 'a', 'custom_fields': []}
+    assert store.save_pages([
+        make_case_page(0, [smoke_manual, smoke_automated], 'h1'),
+        make_case_page(2, [regression], 'h2')
+    ]) == 3
+    assert store.get_page_etags() == {0: '"h1"', 2: '"h2"'}
+
+    not_modified_page = {'offset': 2, 'etag': '"h2"', 'hash': None, 'data': None}
+    smoke_automated = dict(smoke_automated, automation=1, updated_at='b')
+    assert store.save_pages([make_case_page(0, [smoke_manual, smoke_automated], 'h3'), not_modified_page]) == 1
+    manual_smoke_tests = store.get_test_cases(type='smoke', status='actual', automation='is-not-automated,to-be-automated')
+    assert [test_case['id'] for test_case in manual_smoke_tests] == [1, 2]
+    assert [test_case['id'] for test_case in store.get_test_cases(type='regression')] == [3]
+
+    store.save_pages([make_case_page(0, [smoke_manual], 'h4')])
+    assert [test_case['id'] for test_case in store.get_test_cases()] == [1]
+
+
+class FakeAsyncQaseAPI:
+    def __init__(self):
+        self.calls = []
+
+    async def get_all_test_cases(self, type=None, status=None, automation=None):
+        self.calls.append(automation)
+        return [{'id': len(self.calls), 'custom_fields': [{'id': 5, 'value': 'https://jira.example.com/browse/MRC-1'}]}]
+
+
+class FakeAsyncJiraAPI:
+    async def get_issues_by_keys(self, issue_keys, fields=None, extra_fields=None):
+        return [make_issue('1', 4, 0)], []
+
+    async def get_all_issues(self, jql, fields=None, extra_fields=None, max_results=1000, validate_query=None):
+        return [make_issue('2', 3, 0)]
+
+
+def test_refresh_data_is_prefetched_as_records_and_kept_by_the_first_group_refresh():
+    qase_api = FakeQaseAPI()
+    async_qase_api = FakeAsyncQaseAPI()
+    usecases = Usecases(
+        qase_api=qase_api,
+        jira_api=FakeJiraAPI({}),
+        async_qase_api=async_qase_api,
+        async_jira_api=FakeAsyncJiraAPI(),
+        compact_records=True
+    )
+    usecases.new_refresh()
+    asyncio.run(usecases.get_refresh_data_async())
+    assert sorted(async_qase_api.calls) == ['automated', 'is-not-automated,to-be-automated']
+
+    usecases.refresh_datasets('smoke_tests', 'automation_tasks')
+    assert isinstance(usecases.get_smoke_tests(automated=False)[0], records.TestCaseRecord)
+    index = usecases.get_smoke_test_task_index(automated=False)
+    assert isinstance(index.get_task(1), records.IssueRecord)
+    assert [issue.key for issue in usecases.get_done_smoke_automation_tasks()] == ['MRC-2']
+    assert qase_api.calls == []
+
+    usecases.refresh_datasets('smoke_tests')
+    usecases.get_smoke_tests(automated=False)
+    assert qase_api.calls == ['is-not-automated,to-be-automated']